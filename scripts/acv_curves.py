@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Photoshop .acv curve reader and bulk evaluator.
+
+An .acv file is a flat run of big-endian uint16 values:
+
+  version, curve_count, then per curve: point_count, (output, input) × point_count
+
+The whole file is unpacked with one ``struct`` call and the curves are sliced out of
+that array. Evaluation follows the app's parseACVFile: points normalized by 255,
+sorted by input, interpolated with PCHIP, then mapped to printer space
+(``samples[i] = 1 − spline(1 − t)``). Only the first (composite) curve is used by the
+app; the others are available through ``read_acv(...).curves``.
+
+Usage:
+  python scripts/acv_curves.py testdata/midtone_lift.acv [--samples 256]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import struct
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from interpolation import pchip_interpolate
+from lab_measurements import PathLike
+
+
+@dataclass(frozen=True)
+class AcvCurve:
+    """Anchor points normalized to 0..1, sorted by input (image space)."""
+
+    inputs: np.ndarray
+    outputs: np.ndarray
+
+
+@dataclass(frozen=True)
+class AcvFile:
+    path: str
+    version: int
+    curves: List[AcvCurve]
+
+
+def parse_acv_bytes(data: bytes, path: str = "<bytes>") -> AcvFile:
+    if len(data) < 6:
+        raise ValueError(f"{path}: Invalid ACV file - too small (minimum 6 bytes required)")
+    words = np.array(struct.unpack(f">{len(data) // 2}H", data[: len(data) // 2 * 2]), dtype=np.float64)
+    version, total = int(words[0]), int(words[1])
+    if total == 0:
+        raise ValueError(f"{path}: Invalid ACV file - no curves found")
+
+    curves: List[AcvCurve] = []
+    offset = 2
+    for index in range(total):
+        if offset >= words.shape[0]:
+            break
+        count = int(words[offset])
+        end = offset + 1 + 2 * count
+        if end > words.shape[0]:
+            if index == 0:
+                raise ValueError(
+                    f"{path}: ACV file truncated - expected {end * 2} bytes, got {len(data)}"
+                )
+            break
+        if count == 0:
+            if index == 0:
+                raise ValueError(f"{path}: Invalid ACV file - first curve has no points")
+            offset = end
+            continue
+        pairs = words[offset + 1:end].reshape(count, 2) / 255.0
+        order = np.argsort(pairs[:, 1], kind="stable")
+        curves.append(AcvCurve(inputs=pairs[order, 1], outputs=pairs[order, 0]))
+        offset = end
+    return AcvFile(path, version, curves)
+
+
+def read_acv(path: PathLike) -> AcvFile:
+    path_str = os.fspath(path)
+    with open(path_str, "rb") as fh:
+        return parse_acv_bytes(fh.read(), path_str)
+
+
+def evaluate_curve(curve: AcvCurve, samples: int = 256) -> np.ndarray:
+    """Printer-space samples of one curve at ``samples`` evenly spaced inputs."""
+    t = np.linspace(0.0, 1.0, samples)
+    return np.clip(1.0 - pchip_interpolate(curve.inputs, curve.outputs, 1.0 - t), 0.0, 1.0)
+
+
+def evaluate_curves(acv: AcvFile, samples: int = 256) -> np.ndarray:
+    """(curves, samples) array of printer-space samples for every curve in the file."""
+    return np.stack([evaluate_curve(curve, samples) for curve in acv.curves])
+
+
+def correction_curve(path: PathLike, samples: int = 256) -> List[float]:
+    """The composite curve as the app imports it, comparable with ``PipelineResult.corrected``."""
+    return evaluate_curve(read_acv(path).curves[0], samples).tolist()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Evaluate Photoshop .acv curves in printer space")
+    ap.add_argument("inputs", nargs="+", help=".acv files")
+    ap.add_argument("--samples", type=int, default=256, help="Samples per curve (default 256)")
+    args = ap.parse_args()
+
+    for name in args.inputs:
+        acv = read_acv(name)
+        curves = evaluate_curves(acv, args.samples)
+        print(f"{name}: version {acv.version}, {len(acv.curves)} curve(s)")
+        t = np.linspace(0.0, 1.0, args.samples)
+        for index, (curve, values) in enumerate(zip(acv.curves, curves)):
+            deviation = values - t
+            peak = int(np.argmax(np.abs(deviation)))
+            print(
+                f"  curve {index}: {curve.inputs.shape[0]} points, "
+                f"max |corrected(t) − t| = {abs(deviation[peak]):.5f} at t={t[peak]:.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
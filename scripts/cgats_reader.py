@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for CGATS.17 measurement files and ArgyllCMS .ti3 files.
+
+The file is consumed line by line in a single pass. ``BEGIN_DATA_FORMAT`` decides the
+field order; only the requested columns are converted, in fixed-size row chunks written
+into preallocated arrays (sized from ``NUMBER_OF_SETS`` when present), so memory stays
+proportional to the requested columns rather than to the file. Spectral columns
+(``SPEC_380`` … ``SPEC_730``) are skipped unless explicitly requested.
+
+The neutral ramp used by the density pipelines is extracted following the quadGEN CGATS
+rules (docs/File_Specs/CGATS17_SPEC_SUMMARY.md): K-only patches (C, M, Y ≤ 2.5 %) are
+preferred, then C=M=Y composite patches without K; files without device values are read
+as an evenly spaced ramp in sample order.
+
+Usage:
+  python scripts/cgats_reader.py testdata/CGATS.17.txt [--spectral]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import shlex
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+import numpy as np
+
+from lab_measurements import LabColumns, PathLike
+
+CHUNK_ROWS = 4096
+K_ONLY_CMY_MAX = 2.5
+COMPOSITE_TOLERANCE = 0.5
+MIN_RAMP_POINTS = 3
+SPECTRAL_PREFIX = "SPEC_"
+DEVICE_FIELDS = ("CMYK_C", "CMYK_M", "CMYK_Y", "CMYK_K")
+LAB_FIELDS = ("LAB_L", "LAB_A", "LAB_B")
+SIGNATURES = ("CGATS", "CTI3", "CTI1", "CTI2")
+
+
+@dataclass
+class CgatsTable:
+    """Requested numeric columns from the first data table of a CGATS/ti3 file."""
+
+    path: str
+    keywords: Dict[str, str]
+    fields: List[str]
+    """All field names in ``BEGIN_DATA_FORMAT`` order."""
+    columns: Dict[str, np.ndarray]
+    spectra: Optional[np.ndarray] = None
+    """(patches, bands) reflectance when spectral data was requested."""
+    wavelengths: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        if self.columns:
+            return int(next(iter(self.columns.values())).shape[0])
+        return 0 if self.spectra is None else int(self.spectra.shape[0])
+
+    def has(self, *names: str) -> bool:
+        return all(name in self.columns for name in names)
+
+
+@dataclass
+class NeutralRamp:
+    """Neutral measurements ready for ``run_pipeline`` (one row per distinct input)."""
+
+    mode: str
+    """``k_only``, ``composite`` or ``sequence``."""
+    columns: LabColumns
+    patch_count: int
+    """Number of source patches averaged into the ramp."""
+    spectra: Optional[np.ndarray] = None
+    wavelengths: Optional[np.ndarray] = None
+    keywords: Dict[str, str] = field(default_factory=dict)
+    """Header keywords of the source file (e.g. ``SPECTRAL_NORM``)."""
+
+    def pairs(self) -> List[Tuple[float, float]]:
+        return self.columns.pairs()
+
+
+def is_cgats(path: PathLike) -> bool:
+    """True when the file looks like CGATS/ti3 (by extension or leading signature)."""
+    path_str = os.fspath(path)
+    if path_str.lower().endswith((".ti3", ".cgats")):
+        return True
+    with open(path_str, "r", encoding="utf-8", errors="ignore") as fh:
+        head = fh.read(4096)
+    stripped = head.lstrip()
+    return stripped.startswith(SIGNATURES) or "BEGIN_DATA_FORMAT" in head
+
+
+def _split(line: str) -> List[str]:
+    return shlex.split(line) if '"' in line else line.split()
+
+
+def _wavelength(name: str) -> float:
+    try:
+        return float(name[len(SPECTRAL_PREFIX):])
+    except ValueError:
+        return float("nan")
+
+
+class _ColumnSink:
+    """Accumulates selected tokens in row chunks and flushes them into a growing array."""
+
+    def __init__(self, width: int, expected: Optional[int]) -> None:
+        self.width = width
+        self.rows = 0
+        self.data = np.empty((expected or CHUNK_ROWS, width), dtype=np.float64)
+        self.pending: List[List[str]] = []
+
+    def add(self, tokens: List[str]) -> None:
+        self.pending.append(tokens)
+        if len(self.pending) >= CHUNK_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        block = np.array(self.pending, dtype=np.float64).reshape(-1, self.width)
+        end = self.rows + block.shape[0]
+        if end > self.data.shape[0]:
+            grown = np.empty((max(end, 2 * self.data.shape[0]), self.width), dtype=np.float64)
+            grown[: self.rows] = self.data[: self.rows]
+            self.data = grown
+        self.data[self.rows:end] = block
+        self.rows = end
+        self.pending = []
+
+    def result(self) -> np.ndarray:
+        self.flush()
+        return self.data[: self.rows]
+
+
+def _iter_table(lines: Iterable[str], path: str) -> Iterator[Tuple[str, object]]:
+    """Yield ('keyword', (key, value)), ('fields', names) and ('row', tokens) events."""
+    fields: List[str] = []
+    in_format = False
+    in_data = False
+    for raw in lines:
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        if in_format:
+            if line.startswith("END_DATA_FORMAT"):
+                in_format = False
+                yield "fields", fields
+            else:
+                fields.extend(_split(line))
+            continue
+        if in_data:
+            if line.startswith("END_DATA"):
+                # Only the first table is read; later tables (e.g. ti3 calibration) are skipped.
+                return
+            yield "row", _split(line)
+            continue
+        if line.startswith("BEGIN_DATA_FORMAT"):
+            in_format = True
+            fields = []
+        elif line.startswith("BEGIN_DATA"):
+            if not fields:
+                raise ValueError(f"{path}: BEGIN_DATA found before BEGIN_DATA_FORMAT")
+            in_data = True
+        else:
+            key, _, value = line.partition(" ")
+            yield "keyword", (key, value.strip().strip('"'))
+
+
+def read_cgats_stream(
+    stream: TextIO,
+    path: str = "<stream>",
+    fields: Optional[Sequence[str]] = None,
+    spectral: bool = False,
+) -> CgatsTable:
+    """Parse a CGATS/ti3 stream; ``fields=None`` selects every non-spectral numeric column."""
+    keywords: Dict[str, str] = {}
+    all_fields: List[str] = []
+    wanted: List[str] = []
+    wanted_idx: List[int] = []
+    spec_idx: List[int] = []
+    wavelengths: Optional[np.ndarray] = None
+    sink: Optional[_ColumnSink] = None
+    spec_sink: Optional[_ColumnSink] = None
+    skipped = 0
+
+    for kind, payload in _iter_table(stream, path):
+        if kind == "keyword":
+            key, value = payload  # type: ignore[misc]
+            keywords[key] = value
+        elif kind == "fields":
+            all_fields = list(payload)  # type: ignore[arg-type]
+            if fields is None:
+                requested = [
+                    name for name in all_fields
+                    if not name.startswith(SPECTRAL_PREFIX) and name not in ("SAMPLE_NAME", "SAMPLE_LOC")
+                ]
+            else:
+                requested = [name for name in fields if name in all_fields]
+            wanted = requested
+            wanted_idx = [all_fields.index(name) for name in requested]
+            expected = None
+            try:
+                expected = int(keywords.get("NUMBER_OF_SETS", "")) or None
+            except ValueError:
+                pass
+            sink = _ColumnSink(len(wanted_idx), expected)
+            if spectral:
+                spec_fields = sorted(
+                    (name for name in all_fields if name.startswith(SPECTRAL_PREFIX)), key=_wavelength
+                )
+                spec_idx = [all_fields.index(name) for name in spec_fields]
+                wavelengths = np.array([_wavelength(name) for name in spec_fields])
+                spec_sink = _ColumnSink(len(spec_idx), expected) if spec_idx else None
+        elif kind == "row" and sink is not None:
+            tokens: List[str] = payload  # type: ignore[assignment]
+            if len(tokens) < len(all_fields):
+                skipped += 1
+                continue
+            try:
+                selected = [float(tokens[i]) for i in wanted_idx]
+                spec_values = [float(tokens[i]) for i in spec_idx] if spec_sink is not None else None
+            except ValueError:
+                skipped += 1
+                continue
+            sink.add(selected)  # type: ignore[arg-type]
+            if spec_sink is not None:
+                spec_sink.add(spec_values)  # type: ignore[arg-type]
+
+    if sink is None:
+        raise ValueError(f"{path}: no BEGIN_DATA_FORMAT/BEGIN_DATA table found")
+    table = sink.result()
+    columns = {name: np.ascontiguousarray(table[:, i]) for i, name in enumerate(wanted)}
+    if skipped:
+        keywords.setdefault("QUADGEN_SKIPPED_ROWS", str(skipped))
+    return CgatsTable(
+        path=path,
+        keywords=keywords,
+        fields=all_fields,
+        columns=columns,
+        spectra=spec_sink.result() if spec_sink is not None else None,
+        wavelengths=wavelengths,
+    )
+
+
+def read_cgats(path: PathLike, fields: Optional[Sequence[str]] = None, spectral: bool = False) -> CgatsTable:
+    path_str = os.fspath(path)
+    if not os.path.exists(path_str):
+        raise FileNotFoundError(f"Input file not found: {path_str}")
+    with open(path_str, "r", encoding="utf-8", errors="ignore") as fh:
+        return read_cgats_stream(fh, path_str, fields=fields, spectral=spectral)
+
+
+def _average_by_input(
+    gray: np.ndarray, values: List[np.ndarray], spectra: Optional[np.ndarray]
+) -> Tuple[np.ndarray, List[np.ndarray], Optional[np.ndarray]]:
+    """Average rows that share an input level (e.g. repeated paper-white patches)."""
+    levels, inverse, counts = np.unique(np.round(gray, 6), return_inverse=True, return_counts=True)
+    averaged = [np.bincount(inverse, weights=v, minlength=len(levels)) / counts for v in values]
+    spec_avg = None
+    if spectra is not None:
+        spec_avg = np.zeros((len(levels), spectra.shape[1]))
+        np.add.at(spec_avg, inverse, spectra)
+        spec_avg /= counts[:, None]
+    return levels, averaged, spec_avg
+
+
+def neutral_ramp(table: CgatsTable) -> NeutralRamp:
+    """Pick the monochrome progression out of a full chart."""
+    if not table.has("LAB_L"):
+        raise ValueError(f"{table.path}: LAB_L field is required")
+    lab_l = table.columns["LAB_L"]
+    lab_a = table.columns.get("LAB_A", np.zeros_like(lab_l))
+    lab_b = table.columns.get("LAB_B", np.zeros_like(lab_l))
+
+    candidates: List[Tuple[str, np.ndarray, np.ndarray]] = []
+    if table.has(*DEVICE_FIELDS):
+        c, m, y, k = (table.columns[name] for name in DEVICE_FIELDS)
+        k_only = (c <= K_ONLY_CMY_MAX) & (m <= K_ONLY_CMY_MAX) & (y <= K_ONLY_CMY_MAX)
+        candidates.append(("k_only", k_only, k))
+        composite = (
+            (np.abs(c - m) <= COMPOSITE_TOLERANCE)
+            & (np.abs(m - y) <= COMPOSITE_TOLERANCE)
+            & (k <= K_ONLY_CMY_MAX)
+        )
+        candidates.append(("composite", composite, (c + m + y) / 3.0))
+    else:
+        sequence = np.linspace(0.0, 100.0, len(lab_l)) if len(lab_l) > 1 else np.zeros(len(lab_l))
+        candidates.append(("sequence", np.ones(len(lab_l), dtype=bool), sequence))
+
+    for mode, mask, inputs in candidates:
+        if len(np.unique(np.round(inputs[mask], 6))) < MIN_RAMP_POINTS:
+            continue
+        spectra = table.spectra[mask] if table.spectra is not None else None
+        gray, (l_avg, a_avg, b_avg), spec_avg = _average_by_input(
+            inputs[mask], [lab_l[mask], lab_a[mask], lab_b[mask]], spectra
+        )
+        return NeutralRamp(
+            mode=mode,
+            columns=LabColumns.from_arrays(table.path, gray, l_avg, a_avg, b_avg),
+            patch_count=int(mask.sum()),
+            spectra=spec_avg,
+            wavelengths=table.wavelengths if spec_avg is not None else None,
+            keywords=table.keywords,
+        )
+    raise ValueError(f"{table.path}: CGATS file contains no suitable monochrome measurement data")
+
+
+def read_neutral_ramp(path: PathLike, spectral: bool = False) -> NeutralRamp:
+    """Stream only the device and LAB columns (plus spectra on request) and extract the ramp."""
+    table = read_cgats(path, fields=DEVICE_FIELDS + LAB_FIELDS, spectral=spectral)
+    return neutral_ramp(table)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Summarize the neutral ramp of a CGATS.17 / .ti3 file")
+    ap.add_argument("inputs", nargs="+", help="CGATS.17 or .ti3 files")
+    ap.add_argument("--spectral", action="store_true", help="Also read spectral columns")
+    args = ap.parse_args()
+
+    for name in args.inputs:
+        ramp = read_neutral_ramp(name, spectral=args.spectral)
+        cols = ramp.columns
+        print(f"{name}: {len(cols)} ramp points ({ramp.mode}) from {ramp.patch_count} patches")
+        for gray, lab_l in ramp.pairs():
+            print(f"  {gray:7.2f}%  L*={lab_l:7.3f}")
+        if ramp.spectra is not None and ramp.wavelengths is not None:
+            print(f"  spectra: {ramp.spectra.shape[1]} bands {ramp.wavelengths[0]:.0f}–{ramp.wavelengths[-1]:.0f} nm")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,718 @@
+"""
+Channel density solver shared by the report and catalog scripts.
+
+Given a .quad's per-channel draw curves and a LAB step wedge, ``compute_density_metrics``
+derives each channel's share of total draw per step, orders channels by the step at
+which they first dominate, solves density constants greedily in that order and
+allocates the measured ΔL* per step by waterfilling.
+
+``DensitySession`` keeps that solved state so a single-channel edit can be re-solved
+incrementally: only steps that sample the edited curve points get new shares, only
+constants whose calibration sees a changed term are recomputed, and waterfilling
+restarts at the first step the edit can reach and stops once its running budgets
+re-converge with the cached pass.
+Results are identical to a from-scratch ``compute_density_metrics`` call; ``--self-check``
+verifies that over random edits. The saving depends on the edit: when the recalibrated
+channels draw at most steps (typical for K or the darkest dilution on a fine ramp),
+waterfilling re-runs nearly everywhere and an edit costs about as much as a full solve.
+
+``DensitySession.joint_constants`` is an order-free alternative to the greedy constants:
+one non-negative least-squares fit of every live step's ΔL* against the channels × steps
+share matrix. The normal equations are formed in a single product over all steps, so
+the active-set iterations only ever touch a channels × channels system; a 10-channel quad
+on a 4096-step ramp solves in a couple of milliseconds. It reports the fit residual
+for both sets of constants and their per-channel difference.
+
+Usage (time edits against full re-solves):
+  python scripts/channel_density.py --quad data/P800.quad --lab data/P800.txt \
+      --channel LK --scale 0.8 [--from 0 --to 30] [--repeats 200] [--self-check 2000]
+
+Usage (joint vs greedy constants, optionally on a ramp resampled to N steps):
+  python scripts/channel_density.py --quad data/P800.quad --lab data/P800.txt --joint [--resample 4096]
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DOMINANCE_THRESHOLD = 0.9
+SUPPORT_THRESHOLD = 0.2
+MIN_SHARE_THRESHOLD = 0.01
+EPSILON = 1e-6
+DENSITY_MAX_ITERATIONS = 8
+NNLS_MAX_ITERATIONS_PER_CHANNEL = 3
+
+
+def sample_draw(draws: List[float], input_percent: float) -> float:
+    """Return draw value for a channel at the given input using nearest sample."""
+    if not draws:
+        return 0.0
+    idx = round(input_percent / 100 * (len(draws) - 1))
+    return draws[idx]
+
+
+def _active_channels(quad_curves: Dict[str, List[float]]) -> List[str]:
+    active = [name for name, values in quad_curves.items() if any(value > EPSILON for value in values)]
+    return active or list(quad_curves.keys())
+
+
+def _dominance_index(shares: List[float], delta_l: List[float]) -> Tuple[int, int]:
+    """(tier, step) at which a channel first dominates, supports or appears.
+
+    Tier 0 is a dominance hit, 1 a support hit, 2 any share above the minimum and
+    3 a channel that never appears (step = len + 1).
+    """
+    for idx, share in enumerate(shares):
+        if delta_l[idx] <= EPSILON:
+            continue
+        if share >= DOMINANCE_THRESHOLD:
+            return 0, idx
+    for idx, share in enumerate(shares):
+        if delta_l[idx] <= EPSILON:
+            continue
+        if share >= SUPPORT_THRESHOLD:
+            return 1, idx
+    for idx, share in enumerate(shares):
+        if share > MIN_SHARE_THRESHOLD:
+            return 2, idx
+    return 3, len(delta_l) + 1
+
+
+def _waterfill_step(
+    idx: int,
+    delta: float,
+    active_channels: List[str],
+    channel_shares: Dict[str, List[float]],
+    density_constants: Dict[str, float],
+    remaining: Dict[str, float],
+) -> Tuple[Dict[str, float], bool]:
+    """Allocate one step's ΔL* across channels; ``remaining`` budgets are updated in place.
+
+    Also reports whether the fallback (largest remaining × share) branch ran.
+    """
+    contributions = {name: 0.0 for name in active_channels}
+    candidate_names = [
+        name for name in active_channels
+        if channel_shares[name][idx] > MIN_SHARE_THRESHOLD and remaining[name] > EPSILON
+    ]
+    weights = {
+        name: density_constants[name] * channel_shares[name][idx]
+        for name in candidate_names
+    }
+    delta_remaining = delta
+    iteration = 0
+
+    while delta_remaining > EPSILON and candidate_names and iteration < DENSITY_MAX_ITERATIONS:
+        iteration += 1
+        total_weight = sum(weights[name] for name in candidate_names)
+        if total_weight <= EPSILON:
+            equal_share = delta_remaining / len(candidate_names)
+            consumed = 0.0
+            for name in candidate_names:
+                amount = min(equal_share, remaining[name])
+                if amount > EPSILON:
+                    contributions[name] += amount
+                    remaining[name] -= amount
+                    consumed += amount
+            if consumed <= EPSILON:
+                break
+            delta_remaining -= consumed
+        else:
+            consumed = 0.0
+            for name in candidate_names:
+                portion = (weights[name] / total_weight) * delta_remaining
+                amount = min(portion, remaining[name])
+                if amount > EPSILON:
+                    contributions[name] += amount
+                    remaining[name] -= amount
+                    consumed += amount
+            if consumed <= EPSILON:
+                break
+            delta_remaining -= consumed
+
+        candidate_names = [
+            name for name in candidate_names
+            if remaining[name] > EPSILON and channel_shares[name][idx] > MIN_SHARE_THRESHOLD
+        ]
+        weights = {
+            name: density_constants[name] * channel_shares[name][idx]
+            for name in candidate_names
+        }
+
+    fallback = delta_remaining > EPSILON
+    if fallback:
+        fallback_name = max(
+            active_channels,
+            key=lambda ch: remaining[ch] * channel_shares[ch][idx]
+        )
+        if remaining[fallback_name] > EPSILON:
+            amount = min(delta_remaining, remaining[fallback_name])
+            contributions[fallback_name] += amount
+            remaining[fallback_name] -= amount
+            delta_remaining -= amount
+
+    return contributions, fallback
+
+
+def nnls_normal(gram: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """Lawson–Hanson NNLS on normal equations: min ½xᵀGx − xᵀb subject to x ≥ 0.
+
+    ``gram`` is AᵀA and ``rhs`` Aᵀy for the original problem min ‖Ax − y‖, x ≥ 0. Each
+    iteration solves the unconstrained problem on the passive set and steps back to
+    the feasible boundary when a passive variable would go negative.
+    """
+    n = rhs.shape[0]
+    x = np.zeros(n)
+    passive = np.zeros(n, dtype=bool)
+    tol = 10 * np.finfo(np.float64).eps * max(1, n) * max(float(np.abs(gram).sum(axis=0).max(initial=0.0)), 1.0)
+    gradient = rhs.copy()
+    for _ in range(NNLS_MAX_ITERATIONS_PER_CHANNEL * max(1, n)):
+        candidates = np.where(passive, -np.inf, gradient)
+        if passive.all() or candidates.max() <= tol:
+            break
+        passive[int(candidates.argmax())] = True
+        while True:
+            index = np.flatnonzero(passive)
+            z = np.zeros(n)
+            z[index] = np.linalg.lstsq(gram[np.ix_(index, index)], rhs[index], rcond=None)[0]
+            negative = passive & (z <= tol)
+            if not negative.any():
+                x = z
+                break
+            alpha = float(np.min(x[negative] / (x[negative] - z[negative])))
+            x = x + alpha * (z - x)
+            passive &= x > tol
+            x[~passive] = 0.0
+            if not passive.any():
+                break
+        gradient = rhs - gram @ x
+    return x
+
+
+@dataclass
+class JointConstants:
+    """Density constants fitted jointly by NNLS, next to the greedy ones.
+
+    Constants are normalized by total ΔL* like ``metrics()["density_constants"]``;
+    residuals are RMS ΔL* misfits (Σ share × raw constant vs measured ΔL*) over live steps.
+    """
+
+    constants: Dict[str, float]
+    greedy: Dict[str, float]
+    difference: Dict[str, float]
+    """Joint minus greedy, per channel."""
+    residual: float
+    greedy_residual: float
+    steps: int
+    seconds: float
+
+
+@dataclass
+class DensityEdit:
+    """What one ``DensitySession.edit_channel`` call changed."""
+
+    channel: str
+    changed_steps: List[int]
+    """Steps whose channel shares were recomputed."""
+    recalibrated: List[str]
+    """Channels whose density constant changed."""
+    reallocated_steps: List[int]
+    """Steps whose per-channel allocation changed."""
+    step_deltas: Dict[int, Dict[str, float]]
+    """Per reallocated step: change in allocated ΔL* per channel."""
+    contribution_delta: Dict[str, float]
+    """Change in contribution % per channel (non-zero entries only)."""
+    constant_delta: Dict[str, float]
+    """Change in normalized density constant per channel (non-zero entries only)."""
+    full_resolve: bool
+    seconds: float
+
+
+class DensitySession:
+    """Solved density state for one quad + wedge that can be updated after channel edits."""
+
+    def __init__(self, quad_curves: Dict[str, List[float]], lab_rows: List[Dict[str, float]]) -> None:
+        self.quad_curves = {name: list(values) for name, values in quad_curves.items()}
+        self.inputs = [row["GRAY"] for row in lab_rows]
+        self.l_values = [row["LAB_L"] for row in lab_rows]
+        self.delta_l: List[float] = []
+        prev_l = None
+        for l_star in self.l_values:
+            self.delta_l.append(0.0 if prev_l is None else max(prev_l - l_star, 0.0))
+            prev_l = l_star
+        self.total_density = sum(self.delta_l) or 1.0
+        self.delta = np.array(self.delta_l, dtype=np.float64)
+        self.live = self.delta > EPSILON
+        self._solve()
+
+    # ---------- Full solve ----------
+
+    def _solve(self) -> None:
+        steps = len(self.inputs)
+        self.active_channels = _active_channels(self.quad_curves)
+        self.sample_index = {
+            name: [round(gray / 100 * (len(values) - 1)) if values else -1 for gray in self.inputs]
+            for name, values in self.quad_curves.items()
+        }
+        self.channel_shares: Dict[str, List[float]] = {name: [0.0] * steps for name in self.quad_curves}
+        for idx in range(steps):
+            self._update_shares(idx)
+        self.share_matrix = np.array([self.channel_shares[name] for name in self.quad_curves], dtype=np.float64)
+        self.dominance = {
+            name: _dominance_index(self.channel_shares[name], self.delta_l) for name in self.active_channels
+        }
+        self.order: List[str] = []
+        self.raw_constants: Dict[str, float] = {}
+        self.density_constants: Dict[str, float] = {}
+        self.residual_terms = {name: np.zeros(steps) for name in self.active_channels}
+        self.share_terms = {name: np.zeros(steps) for name in self.active_channels}
+        self._calibrate(None)
+        self.remaining_before = np.full((steps, len(self.active_channels)), np.nan)
+        self.amounts: List[Optional[Dict[str, float]]] = [None] * steps
+        self.fallback = [False] * steps
+        self._allocate(0, None)
+        self._accumulate()
+
+    def _update_shares(self, idx: int) -> None:
+        draws = {
+            name: values[self.sample_index[name][idx]] if values else 0.0
+            for name, values in self.quad_curves.items()
+        }
+        total_draw = sum(draws.values())
+        for name in self.quad_curves:
+            self.channel_shares[name][idx] = draws[name] / total_draw if total_draw > 0 else 0.0
+
+    def _calibrate(self, steps: Optional[List[int]]) -> List[str]:
+        """Greedy constants in dominance order; returns channels whose final constant changed.
+
+        Each channel's terms are the ΔL* left after its calibrated predecessors at steps
+        where it has a share; the running remainder is updated with the same operation
+        order as a per-step loop, and sums are sequential, so constants match it exactly.
+        With ``steps`` given, a channel whose predecessors are unchanged and whose terms
+        at those steps are unchanged keeps its cached constant.
+        """
+        order = [name for _, name in sorted((self.dominance[name][1], name) for name in self.active_channels)]
+        rows = {name: row for row, name in enumerate(self.quad_curves)}
+        constants = {name: 0.0 for name in self.active_channels}
+        calibrated: List[str] = []
+        prefix_intact = steps is not None
+        running = self.delta.copy()
+
+        for pos, name in enumerate(order):
+            if prefix_intact and (pos >= len(self.order) or self.order[pos] != name):
+                prefix_intact = False
+            shares = self.share_matrix[rows[name]]
+            included = self.live & (shares > MIN_SHARE_THRESHOLD) & (running > EPSILON)
+            residual_terms = np.where(included, running, 0.0)
+            share_terms = np.where(included, shares, 0.0)
+            if (
+                prefix_intact
+                and np.array_equal(residual_terms[steps], self.residual_terms[name][steps])
+                and np.array_equal(share_terms[steps], self.share_terms[name][steps])
+            ):
+                constant = self.raw_constants[name]
+            else:
+                prefix_intact = False
+                residual_sum = float(np.cumsum(residual_terms)[-1])
+                share_sum = float(np.cumsum(share_terms)[-1])
+                constant = residual_sum / share_sum if share_sum > EPSILON else 0.0
+                remaining = max(0.0, self.total_density - sum(constants.values()))
+                if constant > remaining:
+                    constant = remaining
+                constant = max(0.0, constant)
+            self.residual_terms[name] = residual_terms
+            self.share_terms[name] = share_terms
+            constants[name] = constant
+            calibrated.append(name)
+            running -= constant * shares
+
+        self.raw_constants = dict(constants)
+        leftover = max(0.0, self.total_density - sum(constants.values()))
+        if leftover > EPSILON and calibrated:
+            constants[calibrated[-1]] += leftover
+
+        changed = [name for name in self.active_channels if constants[name] != self.density_constants.get(name)]
+        self.order = order
+        self.density_constants = constants
+        return changed
+
+    # ---------- Waterfilling ----------
+
+    def _allocate(
+        self, start: int, stop_after: Optional[int], recalibrated: Sequence[str] = ()
+    ) -> Dict[int, Dict[str, float]]:
+        """Re-run waterfilling from ``start``; returns per-step allocation changes.
+
+        ``start`` must precede any step where a ``recalibrated`` channel was a candidate
+        or the fallback ran, so those channels still hold their whole (new) constant.
+        The cached budgets of every earlier step are updated to that constant too, so
+        the cache always matches a from-scratch pass and a later edit may restart
+        anywhere. Past ``stop_after`` the pass ends at the first step whose running
+        budgets match the cached ones and after which no recalibrated channel was ever
+        a candidate: from there on every step sees the same inputs as before.
+        """
+        names = self.active_channels
+        positions = [names.index(name) for name in recalibrated]
+        if start == 0:
+            remaining = {name: self.density_constants.get(name, 0.0) for name in names}
+        else:
+            if positions:
+                self.remaining_before[:start + 1, positions] = [self.density_constants[name] for name in recalibrated]
+            remaining = dict(zip(names, self.remaining_before[start].tolist()))
+        steps = len(self.delta_l)
+        stop_from = steps
+        if stop_after is not None:
+            stop_from = stop_after + 1
+            for idx in range(steps - 1, stop_after, -1):
+                cached = self.remaining_before[idx]
+                if self.delta_l[idx] > EPSILON and any(
+                    self.channel_shares[names[pos]][idx] > MIN_SHARE_THRESHOLD and cached[pos] > EPSILON
+                    for pos in positions
+                ):
+                    stop_from = idx + 1
+                    break
+        changes: Dict[int, Dict[str, float]] = {}
+
+        for idx in range(start, steps):
+            state = tuple(remaining[name] for name in names)
+            if idx >= stop_from and state == tuple(self.remaining_before[idx].tolist()):
+                break
+            self.remaining_before[idx] = state
+            delta = self.delta_l[idx]
+            if delta <= EPSILON:
+                amounts: Dict[str, float] = {}
+                self.fallback[idx] = False
+            else:
+                contributions, self.fallback[idx] = _waterfill_step(
+                    idx, delta, names, self.channel_shares, self.density_constants, remaining
+                )
+                amounts = {name: amount for name, amount in contributions.items() if amount > EPSILON}
+            previous = self.amounts[idx]
+            if previous is None:
+                self.amounts[idx] = amounts
+            elif amounts != previous:
+                changes[idx] = {
+                    name: amounts.get(name, 0.0) - previous.get(name, 0.0)
+                    for name in names
+                    if amounts.get(name, 0.0) != previous.get(name, 0.0)
+                }
+                self.amounts[idx] = amounts
+        return changes
+
+    def _restart_step(self, first_changed: int, recalibrated: Sequence[str]) -> int:
+        """Earliest step whose waterfilling can differ after an edit."""
+        for idx in range(first_changed):
+            if self.delta_l[idx] <= EPSILON:
+                continue
+            if self.fallback[idx] or any(
+                self.channel_shares[name][idx] > MIN_SHARE_THRESHOLD for name in recalibrated
+            ):
+                return idx
+        return first_changed
+
+    def _accumulate(self) -> None:
+        cumulative = {name: 0.0 for name in self.active_channels}
+        for amounts in self.amounts:
+            for name, amount in amounts.items():
+                cumulative[name] += amount
+        self.cumulative = cumulative
+        total_delta = sum(self.delta_l) or 1.0
+        self.contribution_pct = {name: (cumulative[name] / total_delta) * 100 for name in cumulative}
+
+    def normalized_constants(self) -> Dict[str, float]:
+        total_delta = sum(self.delta_l) or 1.0
+        return {
+            name: (self.density_constants[name] / total_delta) if total_delta > EPSILON else 0.0
+            for name in self.density_constants
+        }
+
+    def joint_constants(self) -> JointConstants:
+        """Solve every active channel's constant at once (NNLS over the live steps)."""
+        started = time.perf_counter()
+        rows = {name: row for row, name in enumerate(self.quad_curves)}
+        names = self.active_channels
+        shares = self.share_matrix[[rows[name] for name in names]][:, self.live]
+        target = self.delta[self.live]
+        raw = nnls_normal(shares @ shares.T, shares @ target)
+        greedy_raw = np.array([self.density_constants.get(name, 0.0) for name in names])
+        steps = int(target.shape[0])
+
+        def rms(constants: np.ndarray) -> float:
+            return float(np.sqrt(np.mean((constants @ shares - target) ** 2))) if steps else 0.0
+
+        total_delta = sum(self.delta_l)
+        scale = 1.0 / total_delta if total_delta > EPSILON else 0.0
+        joint = {name: float(value) * scale for name, value in zip(names, raw)}
+        greedy = self.normalized_constants()
+        return JointConstants(
+            constants=joint,
+            greedy=greedy,
+            difference={name: joint[name] - greedy.get(name, 0.0) for name in names},
+            residual=rms(raw),
+            greedy_residual=rms(greedy_raw),
+            steps=steps,
+            seconds=time.perf_counter() - started,
+        )
+
+    # ---------- Edits ----------
+
+    def edit_channel(self, name: str, values: Sequence[float], start: int = 0) -> DensityEdit:
+        """Replace ``name``'s draws from curve index ``start`` and re-solve what they affect."""
+        started = time.perf_counter()
+        if name not in self.quad_curves:
+            raise KeyError(f"Unknown channel: {name}")
+        curve = self.quad_curves[name]
+        values = list(values)
+        if start < 0 or start + len(values) > len(curve):
+            raise ValueError(f"Edit [{start}, {start + len(values)}) is outside {name}'s {len(curve)} samples")
+
+        touched = {start + offset for offset, value in enumerate(values) if curve[start + offset] != value}
+        curve[start:start + len(values)] = values
+        steps = [idx for idx, sample in enumerate(self.sample_index[name]) if sample in touched]
+        before_pct = self.contribution_pct
+        before_constants = self.normalized_constants()
+
+        full_resolve = _active_channels(self.quad_curves) != self.active_channels
+        if full_resolve:
+            before_amounts = self.amounts
+            self._solve()
+            steps = list(range(len(self.inputs)))
+            recalibrated = list(self.active_channels)
+            step_deltas = {
+                idx: {
+                    ch: amounts.get(ch, 0.0) - (old or {}).get(ch, 0.0)
+                    for ch in set(amounts) | set(old or {})
+                    if amounts.get(ch, 0.0) != (old or {}).get(ch, 0.0)
+                }
+                for idx, (amounts, old) in enumerate(zip(self.amounts, before_amounts))
+                if amounts != old
+            }
+        elif steps:
+            for idx in steps:
+                self._update_shares(idx)
+            self.share_matrix[:, steps] = [[self.channel_shares[ch][idx] for idx in steps] for ch in self.quad_curves]
+            for ch in self.active_channels:
+                tier, idx = self.dominance[ch]
+                if tier != 0 or steps[0] <= idx:
+                    self.dominance[ch] = _dominance_index(self.channel_shares[ch], self.delta_l)
+            recalibrated = self._calibrate(steps)
+            step_deltas = self._allocate(self._restart_step(steps[0], recalibrated), steps[-1], recalibrated)
+            if step_deltas:
+                self._accumulate()
+        else:
+            recalibrated, step_deltas = [], {}
+
+        after_constants = self.normalized_constants()
+        return DensityEdit(
+            channel=name,
+            changed_steps=steps,
+            recalibrated=recalibrated,
+            reallocated_steps=sorted(step_deltas),
+            step_deltas=step_deltas,
+            contribution_delta={
+                ch: pct - before_pct.get(ch, 0.0)
+                for ch, pct in self.contribution_pct.items()
+                if pct != before_pct.get(ch, 0.0)
+            },
+            constant_delta={
+                ch: value - before_constants.get(ch, 0.0)
+                for ch, value in after_constants.items()
+                if value != before_constants.get(ch, 0.0)
+            },
+            full_resolve=full_resolve,
+            seconds=time.perf_counter() - started,
+        )
+
+    def scale_channel(self, name: str, factor: float, start_percent: float = 0.0, end_percent: float = 100.0) -> DensityEdit:
+        """Scale ``name``'s draws by ``factor`` over an input range (percent, inclusive)."""
+        curve = self.quad_curves[name]
+        last = len(curve) - 1
+        lo = max(0, round(start_percent / 100 * last))
+        hi = min(last, round(end_percent / 100 * last))
+        return self.edit_channel(name, [value * factor for value in curve[lo:hi + 1]], lo)
+
+    # ---------- Output ----------
+
+    def metrics(self) -> Dict[str, object]:
+        """The ``compute_density_metrics`` result for the current curves."""
+        inputs = list(self.inputs)
+        delta_l = list(self.delta_l)
+        channel_shares = {name: list(shares) for name, shares in self.channel_shares.items()}
+
+        key_channels = [name for name in ["LK", "C", "K"] if name in self.quad_curves]
+        highlight_idx = inputs.index(7.5) if 7.5 in inputs else 0
+        mid_idx = inputs.index(35.0) if 35.0 in inputs else len(inputs) // 2
+        shadow_idx = inputs.index(90.0) if 90.0 in inputs else len(inputs) - 1
+        snapshots = [
+            ("Highlight", inputs[highlight_idx], delta_l[highlight_idx]),
+            ("Midtone", inputs[mid_idx], delta_l[mid_idx]),
+            ("Shadow", inputs[shadow_idx], delta_l[shadow_idx]),
+        ]
+        snapshot_rows: List[Dict[str, object]] = []
+        for label, gray, delta in snapshots:
+            row_index = inputs.index(gray)
+            snapshot_rows.append({
+                "region": label,
+                "input": gray,
+                "delta": delta,
+                "shares": {name: channel_shares[name][row_index] for name in key_channels},
+            })
+
+        density_profiles: List[Dict[str, object]] = []
+        for delta, amounts in zip(delta_l, self.amounts):
+            if delta <= EPSILON:
+                density_profiles.append({"density": delta, "shares": {}})
+            else:
+                density_profiles.append({
+                    "density": delta,
+                    "shares": {name: amount / delta for name, amount in amounts.items()},
+                })
+
+        return {
+            "inputs": inputs,
+            "l_values": list(self.l_values),
+            "delta_l": delta_l,
+            "channel_shares": channel_shares,
+            "cumulative": dict(self.cumulative),
+            "contribution_pct": dict(self.contribution_pct),
+            "snapshots": snapshot_rows,
+            "density_constants": self.normalized_constants(),
+            "density_profiles": density_profiles,
+            "active_channels": list(self.active_channels),
+        }
+
+
+def compute_density_metrics(
+    quad_curves: Dict[str, List[float]],
+    lab_rows: List[Dict[str, float]],
+) -> Dict[str, object]:
+    """Compute channel share, incremental deltas, and cumulative contributions."""
+    return DensitySession(quad_curves, lab_rows).metrics()
+
+
+def resample_rows(lab_rows: List[Dict[str, float]], steps: int) -> List[Dict[str, float]]:
+    """The wedge linearly interpolated onto ``steps`` evenly spaced inputs (for scale tests)."""
+    gray = np.array([row["GRAY"] for row in lab_rows], dtype=np.float64)
+    l_star = np.array([row["LAB_L"] for row in lab_rows], dtype=np.float64)
+    order = np.argsort(gray, kind="stable")
+    inputs = np.linspace(gray.min(), gray.max(), steps)
+    values = np.interp(inputs, gray[order], l_star[order])
+    return [{"GRAY": float(g), "LAB_L": float(v)} for g, v in zip(inputs, values)]
+
+
+def self_check(
+    quad_curves: Dict[str, List[float]], lab_rows: List[Dict[str, float]], edits: int, seed: int = 0
+) -> List[str]:
+    """Random ``scale_channel`` edits, each checked against a from-scratch ``compute_density_metrics``.
+
+    Returns a description of every mismatching edit (the session is rebuilt after one).
+    """
+    import random
+
+    rng = random.Random(seed)
+    session = DensitySession(quad_curves, lab_rows)
+    names = list(quad_curves)
+    mismatches: List[str] = []
+    for number in range(edits):
+        name = rng.choice(names)
+        lo = rng.uniform(0.0, 100.0)
+        hi = rng.uniform(lo, 100.0)
+        factor = rng.choice((0.0, rng.uniform(0.0, 2.0)))
+        session.scale_channel(name, factor, lo, hi)
+        expected = compute_density_metrics(session.quad_curves, lab_rows)
+        if session.metrics() != expected:
+            mismatches.append(f"edit {number}: {name} × {factor:g} over {lo:.2f}–{hi:.2f}%")
+            session = DensitySession(session.quad_curves, lab_rows)
+    return mismatches
+
+
+def print_joint(session: DensitySession, repeats: int) -> None:
+    joint = session.joint_constants()
+    timings = sorted(session.joint_constants().seconds for _ in range(repeats))
+    greedy_timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        session._calibrate(None)
+        greedy_timings.append(time.perf_counter() - start)
+    greedy_timings.sort()
+
+    print(f"Joint NNLS vs greedy constants ({len(session.active_channels)} channels, {joint.steps} live steps)")
+    print(f"  {'channel':<8} {'greedy':>10} {'joint':>10} {'diff':>10}")
+    for name in session.active_channels:
+        print(f"  {name:<8} {joint.greedy.get(name, 0.0):>10.5f} {joint.constants[name]:>10.5f} {joint.difference[name]:>+10.5f}")
+    print(f"  RMS ΔL* residual: greedy {joint.greedy_residual:.4f}, joint {joint.residual:.4f}")
+    print(f"  solve median: greedy {greedy_timings[len(greedy_timings) // 2] * 1000:.3f} ms, "
+          f"joint {timings[len(timings) // 2] * 1000:.3f} ms over {repeats} runs")
+
+
+def main() -> None:
+    from lab_measurements import read_lab_columns
+    from quad_files import load_quad_curves
+
+    ap = argparse.ArgumentParser(description="Time incremental density re-solves for a channel edit")
+    ap.add_argument("--quad", required=True, help=".quad file")
+    ap.add_argument("--lab", required=True, help="LAB .txt step wedge measured through the quad")
+    ap.add_argument("--channel", help="Channel to edit (e.g. LK)")
+    ap.add_argument("--scale", type=float, default=0.9, help="Factor applied to the channel's draws")
+    ap.add_argument("--from", dest="start", type=float, default=0.0, help="Edit range start (input %%)")
+    ap.add_argument("--to", dest="end", type=float, default=100.0, help="Edit range end (input %%)")
+    ap.add_argument("--repeats", type=int, default=200, help="Edit/undo cycles (or solves with --joint) to time")
+    ap.add_argument("--joint", action="store_true", help="Compare jointly fitted (NNLS) constants with the greedy ones")
+    ap.add_argument("--resample", type=int, default=0, help="Interpolate the wedge onto this many steps first")
+    ap.add_argument("--self-check", type=int, default=0, metavar="EDITS",
+                    help="Check this many random edits against from-scratch solves")
+    ap.add_argument("--seed", type=int, default=0, help="Random seed for --self-check")
+    args = ap.parse_args()
+    if not args.channel and not args.joint and not args.self_check:
+        ap.error("give --channel to time an edit, --joint to compare constants and/or --self-check")
+
+    quad_curves = load_quad_curves(args.quad)
+    lab_rows = read_lab_columns(args.lab).rows()
+    if args.resample:
+        lab_rows = resample_rows(lab_rows, args.resample)
+    if args.channel and args.channel not in quad_curves:
+        ap.error(f"{args.channel} not in {', '.join(quad_curves)}")
+
+    if args.self_check:
+        start = time.perf_counter()
+        mismatches = self_check(quad_curves, lab_rows, args.self_check, args.seed)
+        print(f"Self-check: {args.self_check - len(mismatches)}/{args.self_check} random edits match "
+              f"from-scratch solves ({time.perf_counter() - start:.1f} s)")
+        for line in mismatches:
+            print(f"  MISMATCH {line}")
+        if mismatches:
+            raise SystemExit(1)
+        if not args.channel and not args.joint:
+            return
+
+    start = time.perf_counter()
+    session = DensitySession(quad_curves, lab_rows)
+    full_seconds = time.perf_counter() - start
+    if args.joint:
+        print_joint(session, max(1, args.repeats))
+        if not args.channel:
+            return
+        print()
+    original = list(session.quad_curves[args.channel])
+
+    edit = session.scale_channel(args.channel, args.scale, args.start, args.end)
+    print(f"{args.channel} × {args.scale:g} over {args.start:g}–{args.end:g}%: "
+          f"{len(edit.changed_steps)} step(s) reshared, {len(edit.reallocated_steps)} reallocated, "
+          f"constants changed: {', '.join(edit.recalibrated) or 'none'}")
+    for name, delta in sorted(edit.contribution_delta.items(), key=lambda item: -abs(item[1])):
+        print(f"  {name:<4} contribution {session.contribution_pct[name]:7.2f}%  ({delta:+.3f})")
+
+    timings = []
+    for _ in range(args.repeats):
+        timings.append(session.edit_channel(args.channel, original).seconds)
+        timings.append(session.scale_channel(args.channel, args.scale, args.start, args.end).seconds)
+    timings.sort()
+    print(f"\nFull solve {full_seconds * 1000:.2f} ms; incremental edit median "
+          f"{timings[len(timings) // 2] * 1000:.3f} ms, max {timings[-1] * 1000:.3f} ms over {len(timings)} edits")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Batched colorimetry for measurement arrays.
+
+Every function takes NumPy arrays of any shape (Lab / XYZ triples on the last axis) and
+works element-wise in one pass, so a 10k-patch chart converts and scores in a handful
+of array operations:
+
+  lab_to_xyz / xyz_to_lab          CIE L*a*b* ↔ XYZ relative to the D50 white (ICC PCS)
+  lstar_to_Y / Y_to_lstar          L* ↔ relative luminance Y (0..1)
+  Y_to_density / density_to_Y      optical density D = −log10(Y), clamped as in the pipelines
+  lstar_to_Y_pops                  POPS approximation Y = ((L* + 16) / 116) ** 2.978
+  delta_e_2000                     CIEDE2000 (Sharma, Wu & Dalal 2005)
+
+L* ↔ Y uses the app's constants (knee at L* = 8, κ = 903.3, as in src/js/utils/lab-math.js)
+so results match the scalar ``lstar_to_Y`` / ``Y_to_density`` in compare_density_mappings,
+which stay the references for the density path. ``--validate`` checks the kernels against
+them on a dense L* grid and ΔE2000 against the published Sharma test pairs (vectorized
+and the scalar ``delta_e_2000_scalar`` reference).
+
+``check_neutrality`` flags tinted patches in a ramp: the ΔE2000 between each patch and
+the neutral of the same L* (a* = b* = 0, or the paper white's a*/b* with --paper-relative)
+above a tolerance.
+
+Usage:
+  python scripts/colorimetry.py data/P800.txt [--tolerance 2.0] [--paper-relative] [--all]
+  python scripts/colorimetry.py --validate
+  python scripts/colorimetry.py --benchmark 10000
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import time
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from lab_measurements import LabColumns
+
+D50_WHITE = np.array([0.96422, 1.0, 0.82521])
+LSTAR_KNEE = 8.0
+KAPPA = 903.3
+F_KNEE = (LSTAR_KNEE + 16.0) / 116.0
+Y_KNEE = F_KNEE ** 3
+DENSITY_Y_FLOOR = 1e-6
+POPS_EXPONENT = 2.978
+NEUTRAL_TOLERANCE = 2.0
+HUE_MIN_CHROMA = 0.5
+_POW25_7 = 25.0 ** 7
+
+
+# ---------- L* / Y / density ----------
+
+def lstar_to_Y(L: np.ndarray) -> np.ndarray:
+    L = np.asarray(L, dtype=np.float64)
+    f = (L + 16.0) / 116.0
+    return np.where(L > LSTAR_KNEE, f * f * f, L / KAPPA)
+
+
+def Y_to_lstar(Y: np.ndarray) -> np.ndarray:
+    Y = np.asarray(Y, dtype=np.float64)
+    return np.where(Y > Y_KNEE, 116.0 * np.cbrt(Y) - 16.0, Y * KAPPA)
+
+
+def Y_to_density(Y: np.ndarray) -> np.ndarray:
+    return -np.log10(np.clip(Y, DENSITY_Y_FLOOR, 1.0))
+
+
+def density_to_Y(D: np.ndarray) -> np.ndarray:
+    return np.power(10.0, -np.asarray(D, dtype=np.float64))
+
+
+def lstar_to_density(L: np.ndarray) -> np.ndarray:
+    return Y_to_density(lstar_to_Y(L))
+
+
+def lstar_to_Y_pops(L: np.ndarray) -> np.ndarray:
+    return ((np.asarray(L, dtype=np.float64) + 16.0) / 116.0) ** POPS_EXPONENT
+
+
+# ---------- Lab / XYZ ----------
+
+def _f(t: np.ndarray) -> np.ndarray:
+    return np.where(t > Y_KNEE, np.cbrt(t), (KAPPA * t + 16.0) / 116.0)
+
+
+def _f_inv(f: np.ndarray) -> np.ndarray:
+    return np.where(f > F_KNEE, f * f * f, (116.0 * f - 16.0) / KAPPA)
+
+
+def lab_to_xyz(lab: np.ndarray, white: np.ndarray = D50_WHITE) -> np.ndarray:
+    """(..., 3) L*a*b* → (..., 3) XYZ with Y of the white = 1."""
+    lab = np.asarray(lab, dtype=np.float64)
+    fy = (lab[..., 0] + 16.0) / 116.0
+    fx = fy + lab[..., 1] / 500.0
+    fz = fy - lab[..., 2] / 200.0
+    return np.stack([_f_inv(fx), _f_inv(fy), _f_inv(fz)], axis=-1) * white
+
+
+def xyz_to_lab(xyz: np.ndarray, white: np.ndarray = D50_WHITE) -> np.ndarray:
+    """(..., 3) XYZ → (..., 3) L*a*b*."""
+    scaled = np.asarray(xyz, dtype=np.float64) / white
+    fx, fy, fz = (_f(scaled[..., k]) for k in range(3))
+    return np.stack([116.0 * fy - 16.0, 500.0 * (fx - fy), 200.0 * (fy - fz)], axis=-1)
+
+
+# ---------- ΔE2000 ----------
+
+def delta_e_2000(lab1: np.ndarray, lab2: np.ndarray, kL: float = 1.0, kC: float = 1.0, kH: float = 1.0) -> np.ndarray:
+    """CIEDE2000 between broadcastable (..., 3) Lab arrays."""
+    lab1 = np.asarray(lab1, dtype=np.float64)
+    lab2 = np.asarray(lab2, dtype=np.float64)
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    c_bar7 = ((np.hypot(a1, b1) + np.hypot(a2, b2)) / 2.0) ** 7
+    g = 0.5 * (1.0 - np.sqrt(c_bar7 / (c_bar7 + _POW25_7)))
+    a1p = (1.0 + g) * a1
+    a2p = (1.0 + g) * a2
+    c1p = np.hypot(a1p, b1)
+    c2p = np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360.0
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360.0
+
+    achromatic = c1p * c2p == 0.0
+    dh = h2p - h1p
+    dh = np.where(dh > 180.0, dh - 360.0, np.where(dh < -180.0, dh + 360.0, dh))
+    dh = np.where(achromatic, 0.0, dh)
+    d_l = L2 - L1
+    d_c = c2p - c1p
+    d_h = 2.0 * np.sqrt(c1p * c2p) * np.sin(np.radians(dh / 2.0))
+
+    l_bar = (L1 + L2) / 2.0
+    c_bar_p = (c1p + c2p) / 2.0
+    h_sum = h1p + h2p
+    h_bar = np.where(
+        achromatic,
+        h_sum,
+        np.where(np.abs(h1p - h2p) <= 180.0, h_sum / 2.0,
+                 np.where(h_sum < 360.0, (h_sum + 360.0) / 2.0, (h_sum - 360.0) / 2.0)),
+    )
+    t = (
+        1.0
+        - 0.17 * np.cos(np.radians(h_bar - 30.0))
+        + 0.24 * np.cos(np.radians(2.0 * h_bar))
+        + 0.32 * np.cos(np.radians(3.0 * h_bar + 6.0))
+        - 0.20 * np.cos(np.radians(4.0 * h_bar - 63.0))
+    )
+    d_theta = 30.0 * np.exp(-(((h_bar - 275.0) / 25.0) ** 2))
+    c_bar_p7 = c_bar_p ** 7
+    r_c = 2.0 * np.sqrt(c_bar_p7 / (c_bar_p7 + _POW25_7))
+    l_off = (l_bar - 50.0) ** 2
+    s_l = 1.0 + 0.015 * l_off / np.sqrt(20.0 + l_off)
+    s_c = 1.0 + 0.045 * c_bar_p
+    s_h = 1.0 + 0.015 * c_bar_p * t
+    r_t = -np.sin(np.radians(2.0 * d_theta)) * r_c
+
+    term_l = d_l / (kL * s_l)
+    term_c = d_c / (kC * s_c)
+    term_h = d_h / (kH * s_h)
+    return np.sqrt(term_l * term_l + term_c * term_c + term_h * term_h + r_t * term_c * term_h)
+
+
+def delta_e_2000_scalar(lab1: Sequence[float], lab2: Sequence[float]) -> float:
+    """Straight transcription of Sharma et al.; the reference for ``delta_e_2000``."""
+    L1, a1, b1 = lab1
+    L2, a2, b2 = lab2
+    c_bar = (math.hypot(a1, b1) + math.hypot(a2, b2)) / 2.0
+    g = 0.5 * (1.0 - math.sqrt(c_bar ** 7 / (c_bar ** 7 + _POW25_7)))
+    a1p, a2p = (1.0 + g) * a1, (1.0 + g) * a2
+    c1p, c2p = math.hypot(a1p, b1), math.hypot(a2p, b2)
+    h1p = math.degrees(math.atan2(b1, a1p)) % 360.0 if c1p else 0.0
+    h2p = math.degrees(math.atan2(b2, a2p)) % 360.0 if c2p else 0.0
+
+    if c1p * c2p == 0.0:
+        dh = 0.0
+        h_bar = h1p + h2p
+    else:
+        dh = h2p - h1p
+        if dh > 180.0:
+            dh -= 360.0
+        elif dh < -180.0:
+            dh += 360.0
+        if abs(h1p - h2p) <= 180.0:
+            h_bar = (h1p + h2p) / 2.0
+        elif h1p + h2p < 360.0:
+            h_bar = (h1p + h2p + 360.0) / 2.0
+        else:
+            h_bar = (h1p + h2p - 360.0) / 2.0
+    d_h = 2.0 * math.sqrt(c1p * c2p) * math.sin(math.radians(dh / 2.0))
+
+    l_bar = (L1 + L2) / 2.0
+    c_bar_p = (c1p + c2p) / 2.0
+    t = (1.0 - 0.17 * math.cos(math.radians(h_bar - 30.0)) + 0.24 * math.cos(math.radians(2.0 * h_bar))
+         + 0.32 * math.cos(math.radians(3.0 * h_bar + 6.0)) - 0.20 * math.cos(math.radians(4.0 * h_bar - 63.0)))
+    d_theta = 30.0 * math.exp(-(((h_bar - 275.0) / 25.0) ** 2))
+    r_c = 2.0 * math.sqrt(c_bar_p ** 7 / (c_bar_p ** 7 + _POW25_7))
+    s_l = 1.0 + 0.015 * (l_bar - 50.0) ** 2 / math.sqrt(20.0 + (l_bar - 50.0) ** 2)
+    s_c = 1.0 + 0.045 * c_bar_p
+    s_h = 1.0 + 0.015 * c_bar_p * t
+    r_t = -math.sin(math.radians(2.0 * d_theta)) * r_c
+    term_l, term_c, term_h = (L2 - L1) / s_l, (c2p - c1p) / s_c, d_h / s_h
+    return math.sqrt(term_l ** 2 + term_c ** 2 + term_h ** 2 + r_t * term_c * term_h)
+
+
+# Sharma, Wu & Dalal (2005), Table 1: (Lab 1, Lab 2, ΔE00).
+SHARMA_PAIRS: Tuple[Tuple[Tuple[float, float, float], Tuple[float, float, float], float], ...] = (
+    ((50.0000, 2.6772, -79.7751), (50.0000, 0.0000, -82.7485), 2.0425),
+    ((50.0000, 3.1571, -77.2803), (50.0000, 0.0000, -82.7485), 2.8615),
+    ((50.0000, 2.8361, -74.0200), (50.0000, 0.0000, -82.7485), 3.4412),
+    ((50.0000, -1.3802, -84.2814), (50.0000, 0.0000, -82.7485), 1.0000),
+    ((50.0000, -1.1848, -84.8006), (50.0000, 0.0000, -82.7485), 1.0000),
+    ((50.0000, -0.9009, -85.5211), (50.0000, 0.0000, -82.7485), 1.0000),
+    ((50.0000, 0.0000, 0.0000), (50.0000, -1.0000, 2.0000), 2.3669),
+    ((50.0000, -1.0000, 2.0000), (50.0000, 0.0000, 0.0000), 2.3669),
+    ((50.0000, 2.4900, -0.0010), (50.0000, -2.4900, 0.0009), 7.1792),
+    ((50.0000, 2.4900, -0.0010), (50.0000, -2.4900, 0.0010), 7.1792),
+    ((50.0000, 2.4900, -0.0010), (50.0000, -2.4900, 0.0011), 7.2195),
+    ((50.0000, 2.4900, -0.0010), (50.0000, -2.4900, 0.0012), 7.2195),
+    ((50.0000, -0.0010, 2.4900), (50.0000, 0.0009, -2.4900), 4.8045),
+    ((50.0000, -0.0010, 2.4900), (50.0000, 0.0010, -2.4900), 4.8045),
+    ((50.0000, -0.0010, 2.4900), (50.0000, 0.0011, -2.4900), 4.7461),
+    ((50.0000, 2.5000, 0.0000), (50.0000, 0.0000, -2.5000), 4.3065),
+    ((50.0000, 2.5000, 0.0000), (73.0000, 25.0000, -18.0000), 27.1492),
+    ((50.0000, 2.5000, 0.0000), (61.0000, -5.0000, 29.0000), 22.8977),
+    ((50.0000, 2.5000, 0.0000), (56.0000, -27.0000, -3.0000), 31.9030),
+    ((50.0000, 2.5000, 0.0000), (58.0000, 24.0000, 15.0000), 19.4535),
+    ((50.0000, 2.5000, 0.0000), (50.0000, 3.1736, 0.5854), 1.0000),
+    ((50.0000, 2.5000, 0.0000), (50.0000, 3.2972, 0.0000), 1.0000),
+    ((50.0000, 2.5000, 0.0000), (50.0000, 1.8634, 0.5757), 1.0000),
+    ((50.0000, 2.5000, 0.0000), (50.0000, 3.2592, 0.3350), 1.0000),
+    ((60.2574, -34.0099, 36.2677), (60.4626, -34.1751, 39.4387), 1.2644),
+    ((63.0109, -31.0961, -5.8663), (62.8187, -29.7946, -4.0864), 1.2630),
+    ((61.2901, 3.7196, -5.3901), (61.4292, 2.2480, -4.9620), 1.8731),
+    ((35.0831, -44.1164, 3.7933), (35.0232, -40.0716, 1.5901), 1.8645),
+    ((22.7233, 20.0904, -46.6940), (23.0331, 14.9730, -42.5619), 2.0373),
+    ((36.4612, 47.8580, 18.3852), (36.2715, 50.5065, 21.2231), 1.4146),
+    ((90.8027, -2.0831, 1.4410), (91.1528, -1.6435, 0.0447), 1.4441),
+    ((90.9257, -0.5406, -0.9208), (88.6381, -0.8985, -0.7239), 1.5381),
+    ((6.7747, -0.2908, -2.4247), (5.8714, -0.0985, -2.2286), 0.6377),
+    ((2.0776, 0.0795, -1.1350), (0.9033, -0.0636, -0.5514), 0.9082),
+)
+
+
+# ---------- Neutrality ----------
+
+@dataclass
+class NeutralityReport:
+    gray: np.ndarray
+    lab: np.ndarray
+    """(patches, 3) measured L*a*b*."""
+    delta_e: np.ndarray
+    """ΔE2000 to the neutral of the same L*."""
+    chroma: np.ndarray
+    hue: np.ndarray
+    """Hue angle h_ab in degrees (0 = +a*, 90 = +b*)."""
+    tinted: np.ndarray
+    tolerance: float
+    reference: Tuple[float, float]
+    """a*, b* of the neutral axis the patches were scored against."""
+
+
+def check_neutrality(columns: LabColumns, tolerance: float = NEUTRAL_TOLERANCE, paper_relative: bool = False) -> NeutralityReport:
+    """Score every patch against the neutral axis in one ΔE2000 pass."""
+    lab = np.stack([columns.lab_l, columns.lab_a, columns.lab_b], axis=-1)
+    reference = (0.0, 0.0)
+    if paper_relative and lab.shape[0]:
+        paper = lab[int(np.argmax(lab[:, 0]))]
+        reference = (float(paper[1]), float(paper[2]))
+    neutral = np.stack([lab[:, 0], np.full(lab.shape[0], reference[0]), np.full(lab.shape[0], reference[1])], axis=-1)
+    delta_e = delta_e_2000(lab, neutral)
+    da = lab[:, 1] - reference[0]
+    db = lab[:, 2] - reference[1]
+    return NeutralityReport(
+        gray=columns.gray,
+        lab=lab,
+        delta_e=delta_e,
+        chroma=np.hypot(da, db),
+        hue=np.degrees(np.arctan2(db, da)) % 360.0,
+        tinted=delta_e > tolerance,
+        tolerance=tolerance,
+        reference=reference,
+    )
+
+
+def hue_name(hue: float, chroma: float) -> str:
+    if chroma < HUE_MIN_CHROMA:
+        return "neutral"
+    names = ("red", "yellow", "green", "cyan", "blue", "magenta")
+    # Lab hue angles of the six primaries are uneven; this is only a coarse label.
+    bounds = (60.0, 135.0, 190.0, 250.0, 320.0)
+    for bound, name in zip(bounds, names):
+        if hue < bound:
+            return name
+    return names[-1] if hue < 345.0 else names[0]
+
+
+def print_neutrality(report: NeutralityReport, show_all: bool = False) -> None:
+    count = int(report.tinted.sum())
+    axis = "a*=b*=0" if report.reference == (0.0, 0.0) else f"paper a*={report.reference[0]:.2f} b*={report.reference[1]:.2f}"
+    print(f"Neutrality ({axis}): {count}/{report.gray.shape[0]} patch(es) tinted beyond ΔE00 {report.tolerance:g}")
+    if report.gray.shape[0]:
+        worst = int(report.delta_e.argmax())
+        print(f"  worst ΔE00 {report.delta_e[worst]:.2f} at {report.gray[worst]:g}% "
+              f"(C*={report.chroma[worst]:.2f}, {hue_name(report.hue[worst], report.chroma[worst])}); "
+              f"median {np.median(report.delta_e):.2f}")
+    rows = range(report.gray.shape[0]) if show_all else np.flatnonzero(report.tinted)
+    for idx in rows:
+        L, a, b = report.lab[idx]
+        flag = "  TINT" if report.tinted[idx] else ""
+        print(f"    {report.gray[idx]:7.2f}%  L*={L:7.3f} a*={a:6.2f} b*={b:6.2f}  "
+              f"ΔE00={report.delta_e[idx]:5.2f}  h={report.hue[idx]:5.1f}° {hue_name(report.hue[idx], report.chroma[idx]):<7}{flag}")
+
+
+# ---------- Validation / benchmark ----------
+
+def validate() -> List[str]:
+    """Check the kernels against the scalar references; returns failure messages."""
+    from compare_density_mappings import Y_to_density as Y_to_density_ref, lstar_to_Y as lstar_to_Y_ref
+
+    failures: List[str] = []
+    grid = np.linspace(-5.0, 105.0, 110_001)
+    y_ref = np.array([lstar_to_Y_ref(L) for L in grid.tolist()])
+    if not np.array_equal(lstar_to_Y(grid), y_ref):
+        failures.append("lstar_to_Y differs from compare_density_mappings.lstar_to_Y")
+    d_ref = np.array([Y_to_density_ref(Y) for Y in y_ref.tolist()])
+    d_err = np.abs(Y_to_density(y_ref) - d_ref).max()
+    if d_err > 4 * np.finfo(np.float64).eps:
+        failures.append(f"Y_to_density differs from the scalar reference by {d_err:.3g}")
+    round_trip = np.abs(Y_to_lstar(lstar_to_Y(grid[grid >= 0.0])) - grid[grid >= 0.0]).max()
+    if round_trip > 1e-9:
+        failures.append(f"L* → Y → L* round trip error {round_trip:.3g}")
+
+    rng = np.random.default_rng(0)
+    lab = np.column_stack([rng.uniform(0.0, 100.0, 10_000), rng.uniform(-80.0, 80.0, (10_000, 2))])
+    lab_err = np.abs(xyz_to_lab(lab_to_xyz(lab)) - lab).max()
+    if lab_err > 1e-9:
+        failures.append(f"Lab → XYZ → Lab round trip error {lab_err:.3g}")
+    if not np.allclose(lab_to_xyz(np.array([100.0, 0.0, 0.0])), D50_WHITE):
+        failures.append("L*=100 neutral does not map to the D50 white")
+
+    first = np.array([pair[0] for pair in SHARMA_PAIRS])
+    second = np.array([pair[1] for pair in SHARMA_PAIRS])
+    expected = np.array([pair[2] for pair in SHARMA_PAIRS])
+    vector = delta_e_2000(first, second)
+    scalar = np.array([delta_e_2000_scalar(p, q) for p, q, _ in SHARMA_PAIRS])
+    for name, values in (("delta_e_2000", vector), ("delta_e_2000_scalar", scalar)):
+        bad = np.flatnonzero(np.abs(values - expected) > 5e-5)
+        failures.extend(f"{name}: Sharma pair {i + 1} gave {values[i]:.4f}, expected {expected[i]:.4f}" for i in bad)
+    random_vec = delta_e_2000(lab[:5000], lab[5000:])
+    random_ref = np.array([delta_e_2000_scalar(p, q) for p, q in zip(lab[:5000].tolist(), lab[5000:].tolist())])
+    de_err = np.abs(random_vec - random_ref).max()
+    if de_err > 1e-9:
+        failures.append(f"delta_e_2000 differs from the scalar reference by {de_err:.3g} on random pairs")
+    return failures
+
+
+def benchmark(patches: int) -> None:
+    from compare_density_mappings import Y_to_density as Y_to_density_ref, lstar_to_Y as lstar_to_Y_ref
+
+    rng = np.random.default_rng(0)
+    gray = np.linspace(0.0, 100.0, patches)
+    columns = LabColumns.from_arrays(
+        "synthetic", gray, 96.0 - 0.9 * gray + rng.normal(0.0, 0.3, patches),
+        rng.normal(0.0, 1.0, patches), rng.normal(0.0, 1.0, patches),
+    )
+    start = time.perf_counter()
+    lab = np.stack([columns.lab_l, columns.lab_a, columns.lab_b], axis=-1)
+    xyz = lab_to_xyz(lab)
+    density = Y_to_density(xyz[:, 1])
+    report = check_neutrality(columns)
+    vector_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    scalar_density = [Y_to_density_ref(lstar_to_Y_ref(L)) for L in columns.lab_l.tolist()]
+    scalar_de = [delta_e_2000_scalar(p, (p[0], 0.0, 0.0)) for p in lab.tolist()]
+    scalar_ms = (time.perf_counter() - start) * 1000
+    agree = np.abs(np.array(scalar_de) - report.delta_e).max()
+    print(f"{patches} patches: Lab→XYZ→density + ΔE00 neutrality in {vector_ms:.2f} ms "
+          f"(scalar density + ΔE00 loops {scalar_ms:.1f} ms, ×{scalar_ms / max(vector_ms, 1e-9):.0f})")
+    print(f"  density max |Δ| vs scalar {np.abs(density - np.array(scalar_density)).max():.2g}, "
+          f"ΔE00 max |Δ| {agree:.2g}, {int(report.tinted.sum())} tinted")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Neutrality check and colorimetry kernel validation")
+    ap.add_argument("input", nargs="?", help="LAB .txt or CGATS.17/.ti3 measurement file")
+    ap.add_argument("--tolerance", type=float, default=NEUTRAL_TOLERANCE, help="ΔE00 to neutral above which a patch is tinted")
+    ap.add_argument("--paper-relative", action="store_true", help="Score against the paper white's a*/b* instead of a*=b*=0")
+    ap.add_argument("--all", action="store_true", help="List every patch, not just tinted ones")
+    ap.add_argument("--validate", action="store_true", help="Check the kernels against the scalar references and Sharma pairs")
+    ap.add_argument("--benchmark", type=int, default=0, metavar="PATCHES", help="Time a synthetic chart of this many patches")
+    args = ap.parse_args()
+
+    if args.validate:
+        failures = validate()
+        for failure in failures:
+            print(f"FAIL {failure}")
+        print(f"{'ok' if not failures else f'{len(failures)} failure(s)'}: "
+              f"L*/Y/density vs scalar references, Lab/XYZ round trip, {len(SHARMA_PAIRS)} Sharma ΔE00 pairs")
+        if failures:
+            raise SystemExit(1)
+    if args.benchmark:
+        benchmark(args.benchmark)
+    if args.input:
+        from compare_density_mappings import load_measurement_columns
+
+        print_neutrality(check_neutrality(load_measurement_columns(args.input), args.tolerance, args.paper_relative), args.all)
+    elif not (args.validate or args.benchmark):
+        ap.error("pass a measurement file, --validate or --benchmark")
+
+
+if __name__ == "__main__":
+    main()
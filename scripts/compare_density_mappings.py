@@ -6,7 +6,14 @@ Compare three L*→density mapping pipelines on a LAB measurement file:
   2) cie     – CIE-exact luminance → optical density (−log10(Y)) normalized
   3) hybrid  – legacy in highlights, CIE elsewhere with a smooth transition
 
-Input format: Color Muse style LAB .txt with header 'GRAY\tLAB_L\tLAB_A\tLAB_B'.
+CIE-normalized densities are also reconstructed with a natural cubic spline
+('segment_cubic') and a monotone PCHIP through isotonic knots ('pchip').
+
+When a .ti3 input carries SPEC_* reflectance, a 'spectral' pipeline (visual density
+integrated from the spectra, see scripts/spectral_density.py) is added to the report.
+
+Input format: Color Muse style LAB .txt with header 'GRAY\tLAB_L\tLAB_A\tLAB_B', or a
+CGATS.17 / ArgyllCMS .ti3 file (neutral ramp extracted by scripts/cgats_reader.py).
 
 Outputs a textual report comparing:
   - Residual magnitudes by region (0–10%, 10–90%, 90–100%)
@@ -14,11 +21,22 @@ Outputs a textual report comparing:
   - Midtone slope at t=0.5
   - Pairwise RMS differences between corrected curves
 
+Photoshop .acv curves given with --acv are evaluated in printer space and reported
+alongside the pipelines (curve metrics only; they have no measured points).
+
+--check-neutrality adds a ΔE2000-to-neutral score per patch (scripts/colorimetry.py) and
+flags tinted patches in the ramp.
+
+A LAB .txt with a LAB_L_SD column (e.g. from scripts/replicate_merge.py) weights each
+patch by its inverse L* variance in the Gaussian and PCHIP reconstructions.
+
 Optionally writes CSV of the corrected curves.
 
 Usage:
   python scripts/compare_density_mappings.py --input data/Color-Muse-Data.txt \
-      [--sigma 0.15] [--threshold 0.12] [--rolloff 0.10] [--export-curves curves.csv]
+      [--sigma 0.15] [--threshold 0.12] [--rolloff 0.10] [--export-curves curves.csv] \
+      [--acv testdata/midtone_lift.acv] [--auto-sigma [--cv-folds 5] [--export-cv cv.csv]] \
+      [--check-neutrality [--neutral-tolerance 2.0]]
 
 """
 from __future__ import annotations
@@ -28,9 +46,20 @@ import math
 import os
 import statistics
 from dataclasses import dataclass
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, Sequence
+
+import numpy as np
+
+from acv_curves import correction_curve as acv_correction_curve
+from interpolation import pchip_interpolate
+from cgats_reader import is_cgats, read_neutral_ramp
+from lab_measurements import LabColumns, read_lab_columns
+from spectral_density import read_ramp_densities
 
 EPS = 1e-6
+GAUSSIAN_METHODS = ('legacy', 'cie', 'hybrid', 'pops', 'spectral')
+SIGMA_CANDIDATES = np.geomspace(0.01, 0.5, 100)
+SD_FLOOR = 0.1  # L*; keeps patches with one read or identical reads from dominating the weights
 
 
 # ---------- Parsing ----------
@@ -41,33 +70,49 @@ def parse_lab_txt(path: str) -> List[Tuple[float, float]]:
     """
     if not os.path.exists(path):
         raise FileNotFoundError(f"Input file not found: {path}")
-    pairs: List[Tuple[float, float]] = []
-    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-        for i, line in enumerate(f):
-            line = line.strip()
-            if not line:
-                continue
-            # Skip header line if it contains GRAY or LAB
-            if i == 0 and ("GRAY" in line.upper() or "LAB" in line.upper()):
-                continue
-            # Split by tab or comma
-            parts = [p.strip() for p in line.replace(',', '\t').split('\t') if p.strip()]
-            if len(parts) < 2:
-                continue
-            try:
-                x = float(parts[0])
-                L = float(parts[1])
-            except ValueError:
-                continue
-            if 0.0 <= x <= 100.0 and 0.0 <= L <= 100.0:
-                pairs.append((x, L))
+    pairs = _in_range(read_lab_columns(path)).pairs()
     if len(pairs) < 2:
         raise ValueError("Not enough rows parsed; expected at least 2 measurement pairs.")
-    # Sort by input percent
-    pairs.sort(key=lambda t: t[0])
     return pairs
 
 
+def _in_range(columns: LabColumns) -> LabColumns:
+    return columns.select((columns.gray >= 0.0) & (columns.gray <= 100.0) &
+                          (columns.lab_l >= 0.0) & (columns.lab_l <= 100.0))
+
+
+def load_measurement_pairs(path: str) -> List[Tuple[float, float]]:
+    """Dispatch on file type: CGATS.17/.ti3 neutral ramp or LAB .txt."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Input file not found: {path}")
+    if is_cgats(path):
+        pairs = read_neutral_ramp(path).pairs()
+        if len(pairs) < 2:
+            raise ValueError("Not enough neutral patches; expected at least 2 measurement pairs.")
+        return pairs
+    return parse_lab_txt(path)
+
+
+def load_measurement_columns(path: str) -> LabColumns:
+    """The columns behind ``load_measurement_pairs``, with a*/b* kept."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Input file not found: {path}")
+    if is_cgats(path):
+        return read_neutral_ramp(path).columns
+    return _in_range(read_lab_columns(path))
+
+
+def load_measurement_weights(path: str) -> Optional[List[float]]:
+    """Inverse-variance weights from a LAB_L_SD column (e.g. merged replicates), aligned with
+    ``load_measurement_pairs``; None when the file has no per-patch deviations."""
+    if is_cgats(path):
+        return None
+    sd = _in_range(read_lab_columns(path)).lab_l_sd
+    if sd is None:
+        return None
+    return (1.0 / (sd * sd + SD_FLOOR * SD_FLOOR)).tolist()
+
+
 # ---------- Mapping helpers ----------
 
 def lstar_to_Y(L: float) -> float:
@@ -85,6 +130,11 @@ def Y_to_density(Y: float) -> float:
     return -math.log10(Yc)
 
 
+def Y_pops(L: float) -> float:
+    """POPS-like luminance: a single power law instead of the piecewise CIE inverse."""
+    return ((L + 16.0) / 116.0) ** 2.978
+
+
 def density_legacy(L: float, Lmin: float, Lmax: float) -> float:
     r = max(EPS, (Lmax - Lmin))
     return 1.0 - (L - Lmin) / r
@@ -132,9 +182,15 @@ def hybrid_density(L: float, pos: float, ctx: HybridContext) -> float:
 
 # ---------- Reconstruction ----------
 
-def gaussian_corrected_curve(positions: List[float], residuals: List[float], sigma: float) -> List[float]:
-    """Gaussian-weighted reconstruction of corrected(t) sampled on 256 steps."""
+def gaussian_corrected_curve(positions: List[float], residuals: List[float], sigma: float,
+                             weights: Optional[Sequence[float]] = None) -> List[float]:
+    """Gaussian-weighted reconstruction of corrected(t) sampled on 256 steps.
+
+    Optional per-patch ``weights`` (e.g. inverse variances) scale each patch's kernel.
+    """
     assert len(positions) == len(residuals)
+    if weights is None:
+        weights = [1.0] * len(positions)
     n = 256
     out = [0.0] * n
     sig2 = 2.0 * sigma * sigma
@@ -142,9 +198,9 @@ def gaussian_corrected_curve(positions: List[float], residuals: List[float], sig
         t = i / (n - 1)
         num = 0.0
         den = 0.0
-        for p, r in zip(positions, residuals):
+        for p, r, q in zip(positions, residuals, weights):
             d = abs(t - p)
-            w = math.exp(-(d * d) / max(EPS, sig2))
+            w = q * math.exp(-(d * d) / max(EPS, sig2))
             num += r * w
             den += w
         corr = (num / den) if den > 0 else 0.0
@@ -155,6 +211,52 @@ def gaussian_corrected_curve(positions: List[float], residuals: List[float], sig
     return out
 
 
+def cv_sigma_errors(positions: Sequence[float], residuals: Sequence[float], sigmas: Sequence[float],
+                    folds: int = 0, weights: Optional[Sequence[float]] = None) -> np.ndarray:
+    """Cross-validated MSE of the Gaussian residual smoother for each candidate sigma.
+
+    The smoother is a normalized kernel average, so held-out predictions need no refit:
+    zeroing the held-out entries of the kernel matrix (the diagonal for leave-one-out,
+    same-fold blocks for k-fold) and renormalizing gives them directly. Each candidate
+    costs one (patches × patches) kernel pass, reusing a single buffer. Folds interleave
+    patches in input order. ``weights`` scale the kernel columns exactly as in
+    ``gaussian_corrected_curve`` and weight the held-out errors, so the chosen sigma is
+    tuned for the weighted reconstruction that will use it.
+    """
+    p = np.asarray(positions, dtype=np.float64)
+    r = np.asarray(residuals, dtype=np.float64)
+    s = np.asarray(sigmas, dtype=np.float64)
+    n = p.shape[0]
+    q = np.ones(n) if weights is None else np.asarray(weights, dtype=np.float64)
+    if q.shape[0] != n:
+        raise ValueError("Expected one weight per patch")
+    order = np.argsort(p, kind='stable')
+    fold = np.empty(n, dtype=np.intp)
+    fold[order] = np.arange(n) % (folds if 1 < folds < n else n)
+    d2 = (p[:, None] - p[None, :]) ** 2
+    held_in = np.where(fold[:, None] != fold[None, :], q[None, :], 0.0)
+    kernel = np.empty_like(d2)
+    errors = np.empty(s.shape[0])
+    for k, sigma in enumerate(s.tolist()):
+        np.multiply(d2, -1.0 / max(EPS, 2.0 * sigma * sigma), out=kernel)
+        np.exp(kernel, out=kernel)
+        kernel *= held_in
+        num = kernel @ r
+        den = kernel.sum(axis=1)
+        pred = np.where(den > 1e-12, num / np.where(den > 1e-12, den, 1.0), 0.0)
+        errors[k] = float(np.dot(q, (r - pred) ** 2) / q.sum())
+    return errors
+
+
+def select_sigma(positions: Sequence[float], residuals: Sequence[float],
+                 sigmas: Sequence[float] = SIGMA_CANDIDATES, folds: int = 0,
+                 weights: Optional[Sequence[float]] = None) -> Tuple[float, np.ndarray]:
+    """Return (best sigma, CV error per candidate); ties go to the larger, smoother sigma."""
+    errors = cv_sigma_errors(positions, residuals, sigmas, folds, weights)
+    best = np.flatnonzero(errors <= errors.min() * (1.0 + 1e-9))[-1]
+    return float(np.asarray(sigmas)[best]), errors
+
+
 def _natural_cubic_second_derivatives(x: List[float], y: List[float]) -> List[float]:
     n = len(x)
     if n < 2:
@@ -233,6 +335,55 @@ def segment_cubic_corrected_curve(positions: List[float], residuals: List[float]
     return out
 
 
+def _pool_adjacent_violators(values: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Weighted isotonic (non-decreasing) least-squares fit in O(N)."""
+    means: List[float] = []
+    sizes: List[float] = []
+    counts: List[int] = []
+    for v, w in zip(values.tolist(), weights.tolist()):
+        means.append(v)
+        sizes.append(w)
+        counts.append(1)
+        while len(means) > 1 and means[-2] > means[-1]:
+            w_sum = sizes[-2] + sizes[-1]
+            means[-2] = (means[-2] * sizes[-2] + means[-1] * sizes[-1]) / w_sum
+            sizes[-2] = w_sum
+            counts[-2] += counts[-1]
+            means.pop(); sizes.pop(); counts.pop()
+    return np.repeat(means, counts)
+
+
+def pchip_corrected_curve(positions: List[float], residuals: List[float], samples: int = 256,
+                          weights: Optional[Sequence[float]] = None) -> List[float]:
+    """Monotone corrected(t) through the measured points, sampled at ``samples`` steps.
+
+    Knots are corrected values t + residual at each measured position (coincident
+    positions averaged), anchored at (0, 0) and (1, 1). Knots that would reverse the
+    curve are pooled to a non-decreasing sequence (isotonic fit), then a PCHIP through
+    them is monotone and stays in 0..1 by construction, so no output clamping is needed.
+    Construction is linear in the patch count; evaluation is one vectorized pass.
+    Optional per-patch ``weights`` weight both the averaging and the isotonic pooling.
+    """
+    assert len(positions) == len(residuals)
+    t = np.linspace(0.0, 1.0, samples)
+    p = np.asarray(positions, dtype=np.float64)
+    y = p + np.asarray(residuals, dtype=np.float64)
+    q = np.ones_like(p) if weights is None else np.asarray(weights, dtype=np.float64)
+    inner = (p > 0.0) & (p < 1.0)
+    if not inner.any():
+        return t.tolist()
+    order = np.argsort(p[inner], kind='stable')
+    p, y, q = p[inner][order], y[inner][order], q[inner][order]
+    knots, first = np.unique(p, return_index=True)
+    counts = np.add.reduceat(q, first)
+    values = np.add.reduceat(y * q, first) / counts
+    x = np.concatenate(([0.0], knots, [1.0]))
+    v = np.concatenate(([0.0], np.clip(values, 0.0, 1.0), [1.0]))
+    w = np.concatenate(([1e9], counts, [1e9]))  # anchors are fixed
+    v = _pool_adjacent_violators(v, w)
+    return pchip_interpolate(x, v, t).tolist()
+
+
 # ---------- Pipelines ----------
 
 @dataclass
@@ -245,7 +396,16 @@ class PipelineResult:
     corrected: List[float]
 
 
-def run_pipeline(pairs: List[Tuple[float, float]], method: str, sigma: float, threshold: float, rolloff: float) -> PipelineResult:
+def run_pipeline(pairs: List[Tuple[float, float]], method: str, sigma: float, threshold: float, rolloff: float,
+                 densities: Optional[Sequence[float]] = None,
+                 weights: Optional[Sequence[float]] = None) -> PipelineResult:
+    """Map L* to density with ``method`` and reconstruct corrected(t).
+
+    ``weights`` (one per pair, e.g. from ``load_measurement_weights``) weight the Gaussian
+    and PCHIP reconstructions; the interpolating cubic ignores them.
+    """
+    if weights is not None and len(weights) != len(pairs):
+        raise ValueError("Expected one weight per measurement pair")
     xs = [x for x, _ in pairs]
     Ls = [L for _, L in pairs]
     positions = [max(0.0, min(1.0, x / 100.0)) for x in xs]
@@ -260,15 +420,19 @@ def run_pipeline(pairs: List[Tuple[float, float]], method: str, sigma: float, th
     elif method == 'hybrid':
         ctx = build_hybrid_ctx(Ls, threshold=threshold, rolloff=rolloff)
         actual = [hybrid_density(L, pos, ctx) for L, pos in zip(Ls, positions)]
-    elif method in ('cie_cubic', 'segment_cubic'):
+    elif method in ('cie_cubic', 'segment_cubic', 'pchip'):
         # Same CIE-normalized mapping as 'cie'; different reconstruction later
         Dmax = max(Y_to_density(lstar_to_Y(L)) for L in Ls)
         actual = [density_cie_norm(L, Dmax) for L in Ls]
+    elif method == 'spectral':
+        # Spectrally integrated densities (one per pair), CIE-style Dmax normalization
+        if densities is None or len(densities) != len(pairs):
+            raise ValueError("Method 'spectral' needs one spectral density per measurement pair")
+        Dmax = max(densities)
+        actual = [(D / Dmax) if Dmax > EPS else 0.0 for D in densities]
     elif method == 'pops':
         # POPS-like: approximate Y using exponent 2.978 (no piecewise), then D = -log10(Y)
         # No normalization of actual; scale expected to the same units via Dmax_pops
-        def Y_pops(L: float) -> float:
-            return ((L + 16.0) / 116.0) ** 2.978
         Dvals = [Y_to_density(Y_pops(L)) for L in Ls]
         Dmax_pops = max(Dvals) if Dvals else 1.0
         actual = Dvals[:]  # unnormalized actual densities
@@ -279,16 +443,23 @@ def run_pipeline(pairs: List[Tuple[float, float]], method: str, sigma: float, th
 
     residuals = [e - a for e, a in zip(expected, actual)]
     # Reconstruction method
-    if method in ('legacy', 'cie', 'hybrid', 'pops'):
-        corrected = gaussian_corrected_curve(positions, residuals, sigma=sigma)
+    if method in ('legacy', 'cie', 'hybrid', 'pops', 'spectral'):
+        corrected = gaussian_corrected_curve(positions, residuals, sigma=sigma, weights=weights)
     elif method in ('cie_cubic', 'segment_cubic'):
         corrected = segment_cubic_corrected_curve(positions, residuals)
+    elif method == 'pchip':
+        corrected = pchip_corrected_curve(positions, residuals, weights=weights)
     else:
-        corrected = gaussian_corrected_curve(positions, residuals, sigma=sigma)
+        corrected = gaussian_corrected_curve(positions, residuals, sigma=sigma, weights=weights)
 
     return PipelineResult(name=method, positions=positions, expected=expected, actual=actual, residuals=residuals, corrected=corrected)
 
 
+def external_curve_result(name: str, corrected: List[float]) -> PipelineResult:
+    """Wrap a correction curve from another source (e.g. .acv) for the report; it has no measured points."""
+    return PipelineResult(name=name, positions=[], expected=[], actual=[], residuals=[], corrected=list(corrected))
+
+
 # ---------- Metrics & Report ----------
 
 def region_mask(n: int, lo: float, hi: float) -> List[int]:
@@ -321,44 +492,44 @@ def rms_diff(a: List[float], b: List[float]) -> float:
     return math.sqrt(sum((a[i] - b[i]) ** 2 for i in range(n)) / n)
 
 
+def region_stats(pr: PipelineResult) -> Dict[str, float]:
+    """Per-region residual and correction magnitudes plus midtone slope (the report's metrics)."""
+    N = len(pr.corrected)
+    # Residuals are at measured points; compute grouped by position
+    pos = pr.positions
+    res = pr.residuals
+    # Map measured residuals into regions by pos
+    res_hi = [r for r, p in zip(res, pos) if p <= 0.10]
+    res_mid = [r for r, p in zip(res, pos) if 0.10 < p < 0.90]
+    res_sh = [r for r, p in zip(res, pos) if p >= 0.90]
+    # Correction magnitudes from full curve
+    corr = pr.corrected
+    corr_hi = [corr[i] - (i / (N - 1)) for i in region_mask(N, 0.0, 0.10)]
+    corr_mid = [corr[i] - (i / (N - 1)) for i in region_mask(N, 0.10, 0.90)]
+    corr_sh = [corr[i] - (i / (N - 1)) for i in region_mask(N, 0.90, 1.0)]
+    return {
+        'residual_mean_abs_hi': mean_abs(res_hi),
+        'residual_mean_abs_mid': mean_abs(res_mid),
+        'residual_mean_abs_sh': mean_abs(res_sh),
+        'corr_mean_abs_hi': mean_abs(corr_hi),
+        'corr_mean_abs_mid': mean_abs(corr_mid),
+        'corr_mean_abs_sh': mean_abs(corr_sh),
+        'slope_mid': slope_at_mid(pr.corrected),
+    }
+
+
 def print_report(path: str, results: Dict[str, PipelineResult]):
     print(f"Input: {path}")
-    N = len(next(iter(results.values())).corrected)
-    # Regions
-    idx_hi = region_mask(N, 0.0, 0.10)
-    idx_mid = region_mask(N, 0.10, 0.90)
-    idx_sh = region_mask(N, 0.90, 1.0)
-
-    def region_stats(pr: PipelineResult):
-        # Residuals are at measured points; compute grouped by position
-        pos = pr.positions
-        res = pr.residuals
-        # Map measured residuals into regions by pos
-        res_hi = [r for r, p in zip(res, pos) if p <= 0.10]
-        res_mid = [r for r, p in zip(res, pos) if 0.10 < p < 0.90]
-        res_sh = [r for r, p in zip(res, pos) if p >= 0.90]
-        # Correction magnitudes from full curve
-        corr = pr.corrected
-        corr_hi = [corr[i] - (i / (N - 1)) for i in idx_hi]
-        corr_mid = [corr[i] - (i / (N - 1)) for i in idx_mid]
-        corr_sh = [corr[i] - (i / (N - 1)) for i in idx_sh]
-        return {
-            'residual_mean_abs_hi': mean_abs(res_hi),
-            'residual_mean_abs_mid': mean_abs(res_mid),
-            'residual_mean_abs_sh': mean_abs(res_sh),
-            'corr_mean_abs_hi': mean_abs(corr_hi),
-            'corr_mean_abs_mid': mean_abs(corr_mid),
-            'corr_mean_abs_sh': mean_abs(corr_sh),
-            'slope_mid': slope_at_mid(pr.corrected),
-        }
-
     stats = {name: region_stats(pr) for name, pr in results.items()}
 
     # Pretty print
     print("\nResiduals (|expected − actual|) at measured points:")
     print("  method       highlights(0–10%)  mid(10–90%)  shadows(90–100%)")
-    order = [n for n in ('legacy', 'hybrid', 'cie', 'pops', 'segment_cubic', 'cie_cubic') if n in results]
+    order = [n for n in ('legacy', 'hybrid', 'cie', 'pops', 'segment_cubic', 'pchip', 'cie_cubic', 'spectral') if n in results]
+    order += [n for n in results if n not in order]
     for name in order:
+        if not results[name].positions:
+            continue
         s = stats[name]
         print(f"  {name:<11} {s['residual_mean_abs_hi']:>9.5f}         {s['residual_mean_abs_mid']:>9.5f}      {s['residual_mean_abs_sh']:>9.5f}")
 
@@ -384,6 +555,27 @@ def print_report(path: str, results: Dict[str, PipelineResult]):
         print(f"  {a:<11} vs {b:<6}: {d:.6f}")
 
 
+def print_sigma_selection(cv_errors: Dict[str, np.ndarray], folds: int):
+    scheme = f"{folds}-fold" if folds > 1 else "leave-one-out"
+    print(f"\nAuto sigma ({scheme} CV over {len(SIGMA_CANDIDATES)} candidates {SIGMA_CANDIDATES[0]:.2f}–{SIGMA_CANDIDATES[-1]:.2f}):")
+    print("  method       sigma     CV RMSE    RMSE@0.05  RMSE@0.15  RMSE@0.30")
+    probes = [int(np.abs(SIGMA_CANDIDATES - v).argmin()) for v in (0.05, 0.15, 0.30)]
+    for name, errors in cv_errors.items():
+        best = np.flatnonzero(errors <= errors.min() * (1.0 + 1e-9))[-1]
+        rmse = np.sqrt(errors)
+        print(f"  {name:<11} {SIGMA_CANDIDATES[best]:>6.4f}   {rmse[best]:>8.5f}   "
+              + "  ".join(f"{rmse[i]:>9.5f}" for i in probes))
+
+
+def write_cv_csv(path: str, cv_errors: Dict[str, np.ndarray]):
+    with open(path, 'w', newline='') as f:
+        w = csv.writer(f)
+        w.writerow(['sigma'] + [f"{name}_cv_mse" for name in cv_errors])
+        for i, sigma in enumerate(SIGMA_CANDIDATES):
+            w.writerow([f"{sigma:.6f}"] + [f"{errors[i]:.8f}" for errors in cv_errors.values()])
+    print(f"\nWrote CV error CSV: {path}")
+
+
 def maybe_write_curves_csv(path: str, results: Dict[str, PipelineResult]):
     if not path:
         return
@@ -406,22 +598,64 @@ def maybe_write_curves_csv(path: str, results: Dict[str, PipelineResult]):
 
 def main():
     ap = argparse.ArgumentParser(description="Compare L*→density mapping pipelines on a LAB .txt file")
-    ap.add_argument('--input', '-i', type=str, default='data/Color-Muse-Data.txt', help='Path to Color Muse LAB .txt (default: data/Color-Muse-Data.txt)')
+    ap.add_argument('--input', '-i', type=str, default='data/Color-Muse-Data.txt', help='Path to Color Muse LAB .txt or CGATS.17/.ti3 file (default: data/Color-Muse-Data.txt)')
     ap.add_argument('--sigma', type=float, default=0.15, help='Gaussian kernel radius (0..1)')
     ap.add_argument('--threshold', type=float, default=0.12, help='Hybrid: highlight threshold (0..1)')
     ap.add_argument('--rolloff', type=float, default=0.10, help='Hybrid: transition width (0..1)')
     ap.add_argument('--export-curves', type=str, default='', help='Optional CSV path to write 256-sample corrected curves')
+    ap.add_argument('--acv', action='append', default=[], help='Photoshop .acv curve to compare against (repeatable)')
+    ap.add_argument('--auto-sigma', action='store_true', help='Pick --sigma per method by cross-validation over the patches')
+    ap.add_argument('--cv-folds', type=int, default=0, help='Auto-sigma: k-fold CV (default 0 = leave-one-out)')
+    ap.add_argument('--export-cv', type=str, default='', help='Auto-sigma: optional CSV path for the CV error curves')
+    ap.add_argument('--check-neutrality', action='store_true', help='Flag patches tinted away from neutral (ΔE2000)')
+    ap.add_argument('--neutral-tolerance', type=float, default=2.0, help='Neutrality: ΔE2000 above which a patch is tinted')
     args = ap.parse_args()
 
-    pairs = parse_lab_txt(args.input)
-
+    densities = None
+    if os.path.exists(args.input) and is_cgats(args.input):
+        pairs, spectral = read_ramp_densities(args.input)
+        densities = spectral.tolist() if spectral is not None else None
+        if len(pairs) < 2:
+            raise ValueError("Not enough neutral patches; expected at least 2 measurement pairs.")
+    else:
+        pairs = load_measurement_pairs(args.input)
+    weights = load_measurement_weights(args.input)
+    if weights is not None:
+        print(f"Weighting patches by inverse L* variance from {args.input} (SD floor {SD_FLOOR:g})")
+
+    methods = ('legacy', 'hybrid', 'cie', 'pops', 'segment_cubic', 'pchip')
+    if densities is not None:
+        methods += ('spectral',)
     results: Dict[str, PipelineResult] = {}
-    for method in ('legacy', 'hybrid', 'cie', 'pops', 'segment_cubic'):
-        results[method] = run_pipeline(pairs, method=method, sigma=args.sigma, threshold=args.threshold, rolloff=args.rolloff)
+    cv_errors: Dict[str, np.ndarray] = {}
+    for method in methods:
+        result = run_pipeline(pairs, method=method, sigma=args.sigma, threshold=args.threshold,
+                              rolloff=args.rolloff, densities=densities, weights=weights)
+        if args.auto_sigma and method in GAUSSIAN_METHODS:
+            # Residuals do not depend on sigma, so the first run supplies the CV targets.
+            sigma, cv_errors[method] = select_sigma(result.positions, result.residuals, folds=args.cv_folds,
+                                                    weights=weights)
+            result = run_pipeline(pairs, method=method, sigma=sigma, threshold=args.threshold,
+                                  rolloff=args.rolloff, densities=densities, weights=weights)
+        results[method] = result
+
+    N = len(results['legacy'].corrected)
+    for path in args.acv:
+        name = os.path.splitext(os.path.basename(path))[0]
+        results[name] = external_curve_result(name, acv_correction_curve(path, samples=N))
 
     print_report(args.input, results)
+    if cv_errors:
+        print_sigma_selection(cv_errors, args.cv_folds)
+        if args.export_cv:
+            write_cv_csv(args.export_cv, cv_errors)
     if args.export_curves:
         maybe_write_curves_csv(args.export_curves, results)
+    if args.check_neutrality:
+        from colorimetry import check_neutrality, print_neutrality
+
+        print()
+        print_neutrality(check_neutrality(load_measurement_columns(args.input), args.neutral_tolerance))
 
 
 if __name__ == '__main__':
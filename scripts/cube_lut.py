@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Bulk .cube LUT reader (1D and 3D) with vectorized neutral-axis extraction.
+
+The header keywords are scanned line by line; the numeric body is then converted in a
+single NumPy call into a contiguous (N, 3) or (N, N, N, 3) float array. Parsing rules
+follow docs/File_Specs/CUBE_LUT_SPEC_SUMMARY.md and the app's parseCube1D/parseCube3D:
+
+  - 1D: first column of each row, trimmed to LUT_1D_SIZE, spread over DOMAIN_MIN..MAX
+  - 3D: exactly N³ RGB rows, indexed like the app (``r*N² + g*N + b``), inputs
+    normalized per channel by DOMAIN_MIN/MAX
+  - neutral axis: mean(R, G, B) of the LUT sampled at R=G=B
+  - printer space: horizontal flip + vertical inversion (v[i] → 1 − v[n−1−i])
+
+Any batch of RGB points can be evaluated with trilinear (the app's method) or
+tetrahedral interpolation, so a 65³ cube becomes a 256- or 4096-point correction
+curve without per-sample Python loops.
+
+Usage:
+  python scripts/cube_lut.py testdata/midtone_collapse_3d.cube [--samples 4096]
+      [--method tetrahedral] [--export-curve curve.csv]
+  python scripts/cube_lut.py --benchmark [--size 65]
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import time
+import warnings
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from lab_measurements import PathLike
+
+METHODS = ("trilinear", "tetrahedral")
+SAMPLE_LIMIT_1D = 256
+
+
+@dataclass(frozen=True)
+class CubeLut:
+    """Parsed .cube LUT; ``table`` is (N, 3) for 1D and (N, N, N, 3) indexed [r, g, b] for 3D."""
+
+    path: str
+    title: str
+    dimensions: int
+    size: int
+    domain_min: np.ndarray
+    domain_max: np.ndarray
+    table: np.ndarray
+
+    @property
+    def domain_span(self) -> np.ndarray:
+        span = self.domain_max - self.domain_min
+        return np.where(np.abs(span) > 1e-9, span, 1.0)
+
+
+def _domain(values: List[str], default: float) -> np.ndarray:
+    numbers = []
+    for token in values[:3]:
+        try:
+            numbers.append(float(token))
+        except ValueError:
+            break
+    if not numbers:
+        numbers = [default]
+    if len(numbers) < 3:
+        numbers = numbers + [numbers[0]] * (3 - len(numbers))
+    return np.array(numbers, dtype=np.float64)
+
+
+def _parse_body(body: str, lines: List[str]) -> np.ndarray:
+    """Bulk-convert data rows into a (rows, 3) array; 1-value rows are replicated."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            flat = np.fromstring(body, dtype=np.float64, sep=" ")
+        except (DeprecationWarning, ValueError):
+            flat = None
+    if flat is not None:
+        if flat.size == 3 * len(lines):
+            return flat.reshape(-1, 3)
+        if flat.size == len(lines):
+            return np.repeat(flat[:, None], 3, axis=1)
+
+    # Mixed row widths: fall back to a per-row scan (the app keeps the first 1–3 values).
+    rows = []
+    for line in lines:
+        numbers = []
+        for token in line.split():
+            try:
+                numbers.append(float(token))
+            except ValueError:
+                break
+        if 1 <= len(numbers) <= 3:
+            rows.append((numbers + [numbers[0]] * 3)[:3])
+    return np.array(rows, dtype=np.float64).reshape(-1, 3)
+
+
+def parse_cube_text(text: str, path: str = "<text>") -> CubeLut:
+    title = ""
+    size_1d: Optional[int] = None
+    size_3d: Optional[int] = None
+    domain_min = np.zeros(3)
+    domain_max = np.ones(3)
+
+    lines = text.splitlines()
+    start = len(lines)
+    for index, raw in enumerate(lines):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line[0].isdigit() or line[0] in "+-.":
+            start = index
+            break
+        key, *values = line.split()
+        key = key.upper()
+        if key == "TITLE":
+            title = line[len("TITLE"):].strip().strip('"')
+        elif key == "LUT_1D_SIZE" and values:
+            size_1d = int(values[0])
+        elif key == "LUT_3D_SIZE" and values:
+            size_3d = int(values[0])
+        elif key == "DOMAIN_MIN":
+            domain_min = _domain(values, 0.0)
+        elif key == "DOMAIN_MAX":
+            domain_max = _domain(values, 1.0)
+
+    data_lines = [
+        line for line in (raw.strip() for raw in lines[start:])
+        if line and not line.startswith("#") and (line[0].isdigit() or line[0] in "+-.")
+    ]
+    rows = _parse_body("\n".join(data_lines), data_lines)
+
+    if not np.all(np.isfinite(domain_min)) or not np.all(np.isfinite(domain_max)) or np.any(domain_min == domain_max):
+        domain_min, domain_max = np.zeros(3), np.ones(3)
+
+    if size_3d is not None:
+        expected = size_3d ** 3
+        if rows.shape[0] != expected:
+            raise ValueError(f"{path}: 3D LUT data mismatch. Expected {expected} points, found {rows.shape[0]}.")
+        table = np.ascontiguousarray(rows.reshape(size_3d, size_3d, size_3d, 3))
+        dimensions, size = 3, size_3d
+    else:
+        if size_1d is None and rows.shape[0] > SAMPLE_LIMIT_1D:
+            raise ValueError(
+                f"{path}: 1D LUT lists {rows.shape[0]} samples without LUT_1D_SIZE; limit is {SAMPLE_LIMIT_1D}."
+            )
+        if size_1d is not None and rows.shape[0] >= size_1d:
+            rows = rows[:size_1d]
+        if rows.shape[0] == 0:
+            raise ValueError(f"{path}: No 1D LUT samples found.")
+        table = np.ascontiguousarray(rows)
+        dimensions, size = 1, rows.shape[0]
+
+    table.flags.writeable = False
+    return CubeLut(path, title, dimensions, size, domain_min, domain_max, table)
+
+
+def read_cube(path: PathLike) -> CubeLut:
+    path_str = os.fspath(path)
+    with open(path_str, "r", encoding="utf-8", errors="ignore") as fh:
+        return parse_cube_text(fh.read(), path_str)
+
+
+# ---------- Evaluation ----------
+
+def _lattice(lut: CubeLut, rgb: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Lower lattice index (n, 3) and fractional offset (n, 3) for domain-space inputs."""
+    unit = np.clip((rgb - lut.domain_min) / lut.domain_span, 0.0, 1.0)
+    scaled = unit * (lut.size - 1)
+    base = np.minimum(np.floor(scaled).astype(np.intp), max(lut.size - 2, 0))
+    return base, scaled - base
+
+
+def trilinear(lut: CubeLut, rgb: np.ndarray) -> np.ndarray:
+    base, frac = _lattice(lut, rgb)
+    top = np.minimum(base + 1, lut.size - 1)
+    out = np.zeros((rgb.shape[0], 3))
+    for dr in (0, 1):
+        wr = frac[:, 0] if dr else 1.0 - frac[:, 0]
+        r = top[:, 0] if dr else base[:, 0]
+        for dg in (0, 1):
+            wg = frac[:, 1] if dg else 1.0 - frac[:, 1]
+            g = top[:, 1] if dg else base[:, 1]
+            for db in (0, 1):
+                wb = frac[:, 2] if db else 1.0 - frac[:, 2]
+                b = top[:, 2] if db else base[:, 2]
+                out += (wr * wg * wb)[:, None] * lut.table[r, g, b]
+    return out
+
+
+def tetrahedral(lut: CubeLut, rgb: np.ndarray) -> np.ndarray:
+    """Walk the cell diagonal along axes in descending fractional order (6-tetrahedra split)."""
+    base, frac = _lattice(lut, rgb)
+    order = np.argsort(-frac, axis=1, kind="stable")
+    sorted_frac = np.take_along_axis(frac, order, axis=1)
+    weights = np.column_stack([
+        1.0 - sorted_frac[:, 0],
+        sorted_frac[:, 0] - sorted_frac[:, 1],
+        sorted_frac[:, 1] - sorted_frac[:, 2],
+        sorted_frac[:, 2],
+    ])
+    rows = np.arange(rgb.shape[0])
+    vertex = base.copy()
+    upper = lut.size - 1
+    out = weights[:, 0, None] * lut.table[vertex[:, 0], vertex[:, 1], vertex[:, 2]]
+    for step in range(3):
+        axis = order[:, step]
+        vertex[rows, axis] = np.minimum(vertex[rows, axis] + 1, upper)
+        out += weights[:, step + 1, None] * lut.table[vertex[:, 0], vertex[:, 1], vertex[:, 2]]
+    return out
+
+
+def evaluate(lut: CubeLut, rgb: np.ndarray, method: str = "trilinear") -> np.ndarray:
+    """Sample the LUT at a batch of (n, 3) domain-space RGB points; returns (n, 3)."""
+    rgb = np.atleast_2d(np.asarray(rgb, dtype=np.float64))
+    if lut.dimensions == 1:
+        positions = np.linspace(lut.domain_min, lut.domain_max, lut.size)
+        return np.column_stack([
+            np.interp(rgb[:, c], positions[:, c], lut.table[:, c]) for c in range(3)
+        ])
+    if method not in METHODS:
+        raise ValueError(f"Unknown interpolation method: {method}")
+    return trilinear(lut, rgb) if method == "trilinear" else tetrahedral(lut, rgb)
+
+
+def neutral_axis(lut: CubeLut, samples: int = 256, method: str = "trilinear") -> np.ndarray:
+    """Image-space neutral response: mean(RGB) at R=G=B for evenly spaced inputs in 0..1."""
+    t = np.linspace(0.0, 1.0, samples)
+    if lut.dimensions == 1:
+        # The app uses only the first column of a 1D LUT.
+        positions = np.linspace(lut.domain_min[0], lut.domain_max[0], lut.size)
+        return np.interp(t, positions, lut.table[:, 0])
+    return evaluate(lut, np.repeat(t[:, None], 3, axis=1), method).mean(axis=1)
+
+
+def to_printer_space(samples: np.ndarray) -> np.ndarray:
+    """Horizontal flip + vertical inversion, clamped to 0..1."""
+    return np.clip(1.0 - np.asarray(samples, dtype=np.float64)[::-1], 0.0, 1.0)
+
+
+def correction_curve(lut: CubeLut, samples: int = 256, method: str = "trilinear") -> np.ndarray:
+    """Printer-space correction curve, comparable with ``PipelineResult.corrected``."""
+    return to_printer_space(neutral_axis(lut, samples, method))
+
+
+# ---------- Benchmark ----------
+
+def write_synthetic(path: str, size: int) -> None:
+    grid = np.linspace(0.0, 1.0, size)
+    r, g, b = np.meshgrid(grid, grid, grid, indexing="ij")
+    values = np.stack([r, g, b], axis=-1) ** 1.2
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(f'TITLE "synthetic gamma"\nLUT_3D_SIZE {size}\nDOMAIN_MIN 0.0 0.0 0.0\nDOMAIN_MAX 1.0 1.0 1.0\n')
+        np.savetxt(fh, values.reshape(-1, 3), fmt="%.6f")
+
+
+def run_benchmark(size: int, repeats: int) -> None:
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.cube")
+        write_synthetic(path, size)
+        print(f"Benchmark: {size}³ cube ({os.path.getsize(path) / (1024 * 1024):.1f} MB), best of {repeats}")
+
+        def best(fn) -> float:
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                fn()
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        lut = read_cube(path)
+        print(f"  {'read_cube':<28} {best(lambda: read_cube(path)) * 1000.0:>10.2f} ms")
+        for method in METHODS:
+            for samples in (256, 4096):
+                label = f"{method} {samples} pts"
+                elapsed = best(lambda: correction_curve(lut, samples, method))
+                print(f"  {label:<28} {elapsed * 1000.0:>10.2f} ms")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Extract printer-space correction curves from .cube LUTs")
+    ap.add_argument("inputs", nargs="*", help=".cube files (1D or 3D)")
+    ap.add_argument("--samples", type=int, default=256, help="Curve resolution (default 256)")
+    ap.add_argument("--method", choices=METHODS, default="trilinear", help="3D interpolation method")
+    ap.add_argument("--export-curve", type=str, default="", help="Optional CSV path (one column per input)")
+    ap.add_argument("--benchmark", action="store_true", help="Time a synthetic cube")
+    ap.add_argument("--size", type=int, default=65, help="Benchmark: LUT_3D_SIZE")
+    ap.add_argument("--repeats", type=int, default=3, help="Benchmark: repetitions")
+    args = ap.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.size, args.repeats)
+
+    curves = {}
+    for name in args.inputs:
+        lut = read_cube(name)
+        curve = correction_curve(lut, args.samples, args.method)
+        curves[name] = curve
+        deviation = curve - np.linspace(0.0, 1.0, args.samples)
+        peak = int(np.argmax(np.abs(deviation)))
+        print(
+            f"{name}: {lut.dimensions}D size {lut.size}, {args.samples} samples, "
+            f"max |corrected(t) − t| = {abs(deviation[peak]):.5f} at t={peak / (args.samples - 1):.3f}"
+        )
+
+    if args.export_curve and curves:
+        with open(args.export_curve, "w", newline="") as fh:
+            w = csv.writer(fh)
+            w.writerow(["t"] + [os.path.basename(name) for name in curves])
+            t = np.linspace(0.0, 1.0, args.samples)
+            for i in range(args.samples):
+                w.writerow([f"{t[i]:.6f}"] + [f"{curve[i]:.6f}" for curve in curves.values()])
+        print(f"Wrote correction curves CSV: {args.export_curve}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Bootstrap confidence bands for the corrected curves of compare_density_mappings.
+
+Each resample is a perturbed copy of the measured ramp — interior patches drawn with
+replacement (``bootstrap``) or L* jittered by a per-device sigma (``noise``). The bootstrap
+always keeps the paper-white and darkest (lowest/highest input) patches: every pipeline
+normalizes against them, so a resample that dropped one would re-scale the whole curve
+and the band would measure that instead of remeasurement spread. All resamples are
+mapped to density and reconstructed together: the L* → density step works on a
+(resamples × patches) matrix and the Gaussian reconstruction on
+(resamples × samples × patches) blocks, so thousands of curves cost a few array passes.
+
+Reported per method: pointwise percentile band, widest band and where it sits, and the
+worst-case (sup-norm) deviation of any resample from the measured curve.
+
+Usage:
+  python scripts/curve_uncertainty.py --input data/Color-Muse-Data.txt [--method cie]
+      [--resamples 2000] [--mode bootstrap|noise] [--lab-sigma 0.5] [--confidence 95]
+      [--export-bands bands.csv]
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import time
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from colorimetry import Y_to_density, lstar_to_Y, lstar_to_Y_pops
+from compare_density_mappings import EPS, load_measurement_pairs, run_pipeline
+
+METHODS = ("legacy", "cie", "hybrid", "pops")
+SAMPLES = 256
+CHUNK_ELEMENTS = 8_000_000
+
+
+def smootherstep(x: np.ndarray) -> np.ndarray:
+    return x * x * x * (x * (6 * x - 15) + 10)
+
+
+def batched_residuals(
+    positions: np.ndarray, L: np.ndarray, method: str, threshold: float, rolloff: float
+) -> np.ndarray:
+    """Row-wise port of run_pipeline's density step: (R, P) positions/L* → residuals."""
+    expected = positions
+    if method in ("legacy", "hybrid"):
+        l_min = L.min(axis=1, keepdims=True)
+        l_max = L.max(axis=1, keepdims=True)
+        legacy = 1.0 - (L - l_min) / np.maximum(EPS, l_max - l_min)
+    if method in ("cie", "hybrid"):
+        density = Y_to_density(lstar_to_Y(L))
+        d_max = density.max(axis=1, keepdims=True)
+        cie = np.where(d_max > EPS, density / np.where(d_max > EPS, d_max, 1.0), 0.0)
+
+    if method == "legacy":
+        actual = legacy
+    elif method == "cie":
+        actual = cie
+    elif method == "hybrid":
+        x = np.clip((positions - threshold) / max(EPS, rolloff), 0.0, 1.0)
+        w = 1.0 - smootherstep(x)
+        actual = w * legacy + (1.0 - w) * cie
+    elif method == "pops":
+        actual = Y_to_density(lstar_to_Y_pops(L))
+        d_max = actual.max(axis=1, keepdims=True)
+        expected = positions * d_max
+    else:
+        raise ValueError(f"Batched bands support {', '.join(METHODS)}; got {method}")
+    return expected - actual
+
+
+def batched_gaussian_curves(positions: np.ndarray, residuals: np.ndarray, sigma: float, samples: int = SAMPLES) -> np.ndarray:
+    """Row-wise gaussian_corrected_curve: (R, P) → (R, samples), processed in bounded chunks."""
+    t = np.linspace(0.0, 1.0, samples)
+    sig2 = max(EPS, 2.0 * sigma * sigma)
+    rows, patches = positions.shape
+    out = np.empty((rows, samples))
+    step = max(1, CHUNK_ELEMENTS // (samples * patches))
+    for start in range(0, rows, step):
+        p = positions[start:start + step, None, :]
+        r = residuals[start:start + step, None, :]
+        weights = np.exp(-((t[None, :, None] - p) ** 2) / sig2)
+        num = (weights * r).sum(axis=2)
+        den = weights.sum(axis=2)
+        corr = np.where(den > 0, num / np.where(den > 0, den, 1.0), 0.0)
+        out[start:start + step] = np.clip(t + corr, 0.0, 1.0)
+    out[:, 0] = 0.0
+    out[:, -1] = 1.0
+    return out
+
+
+def resample(
+    x: np.ndarray, L: np.ndarray, resamples: int, mode: str, lab_sigma: float, rng: np.random.Generator
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(R, P) input-% and L* matrices for the chosen perturbation."""
+    patches = x.shape[0]
+    if mode == "bootstrap":
+        order = np.argsort(x, kind="stable")
+        interior = order[1:-1]
+        picks = np.empty((resamples, patches), dtype=np.int64)
+        picks[:, 0] = order[0]
+        picks[:, -1] = order[-1]
+        if interior.size:
+            picks[:, 1:-1] = interior[rng.integers(0, interior.size, size=(resamples, patches - 2))]
+        return x[picks], L[picks]
+    if mode == "noise":
+        jitter = rng.normal(0.0, lab_sigma, size=(resamples, patches))
+        return np.broadcast_to(x, (resamples, patches)), np.clip(L + jitter, 0.0, 100.0)
+    raise ValueError(f"Unknown resampling mode: {mode}")
+
+
+@dataclass
+class UncertaintyBands:
+    method: str
+    curve: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    sup_deviation: np.ndarray
+    """Per-resample max |resampled − measured| over the curve."""
+
+    @property
+    def width(self) -> np.ndarray:
+        return self.upper - self.lower
+
+
+def curve_bands(
+    pairs: Sequence[Tuple[float, float]],
+    method: str,
+    sigma: float,
+    threshold: float,
+    rolloff: float,
+    resamples: int = 2000,
+    mode: str = "bootstrap",
+    lab_sigma: float = 0.5,
+    confidence: float = 95.0,
+    seed: int = 0,
+) -> UncertaintyBands:
+    base = np.asarray(
+        run_pipeline(list(pairs), method=method, sigma=sigma, threshold=threshold, rolloff=rolloff).corrected
+    )
+    x = np.array([p for p, _ in pairs], dtype=np.float64)
+    L = np.array([l for _, l in pairs], dtype=np.float64)
+    xs, Ls = resample(x, L, resamples, mode, lab_sigma, np.random.default_rng(seed))
+    positions = np.clip(xs / 100.0, 0.0, 1.0)
+    residuals = batched_residuals(positions, Ls, method, threshold, rolloff)
+    curves = batched_gaussian_curves(positions, residuals, sigma, base.shape[0])
+    tail = (100.0 - confidence) / 2.0
+    lower, upper = np.percentile(curves, [tail, 100.0 - tail], axis=0)
+    return UncertaintyBands(method, base, lower, upper, np.abs(curves - base).max(axis=1))
+
+
+def print_bands(bands: List[UncertaintyBands], confidence: float) -> None:
+    print(f"\n{confidence:g}% pointwise bands on corrected(t):")
+    print("  method       mean width   max width  at t     sup|Δ| median   sup|Δ| p95   sup|Δ| max")
+    for b in bands:
+        n = b.curve.shape[0]
+        widest = int(b.width.argmax())
+        print(
+            f"  {b.method:<11} {b.width.mean():>10.5f}  {b.width[widest]:>10.5f}  {widest / (n - 1):.3f}"
+            f"  {np.median(b.sup_deviation):>14.5f}  {np.percentile(b.sup_deviation, 95):>11.5f}"
+            f"  {b.sup_deviation.max():>10.5f}"
+        )
+
+
+def write_bands_csv(path: str, bands: List[UncertaintyBands]) -> None:
+    n = bands[0].curve.shape[0]
+    with open(path, "w", newline="") as fh:
+        w = csv.writer(fh)
+        header = ["t"]
+        for b in bands:
+            header += [b.method, f"{b.method}_lower", f"{b.method}_upper"]
+        w.writerow(header)
+        for i in range(n):
+            row = [f"{i / (n - 1):.6f}"]
+            for b in bands:
+                row += [f"{b.curve[i]:.6f}", f"{b.lower[i]:.6f}", f"{b.upper[i]:.6f}"]
+            w.writerow(row)
+    print(f"\nWrote bands CSV: {path}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Bootstrap confidence bands for corrected curves")
+    ap.add_argument('--input', '-i', type=str, default='data/Color-Muse-Data.txt', help='LAB .txt or CGATS.17/.ti3 file')
+    ap.add_argument('--method', action='append', choices=METHODS, help='Pipeline(s) to band (default: all supported)')
+    ap.add_argument('--sigma', type=float, default=0.15, help='Gaussian kernel radius (0..1)')
+    ap.add_argument('--threshold', type=float, default=0.12, help='Hybrid: highlight threshold (0..1)')
+    ap.add_argument('--rolloff', type=float, default=0.10, help='Hybrid: transition width (0..1)')
+    ap.add_argument('--resamples', type=int, default=2000, help='Number of resampled curves')
+    ap.add_argument('--mode', choices=('bootstrap', 'noise'), default='bootstrap', help='Patch bootstrap or L* noise')
+    ap.add_argument('--lab-sigma', type=float, default=0.5, help='Noise mode: per-device L* standard deviation')
+    ap.add_argument('--confidence', type=float, default=95.0, help='Band coverage in percent')
+    ap.add_argument('--seed', type=int, default=0, help='Random seed')
+    ap.add_argument('--export-bands', type=str, default='', help='Optional CSV path for curves and bands')
+    args = ap.parse_args()
+
+    pairs = load_measurement_pairs(args.input)
+    methods = args.method or list(METHODS)
+    start = time.perf_counter()
+    bands = [
+        curve_bands(pairs, method, args.sigma, args.threshold, args.rolloff, args.resamples, args.mode,
+                    args.lab_sigma, args.confidence, args.seed)
+        for method in methods
+    ]
+    elapsed = time.perf_counter() - start
+    detail = f"L* sigma {args.lab_sigma:g}" if args.mode == "noise" else "interior patches with replacement"
+    print(f"Input: {args.input} ({len(pairs)} patches)")
+    print(f"{args.resamples} {args.mode} resamples ({detail}) × {len(methods)} method(s) in {elapsed:.2f}s")
+    print_bands(bands, args.confidence)
+    if args.export_bands:
+        write_bands_csv(args.export_bands, bands)
+
+
+if __name__ == "__main__":
+    main()
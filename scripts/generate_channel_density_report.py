@@ -8,36 +8,48 @@ Outputs
 - artifacts/channel-density/triforce_v4_density_figures.svg
 - docs/features/channel-density-solver-report.pdf
 - artifacts/channel-density/triforce_v4_density_metrics.json
+
+Multi-dataset mode (``--pair`` / ``--manifest``) writes one consolidated PDF for many
+quad/LAB pairs. Each dataset is solved and its page drawn once in a process pool: the
+worker saves the figure as a PNG, writes the metrics JSON and returns the page as a
+single-page vector PDF (figures closed as soon as they are saved). The main process only
+appends those bytes to the report with pdf_concat, which writes each page to disk as it
+goes; only a small summary row per dataset is kept, so memory stays flat as the dataset
+count grows. Load / solve / render / page timings per dataset and per report section end
+up in the PDF's summary pages and the summary JSON.
+
+Usage:
+  python scripts/generate_channel_density_report.py
+  python scripts/generate_channel_density_report.py --pair data/P800.quad data/P800.txt [--pair ...] \
+      [--manifest datasets.csv] [--output report.pdf] [--workers 8]
+
+A manifest is a CSV with ``quad,lab[,name]`` columns (header optional).
+
+matplotlib and reportlab are imported by the functions that draw, so ``--help`` and
+the solver-only paths start without them.
 """
+from __future__ import annotations
 
-import csv
+import argparse
+import io
+import itertools
 import json
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
-
-import matplotlib.pyplot as plt
-from matplotlib.ticker import PercentFormatter
-
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.lib.units import inch
-from reportlab.platypus import (
-    Image,
-    PageBreak,
-    Paragraph,
-    SimpleDocTemplate,
-    Spacer,
-    Table,
-    TableStyle,
-)
-
-DOMINANCE_THRESHOLD = 0.9
-SUPPORT_THRESHOLD = 0.2
-MIN_SHARE_THRESHOLD = 0.01
-EPSILON = 1e-6
-DENSITY_MAX_ITERATIONS = 8
+from typing import TYPE_CHECKING, Deque, Dict, Iterator, List, Optional, Sequence
 
+from channel_density import compute_density_metrics
+from lab_measurements import read_lab_columns
+from pdf_concat import PdfConcatWriter
+from quad_files import load_quad_curves
+from quad_linearizer import read_manifest
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = REPO_ROOT / "data"
@@ -52,6 +64,29 @@ FIG_SVG_PATH = ARTIFACT_DIR / "triforce_v4_density_figures.svg"
 METRICS_PATH = ARTIFACT_DIR / "triforce_v4_density_metrics.json"
 PDF_PATH = DOCS_DIR / "channel-density-solver-report.pdf"
 
+MULTI_ARTIFACT_DIR = ARTIFACT_DIR / "datasets"
+MULTI_PDF_PATH = DOCS_DIR / "channel-density-multi-report.pdf"
+MULTI_SUMMARY_PATH = ARTIFACT_DIR / "multi_report_summary.json"
+MULTI_FIGURE_DPI = 200
+PANEL_CHANNELS = 3
+SUMMARY_ROWS_PER_PAGE = 32
+TIMED_SECTIONS = ("load", "solve", "render", "page")
+
+CHANNEL_COLORS = {
+    "LK": "#1f77b4",
+    "C": "#ff7f0e",
+    "K": "#2ca02c",
+    "M": "#d62728",
+    "Y": "#bcbd22",
+    "LC": "#17becf",
+    "LM": "#e377c2",
+    "LLK": "#9467bd",
+    "MK": "#8c564b",
+    "OR": "#ffbb78",
+    "GR": "#98df8a",
+}
+FALLBACK_COLORS = ("#7f7f7f", "#c5b0d5", "#9edae5", "#c49c94", "#f7b6d2")
+
 
 def ensure_dependencies() -> None:
     """Surface helpful guidance if required files are missing."""
@@ -61,279 +96,20 @@ def ensure_dependencies() -> None:
         raise FileNotFoundError(f"Required dataset files missing: {joined}")
 
 
-def load_quad_curves(path: Path) -> Dict[str, List[float]]:
-    """Parse .quad file into channel->draw list mapping."""
-    channels: Dict[str, List[float]] = {}
-    current_channel = None
-    buffer: List[float] = []
-
-    with path.open() as fh:
-        for raw_line in fh:
-            line = raw_line.strip()
-            if not line:
-                continue
-            if line.startswith("#"):
-                token = line.lstrip("#").strip()
-                if token.endswith("curve"):
-                    if current_channel and buffer:
-                        channels[current_channel] = buffer
-                    current_channel = token[:-5].strip()
-                    buffer = []
-                continue
-            try:
-                value = float(line)
-            except ValueError:
-                continue
-            buffer.append(value)
-
-    if current_channel and buffer and current_channel not in channels:
-        channels[current_channel] = buffer
-    return channels
-
-
 def load_lab_measurements(path: Path) -> List[Dict[str, float]]:
     """Read LAB .txt rows into sorted list of dicts."""
-    rows: List[Dict[str, float]] = []
-    with path.open() as fh:
-        reader = csv.DictReader(fh, delimiter="\t")
-        for row in reader:
-            rows.append({key: float(value) for key, value in row.items()})
-    rows.sort(key=lambda r: r["GRAY"])
-    return rows
-
-
-def sample_draw(draws: List[float], input_percent: float) -> float:
-    """Return draw value for a channel at the given input using nearest sample."""
-    if not draws:
-        return 0.0
-    idx = round(input_percent / 100 * (len(draws) - 1))
-    return draws[idx]
-
-
-def compute_density_metrics(
-    quad_curves: Dict[str, List[float]],
-    lab_rows: List[Dict[str, float]],
-) -> Dict[str, object]:
-    """Compute channel share, incremental deltas, and cumulative contributions."""
-    inputs = [row["GRAY"] for row in lab_rows]
-    l_values = [row["LAB_L"] for row in lab_rows]
-
-    delta_l: List[float] = []
-    prev_l = None
-    for l_star in l_values:
-        if prev_l is None:
-            delta_l.append(0.0)
-        else:
-            delta_l.append(max(prev_l - l_star, 0.0))
-        prev_l = l_star
-
-    channel_shares: Dict[str, List[float]] = {name: [] for name in quad_curves}
-    active_channels = [
-        name for name, values in quad_curves.items() if any(value > EPSILON for value in values)
-    ]
-    if not active_channels:
-        active_channels = list(quad_curves.keys())
-
-    for idx, input_percent in enumerate(inputs):
-        draws = {
-            name: sample_draw(values, input_percent)
-            for name, values in quad_curves.items()
-        }
-        total_draw = sum(draws.values())
-        for name in quad_curves:
-            share = draws[name] / total_draw if total_draw > 0 else 0.0
-            channel_shares[name].append(share)
-
-    key_channels = [name for name in ["LK", "C", "K"] if name in quad_curves]
-    highlight_idx = inputs.index(7.5) if 7.5 in inputs else 0
-    mid_idx = inputs.index(35.0) if 35.0 in inputs else len(inputs) // 2
-    shadow_idx = inputs.index(90.0) if 90.0 in inputs else len(inputs) - 1
-
-    snapshots = [
-        ("Highlight", inputs[highlight_idx], delta_l[highlight_idx]),
-        ("Midtone", inputs[mid_idx], delta_l[mid_idx]),
-        ("Shadow", inputs[shadow_idx], delta_l[shadow_idx]),
-    ]
-
-    snapshot_rows: List[Dict[str, object]] = []
-    for label, gray, delta in snapshots:
-        row_index = inputs.index(gray)
-        row = {
-            "region": label,
-            "input": gray,
-            "delta": delta,
-            "shares": {
-                name: channel_shares[name][row_index]
-                for name in key_channels
-            },
-        }
-        snapshot_rows.append(row)
-
-    # Derive density constants through dominance scanning
-    order_info: List[Tuple[int, str]] = []
-    for name in active_channels:
-        shares = channel_shares[name]
-        first_idx = None
-        for idx, share in enumerate(shares):
-            if delta_l[idx] <= EPSILON:
-                continue
-            if share >= DOMINANCE_THRESHOLD:
-                first_idx = idx
-                break
-        if first_idx is None:
-            for idx, share in enumerate(shares):
-                if delta_l[idx] <= EPSILON:
-                    continue
-                if share >= SUPPORT_THRESHOLD:
-                    first_idx = idx
-                    break
-        if first_idx is None:
-            for idx, share in enumerate(shares):
-                if share > MIN_SHARE_THRESHOLD:
-                    first_idx = idx
-                    break
-        order_info.append((first_idx if first_idx is not None else len(delta_l) + 1, name))
-
-    order_info.sort()
-    density_constants: Dict[str, float] = {name: 0.0 for name in active_channels}
-    calibrated: List[str] = []
-    total_density = sum(delta_l) or 1.0
-
-    for _, name in order_info:
-        shares = channel_shares[name]
-        residual_sum = 0.0
-        share_sum = 0.0
-        for idx, delta in enumerate(delta_l):
-            if delta <= EPSILON:
-                continue
-            share = shares[idx]
-            if share <= MIN_SHARE_THRESHOLD:
-                continue
-            residual = delta
-            for prev in calibrated:
-                residual -= density_constants[prev] * channel_shares[prev][idx]
-            if residual <= EPSILON:
-                continue
-            residual_sum += residual
-            share_sum += share
-        constant = residual_sum / share_sum if share_sum > EPSILON else 0.0
-        remaining = max(0.0, total_density - sum(density_constants.values()))
-        if constant > remaining:
-            constant = remaining
-        density_constants[name] = max(0.0, constant)
-        calibrated.append(name)
-
-    leftover = max(0.0, total_density - sum(density_constants.values()))
-    if leftover > EPSILON and calibrated:
-        density_constants[calibrated[-1]] += leftover
-
-    # Allocate density contributions per index using waterfilling
-    remaining = {name: density_constants.get(name, 0.0) for name in active_channels}
-    density_profiles: List[Dict[str, object]] = []
-    cumulative = {name: 0.0 for name in active_channels}
-
-    for idx, delta in enumerate(delta_l):
-        if delta <= EPSILON:
-            density_profiles.append({"density": delta, "shares": {}})
-            continue
-
-        contributions = {name: 0.0 for name in active_channels}
-        candidate_names = [
-            name for name in active_channels
-            if channel_shares[name][idx] > MIN_SHARE_THRESHOLD and remaining[name] > EPSILON
-        ]
-        weights = {
-            name: density_constants[name] * channel_shares[name][idx]
-            for name in candidate_names
-        }
-        delta_remaining = delta
-        iteration = 0
-
-        while delta_remaining > EPSILON and candidate_names and iteration < DENSITY_MAX_ITERATIONS:
-            iteration += 1
-            total_weight = sum(weights[name] for name in candidate_names)
-            if total_weight <= EPSILON:
-                equal_share = delta_remaining / len(candidate_names)
-                consumed = 0.0
-                for name in candidate_names:
-                    amount = min(equal_share, remaining[name])
-                    if amount > EPSILON:
-                        contributions[name] += amount
-                        remaining[name] -= amount
-                        consumed += amount
-                if consumed <= EPSILON:
-                    break
-                delta_remaining -= consumed
-            else:
-                consumed = 0.0
-                for name in candidate_names:
-                    portion = (weights[name] / total_weight) * delta_remaining
-                    amount = min(portion, remaining[name])
-                    if amount > EPSILON:
-                        contributions[name] += amount
-                        remaining[name] -= amount
-                        consumed += amount
-                if consumed <= EPSILON:
-                    break
-                delta_remaining -= consumed
-
-            candidate_names = [
-                name for name in candidate_names
-                if remaining[name] > EPSILON and channel_shares[name][idx] > MIN_SHARE_THRESHOLD
-            ]
-            weights = {
-                name: density_constants[name] * channel_shares[name][idx]
-                for name in candidate_names
-            }
-
-        if delta_remaining > EPSILON:
-            fallback_name = max(
-                active_channels,
-                key=lambda ch: remaining[ch] * channel_shares[ch][idx]
-            )
-            if remaining[fallback_name] > EPSILON:
-                amount = min(delta_remaining, remaining[fallback_name])
-                contributions[fallback_name] += amount
-                remaining[fallback_name] -= amount
-                delta_remaining -= amount
-
-        shares_entry = {}
-        for name, amount in contributions.items():
-            if amount > EPSILON:
-                shares_entry[name] = amount / delta
-                cumulative[name] += amount
-        density_profiles.append({
-            "density": delta,
-            "shares": shares_entry
-        })
-
-    total_delta = sum(delta_l) or 1.0
-    contribution_pct = {
-        name: (cumulative[name] / total_delta) * 100 for name in cumulative
-    }
+    return read_lab_columns(path).rows()
 
-    normalized_constants = {
-        name: (density_constants[name] / total_delta) if total_delta > EPSILON else 0.0
-        for name in density_constants
-    }
 
-    return {
-        "inputs": inputs,
-        "l_values": l_values,
-        "delta_l": delta_l,
-        "channel_shares": channel_shares,
-        "cumulative": cumulative,
-        "contribution_pct": contribution_pct,
-        "snapshots": snapshot_rows,
-        "density_constants": normalized_constants,
-        "density_profiles": density_profiles,
-        "active_channels": active_channels,
-    }
-
-
-def render_figures(metrics: Dict[str, object]) -> None:
-    """Render composite figure illustrating L* curve, channel shares, and cumulative density."""
-    ARTIFACT_DIR.mkdir(parents=True, exist_ok=True)
+def draw_figures(
+    metrics: Dict[str, object],
+    label: str,
+    key_channels: Sequence[str],
+    colors_map: Dict[str, str],
+) -> Figure:
+    """Build the three-panel figure (L* curve, channel shares, cumulative density)."""
+    import matplotlib.pyplot as plt
+    from matplotlib.ticker import PercentFormatter
 
     inputs: List[float] = metrics["inputs"]  # type: ignore[assignment]
     l_values: List[float] = metrics["l_values"]  # type: ignore[assignment]
@@ -341,16 +117,13 @@ def render_figures(metrics: Dict[str, object]) -> None:
     shares: Dict[str, List[float]] = metrics["channel_shares"]  # type: ignore[assignment]
     density_profiles: List[Dict[str, object]] = metrics["density_profiles"]  # type: ignore[assignment]
 
-    key_channels = ["LK", "C", "K"]
-    colors_map = {"LK": "#1f77b4", "C": "#ff7f0e", "K": "#2ca02c"}
-
     plt.style.use("seaborn-v0_8-darkgrid")  # Modern but readable
     fig, axes = plt.subplots(3, 1, figsize=(8.5, 11), constrained_layout=True)
 
     # Panel A: L* curve with incremental delta markers
     ax0 = axes[0]
     ax0.plot(inputs, l_values, color="#222222", linewidth=2, label="Measured L*")
-    ax0.set_title("Panel A — Measured L* Ramp (TRIFORCE_V4)", loc="left", fontweight="bold")
+    ax0.set_title(f"Panel A — Measured L* Ramp ({label})", loc="left", fontweight="bold")
     ax0.set_xlabel("Input Level (%)")
     ax0.set_ylabel("L* (lower is darker)")
     ax0.invert_yaxis()
@@ -369,7 +142,7 @@ def render_figures(metrics: Dict[str, object]) -> None:
                 color="#555555",
             )
 
-    # Panel B: Channel share stackplot (LK, C, K)
+    # Panel B: Channel share stackplot
     ax1 = axes[1]
     stack_values = [shares[name] for name in key_channels]
     ax1.stackplot(
@@ -408,10 +181,22 @@ def render_figures(metrics: Dict[str, object]) -> None:
     ax2.legend(loc="upper left")
 
     fig.suptitle(
-        "Channel Density Analysis — TRIFORCE_V4 Dataset",
+        f"Channel Density Analysis — {label} Dataset",
         fontsize=14,
         fontweight="bold",
     )
+    return fig
+
+
+def render_figures(metrics: Dict[str, object]) -> None:
+    """Render composite figure illustrating L* curve, channel shares, and cumulative density."""
+    import matplotlib.pyplot as plt
+
+    ARTIFACT_DIR.mkdir(parents=True, exist_ok=True)
+
+    key_channels = ["LK", "C", "K"]
+    colors_map = {"LK": "#1f77b4", "C": "#ff7f0e", "K": "#2ca02c"}
+    fig = draw_figures(metrics, "TRIFORCE_V4", key_channels, colors_map)
 
     fig.savefig(FIG_PNG_PATH, dpi=300)
     fig.savefig(FIG_SVG_PATH)
@@ -420,6 +205,20 @@ def render_figures(metrics: Dict[str, object]) -> None:
 
 def build_pdf(metrics: Dict[str, object]) -> None:
     """Compose a scientific-style PDF integrating narrative and figures."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import (
+        Image,
+        PageBreak,
+        Paragraph,
+        SimpleDocTemplate,
+        Spacer,
+        Table,
+        TableStyle,
+    )
+
     DOCS_DIR.mkdir(parents=True, exist_ok=True)
 
     styles = getSampleStyleSheet()
@@ -612,7 +411,274 @@ def build_pdf(metrics: Dict[str, object]) -> None:
     doc.build(story)
 
 
+# ---------- Multi-dataset report ----------
+
+
+@dataclass(frozen=True)
+class DatasetJob:
+    name: str
+    quad: str
+    lab: str
+    out_dir: str
+
+
+def panel_channels(metrics: Dict[str, object], limit: int = PANEL_CHANNELS) -> List[str]:
+    """The ``limit`` largest contributors, in the quad's channel order."""
+    active: List[str] = metrics["active_channels"]  # type: ignore[assignment]
+    contribution: Dict[str, float] = metrics["contribution_pct"]  # type: ignore[assignment]
+    ranked = set(sorted(active, key=lambda name: -contribution.get(name, 0.0))[:limit])
+    return [name for name in active if name in ranked]
+
+
+def channel_colors(names: Sequence[str]) -> Dict[str, str]:
+    return {
+        name: CHANNEL_COLORS.get(name, FALLBACK_COLORS[idx % len(FALLBACK_COLORS)])
+        for idx, name in enumerate(names)
+    }
+
+
+def render_dataset(job: DatasetJob) -> Dict[str, object]:
+    """Worker: solve one pair, draw its page once; save the PNG and metrics, return the page PDF.
+
+    Errors are reported in the result rather than raised so one bad pair does not sink
+    the report.
+    """
+    timings: Dict[str, float] = {}
+    result: Dict[str, object] = {"name": job.name, "quad": job.quad, "lab": job.lab, "timings": timings, "error": ""}
+    mark = time.perf_counter()
+    try:
+        quad_curves = load_quad_curves(job.quad)
+        lab_rows = load_lab_measurements(Path(job.lab))
+        timings["load"] = time.perf_counter() - mark
+
+        mark = time.perf_counter()
+        metrics = compute_density_metrics(quad_curves, lab_rows)
+        timings["solve"] = time.perf_counter() - mark
+
+        mark = time.perf_counter()
+        channels = panel_channels(metrics)
+        out_dir = Path(job.out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        figure_path = out_dir / f"{job.name}_density_figures.png"
+        page = figure_pdf(dataset_figure(metrics, job.name, channels), png_path=figure_path)
+        with (out_dir / f"{job.name}_density_metrics.json").open("w") as fh:
+            json.dump(metrics, fh, indent=2)
+        timings["render"] = time.perf_counter() - mark
+    except Exception as exc:  # any failure becomes this dataset's error row
+        result["error"] = f"{type(exc).__name__}: {exc}"
+        return result
+
+    result.update(
+        figure=str(figure_path),
+        steps=len(metrics["inputs"]),  # type: ignore[arg-type]
+        channels=channels,
+        contribution_pct=metrics["contribution_pct"],
+        page=page,
+    )
+    return result
+
+
+def iter_rendered(jobs: Sequence[DatasetJob], workers: Optional[int]) -> Iterator[Dict[str, object]]:
+    """Worker results in job order, with at most two renders per worker in flight."""
+    if workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield render_dataset(job)
+        return
+    workers = workers or os.cpu_count() or 1
+    queue = iter(jobs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Future] = deque(pool.submit(render_dataset, job) for job in itertools.islice(queue, 2 * workers))
+        while pending:
+            result = pending.popleft().result()
+            for job in itertools.islice(queue, 1):
+                pending.append(pool.submit(render_dataset, job))
+            yield result
+
+
+def figure_pdf(fig: Figure, png_path: Optional[Path] = None) -> bytes:
+    """The figure as a single-page PDF (and optionally a PNG); the figure is closed."""
+    import matplotlib.pyplot as plt
+
+    buffer = io.BytesIO()
+    try:
+        if png_path is not None:
+            fig.savefig(png_path, dpi=MULTI_FIGURE_DPI)
+        fig.savefig(buffer, format="pdf")
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+def title_page(jobs: Sequence[DatasetJob]) -> Figure:
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(8.5, 11))
+    fig.text(0.5, 0.62, "Channel Density Solver — Multi-Dataset Report", ha="center", fontsize=18, fontweight="bold")
+    fig.text(
+        0.5, 0.56,
+        f"{len(jobs)} quad/LAB pair(s) · generated {time.strftime('%Y-%m-%d %H:%M')}",
+        ha="center", fontsize=11, color="#555555",
+    )
+    fig.text(
+        0.5, 0.50,
+        "One page per dataset: measured L* ramp, share of the three largest contributors, and their\n"
+        "cumulative density attribution. Summary and timing tables follow the dataset pages.",
+        ha="center", fontsize=9, color="#333333",
+    )
+    return fig
+
+
+def dataset_figure(metrics: Dict[str, object], name: str, channels: Sequence[str]) -> Figure:
+    fig = draw_figures(metrics, name, list(channels), channel_colors(channels))
+    contribution: Dict[str, float] = metrics["contribution_pct"]  # type: ignore[assignment]
+    constants: Dict[str, float] = metrics["density_constants"]  # type: ignore[assignment]
+    fig.supxlabel(
+        "   ".join(
+            f"{name} {contribution.get(name, 0.0):.1f}% (constant {constants.get(name, 0.0):.3f})"
+            for name in metrics["active_channels"]  # type: ignore[union-attr]
+        ),
+        fontsize=8,
+    )
+    return fig
+
+
+def summary_row(result: Dict[str, object]) -> Dict[str, object]:
+    """Drop the page data; keep what the summary tables and JSON need."""
+    row = {key: value for key, value in result.items() if key not in ("page", "contribution_pct")}
+    if not result["error"]:
+        contribution: Dict[str, float] = result["contribution_pct"]  # type: ignore[assignment]
+        top = max(contribution, key=contribution.get) if contribution else ""
+        row["top_channel"] = top
+        row["top_contribution_pct"] = contribution.get(top, 0.0)
+    return row
+
+
+def summary_pages(rows: Sequence[Dict[str, object]], sections: Dict[str, float]) -> Iterator[Figure]:
+    import matplotlib.pyplot as plt
+
+    header = ["Dataset", "Steps", "Top channel", *[f"{name} (ms)" for name in TIMED_SECTIONS]]
+    for start in range(0, len(rows), SUMMARY_ROWS_PER_PAGE):
+        fig = plt.figure(figsize=(8.5, 11))
+        ax = fig.add_axes([0.06, 0.08, 0.88, 0.82])
+        ax.axis("off")
+        cells = []
+        for row in rows[start:start + SUMMARY_ROWS_PER_PAGE]:
+            timings: Dict[str, float] = row["timings"]  # type: ignore[assignment]
+            if row["error"]:
+                top = f"error: {str(row['error'])[:28]}"
+            else:
+                top = f"{row['top_channel']} {row['top_contribution_pct']:.1f}%"
+            cells.append(
+                [str(row["name"]), str(row.get("steps", "—")), top]
+                + [f"{timings[name] * 1000:.1f}" if name in timings else "—" for name in TIMED_SECTIONS]
+            )
+        table = ax.table(cellText=cells, colLabels=header, loc="upper center", cellLoc="center")
+        table.auto_set_font_size(False)
+        table.set_fontsize(7)
+        table.scale(1.0, 1.2)
+        ax.set_title(
+            f"Summary — datasets {start + 1}–{start + len(cells)} of {len(rows)}",
+            loc="left", fontweight="bold",
+        )
+        if start + SUMMARY_ROWS_PER_PAGE >= len(rows):
+            fig.text(
+                0.06, 0.04,
+                "Report sections: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in sections.items()),
+                fontsize=8,
+            )
+        yield fig
+
+
+def build_multi_pdf(jobs: Sequence[DatasetJob], pdf_path: Path, workers: Optional[int]) -> Dict[str, object]:
+    """Stream the consolidated report; returns per-dataset rows and per-section timings."""
+    pdf_path.parent.mkdir(parents=True, exist_ok=True)
+    sections: Dict[str, float] = {}
+    rows: List[Dict[str, object]] = []
+    start = time.perf_counter()
+    metadata = {
+        "Title": "Channel Density Solver — Multi-Dataset Report",
+        "Author": "quadGEN Lab",
+        "Subject": "Density attribution across multiple quad/LAB pairs",
+    }
+    with PdfConcatWriter(pdf_path, metadata) as pdf:
+        mark = time.perf_counter()
+        pdf.add_pdf(figure_pdf(title_page(jobs)))
+        sections["title"] = time.perf_counter() - mark
+
+        mark = time.perf_counter()
+        for result in iter_rendered(jobs, workers):
+            page_start = time.perf_counter()
+            if not result["error"]:
+                pdf.add_pdf(result["page"])  # type: ignore[arg-type]
+            result["timings"]["page"] = time.perf_counter() - page_start  # type: ignore[index]
+            rows.append(summary_row(result))
+        sections["datasets"] = time.perf_counter() - mark
+
+        mark = time.perf_counter()
+        for fig in summary_pages(rows, dict(sections, total=time.perf_counter() - start)):
+            pdf.add_pdf(figure_pdf(fig))
+        sections["summary"] = time.perf_counter() - mark
+    sections["total"] = time.perf_counter() - start
+    return {"pdf": str(pdf_path), "sections": sections, "datasets": rows}
+
+
+def dataset_jobs(rows: Sequence[Sequence[str]], out_dir: Path) -> List[DatasetJob]:
+    """One job per (quad, lab[, name]) row; names default to the quad stem and are made unique."""
+    jobs: List[DatasetJob] = []
+    seen: Dict[str, int] = {}
+    for row in rows:
+        name = row[2] if len(row) > 2 and row[2] else Path(row[0]).stem
+        seen[name] = seen.get(name, 0) + 1
+        if seen[name] > 1:
+            name = f"{name}_{seen[name]}"
+        jobs.append(DatasetJob(name=name, quad=row[0], lab=row[1], out_dir=str(out_dir)))
+    return jobs
+
+
+def print_multi_summary(summary: Dict[str, object]) -> None:
+    rows: List[Dict[str, object]] = summary["datasets"]  # type: ignore[assignment]
+    print(f"{'dataset':<28} " + " ".join(f"{name + ' ms':>10}" for name in TIMED_SECTIONS))
+    for row in rows:
+        timings: Dict[str, float] = row["timings"]  # type: ignore[assignment]
+        cells = " ".join(
+            f"{timings[name] * 1000:>10.1f}" if name in timings else f"{'—':>10}" for name in TIMED_SECTIONS
+        )
+        suffix = f"  FAIL {row['error']}" if row["error"] else ""
+        print(f"{str(row['name'])[:28]:<28} {cells}{suffix}")
+    sections: Dict[str, float] = summary["sections"]  # type: ignore[assignment]
+    print("Sections: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in sections.items()))
+    failures = sum(1 for row in rows if row["error"])
+    print(f"{len(rows) - failures}/{len(rows)} dataset(s) reported in {summary['pdf']}")
+
+
+def run_multi_report(rows: Sequence[Sequence[str]], pdf_path: Path, workers: Optional[int]) -> None:
+    jobs = dataset_jobs(rows, MULTI_ARTIFACT_DIR)
+    summary = build_multi_pdf(jobs, pdf_path, workers)
+    ARTIFACT_DIR.mkdir(parents=True, exist_ok=True)
+    with MULTI_SUMMARY_PATH.open("w") as fh:
+        json.dump(summary, fh, indent=2)
+    print_multi_summary(summary)
+    print(f"Saved summary to {MULTI_SUMMARY_PATH}")
+    if any(row["error"] for row in summary["datasets"]):  # type: ignore[union-attr]
+        raise SystemExit(1)
+
+
 def main() -> None:
+    ap = argparse.ArgumentParser(description="Channel density solver report (TRIFORCE_V4, or many quad/LAB pairs)")
+    ap.add_argument("--pair", nargs=2, action="append", default=[], metavar=("QUAD", "LAB"),
+                    help="A .quad and the LAB .txt measured through it (repeatable; enables multi-dataset mode)")
+    ap.add_argument("--manifest", type=str, default="", help="CSV of quad,lab[,name] rows (multi-dataset mode)")
+    ap.add_argument("--output", type=str, default=str(MULTI_PDF_PATH), help="Consolidated PDF path (multi-dataset mode)")
+    ap.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count; 1 = inline)")
+    args = ap.parse_args()
+
+    rows = [list(pair) for pair in args.pair]
+    if args.manifest:
+        rows.extend(read_manifest(args.manifest))
+    if rows:
+        run_multi_report(rows, Path(args.output), args.workers)
+        return
+
     ensure_dependencies()
 
     quad_curves = load_quad_curves(QUAD_PATH)
@@ -3,11 +3,12 @@
 
 from __future__ import annotations
 
-import csv
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable, List, Sequence, Tuple
 
+from lab_measurements import LabColumns, read_lab_columns
+
 
 DATA_PATH = Path("data/TRIFORCE_V4.txt")
 OUTPUT_DIR = Path("artifacts")
@@ -28,26 +29,24 @@ class Sample:
 
 
 def read_measurements(path: Path) -> List[Sample]:
-    with path.open("r", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle, delimiter="\t")
-        rows = list(reader)
+    return samples_from_columns(read_lab_columns(path))
+
 
-    if not rows:
-        raise ValueError(f"No measurement rows found in {path}")
+def samples_from_columns(columns: LabColumns) -> List[Sample]:
+    """Normalize L* to ink % (0 at the lightest patch, 100 at the darkest)."""
+    if not len(columns):
+        raise ValueError(f"No measurement rows found in {columns.path}")
 
-    max_l = max(float(row["LAB_L"]) for row in rows)
-    min_l = min(float(row["LAB_L"]) for row in rows)
+    max_l = float(columns.lab_l.max())
+    min_l = float(columns.lab_l.min())
     if max_l == min_l:
         raise ValueError("All LAB_L values are identical; cannot normalize to ink range.")
 
-    samples: List[Sample] = []
-    for row in rows:
-        gray = float(row["GRAY"])
-        lab_l = float(row["LAB_L"])
-        ink = (max_l - lab_l) / (max_l - min_l)
-        samples.append(Sample(input_percent=gray, lab_l=lab_l, ink_percent=ink * 100.0))
-    samples.sort(key=lambda s: s.input_percent)
-    return samples
+    ink = (max_l - columns.lab_l) / (max_l - min_l) * 100.0
+    return [
+        Sample(input_percent=gray, lab_l=lab_l, ink_percent=ink_pct)
+        for gray, lab_l, ink_pct in zip(columns.gray.tolist(), columns.lab_l.tolist(), ink.tolist())
+    ]
 
 
 def project_points(
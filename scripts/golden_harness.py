@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Golden regression harness for the Python ports of the app's curve math.
+
+Cases:
+  file:<name>              every LAB .txt / CGATS / .ti3 measurement file under testdata/
+  quad:<quad>+<name>       every testdata .quad paired with each of those measurements
+  synthetic:<seed>         seeded synthetic ramps (5–101 patches, varied gamma, noise and
+                           L* range) with a matching synthetic 1–10 channel .quad
+
+Each case yields one output vector per path:
+
+  pipeline_<method>  run_pipeline(...).corrected                         (256 samples)
+  invert             invert_mapping(...) input % per ink % target        (256 samples)
+  density            compute_density_metrics contribution % then constant per channel
+
+``record`` stores them as one NaN-padded (cases × width) matrix per path plus the case
+ids in a golden .npz. ``check`` recomputes the cases (in a process pool), aligns them
+with the reference by id and compares each path's whole matrix against the stored one
+in a single array pass, giving max and RMS deviation per case. Cases missing from the
+reference, or whose output length differs, are reported rather than compared.
+
+References exported from the browser engine can be checked directly as JSON with the
+same path names and case ids:
+
+  {"params": {"sigma": 0.15, ...}, "pipeline_cie": {"file:linear_reference_lab.txt": [...]}, ...}
+
+Usage:
+  python scripts/golden_harness.py record [--synthetic 32] [--golden testdata/golden/python_reference.npz]
+  python scripts/golden_harness.py check [--synthetic 32] [--golden reference.npz|reference.json] \
+      [--tolerance 1e-6] [--workers 8] [--show 10]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from channel_density import compute_density_metrics
+from compare_density_mappings import load_measurement_pairs, run_pipeline
+from generate_triforce_plots import invert_mapping, samples_from_columns
+from lab_measurements import LabColumns
+from quad_files import QUAD_MAX, load_quad_curves
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+TESTDATA_DIR = REPO_ROOT / "testdata"
+GOLDEN_PATH = TESTDATA_DIR / "golden" / "python_reference.npz"
+
+METHODS = ("legacy", "cie", "hybrid", "pops", "segment_cubic", "cie_cubic", "pchip")
+DEFAULT_PARAMS = {"sigma": 0.15, "threshold": 0.12, "rolloff": 0.10}
+MEASUREMENT_SUFFIXES = (".txt", ".ti3", ".cgats")
+CURVE_SAMPLES = 256
+TOLERANCE = 1e-6
+
+SYNTHETIC_PATCHES = (5, 11, 17, 21, 33, 51, 101)
+SYNTHETIC_CHANNELS = ("K", "C", "M", "Y", "LC", "LM", "LK", "LLK", "MK", "V")
+QUAD_POINTS = 256
+
+
+@dataclass
+class GoldenCase:
+    case_id: str
+    pairs: List[Tuple[float, float]]
+    quad_curves: Optional[Dict[str, List[float]]] = None
+    curves: bool = True
+    """Run the pipeline/invert paths (quad:* cases only exercise the density solver)."""
+
+
+# ---------- Cases ----------
+
+def testdata_cases(root: Path = TESTDATA_DIR) -> List[GoldenCase]:
+    measurements: List[Tuple[str, List[Tuple[float, float]]]] = []
+    for path in sorted(root.iterdir()):
+        if path.suffix.lower() not in MEASUREMENT_SUFFIXES:
+            continue
+        try:
+            measurements.append((path.name, load_measurement_pairs(str(path))))
+        except (OSError, ValueError):
+            continue  # not a measurement file (e.g. notes saved as .txt)
+    cases = [GoldenCase(f"file:{name}", pairs) for name, pairs in measurements]
+    for quad_path in sorted(root.glob("*.quad")):
+        quad_curves = load_quad_curves(quad_path)
+        cases.extend(
+            GoldenCase(f"quad:{quad_path.name}+{name}", pairs, quad_curves, curves=False)
+            for name, pairs in measurements
+        )
+    return cases
+
+
+def synthetic_case(seed: int) -> GoldenCase:
+    """A reproducible ramp + quad: same seed, same case, on any machine."""
+    rng = np.random.default_rng(seed)
+    patches = int(rng.choice(SYNTHETIC_PATCHES))
+    t = np.linspace(0.0, 1.0, patches)
+    l_max = rng.uniform(86.0, 97.0)
+    l_min = rng.uniform(3.0, 30.0)
+    shape = t ** rng.uniform(0.45, 2.2) + rng.normal(0.0, rng.uniform(0.0, 0.012), patches)
+    shape[0] = 0.0
+    l_star = np.round(l_max - (l_max - l_min) * shape, 2)
+
+    channels = int(rng.integers(1, len(SYNTHETIC_CHANNELS) + 1))
+    x = np.linspace(0.0, 1.0, QUAD_POINTS)
+    starts = np.sort(rng.uniform(0.0, 0.6, channels))
+    starts[0] = 0.0
+    quad_curves: Dict[str, List[float]] = {}
+    for idx, name in enumerate(SYNTHETIC_CHANNELS[:channels]):
+        span = rng.uniform(0.25, 1.0)
+        rise = np.clip((x - starts[idx]) / span, 0.0, 1.0) ** rng.uniform(0.8, 2.0)
+        # Lighter inks hand over to the next channel; the last channel ramps to full.
+        fade = 1.0 if idx == channels - 1 else 1.0 - rng.uniform(0.3, 1.0) * np.clip((x - starts[idx] - span) / 0.3, 0.0, 1.0)
+        peak = rng.uniform(0.2, 1.0) * QUAD_MAX
+        quad_curves[name] = np.rint(peak * rise * fade).tolist()
+    return GoldenCase(f"synthetic:{seed}", list(zip((t * 100.0).tolist(), l_star.tolist())), quad_curves)
+
+
+# ---------- Evaluation ----------
+
+def evaluate_case(case: GoldenCase, params: Dict[str, float] = DEFAULT_PARAMS) -> Dict[str, np.ndarray]:
+    """Every path's output vector for one case (ValueError from a path leaves it out)."""
+    outputs: Dict[str, np.ndarray] = {}
+    if case.curves:
+        for method in METHODS:
+            try:
+                result = run_pipeline(list(case.pairs), method, params["sigma"], params["threshold"], params["rolloff"])
+            except ValueError:
+                continue
+            outputs[f"pipeline_{method}"] = np.asarray(result.corrected, dtype=np.float64)
+        gray, l_star = (np.array(column, dtype=np.float64) for column in zip(*case.pairs))
+        try:
+            samples = samples_from_columns(LabColumns.from_arrays(case.case_id, gray, l_star))
+            mapping = invert_mapping(samples, sample_count=CURVE_SAMPLES)
+        except ValueError:
+            pass
+        else:
+            outputs["invert"] = np.array([y for _, y in mapping], dtype=np.float64)
+    if case.quad_curves is not None:
+        rows = [{"GRAY": gray, "LAB_L": l_star} for gray, l_star in case.pairs]
+        metrics = compute_density_metrics(case.quad_curves, rows)
+        contribution: Dict[str, float] = metrics["contribution_pct"]  # type: ignore[assignment]
+        constants: Dict[str, float] = metrics["density_constants"]  # type: ignore[assignment]
+        outputs["density"] = np.array(
+            [contribution.get(name, 0.0) for name in case.quad_curves]
+            + [constants.get(name, 0.0) for name in case.quad_curves],
+            dtype=np.float64,
+        )
+    return outputs
+
+
+def _evaluate(job: Tuple[GoldenCase, Dict[str, float]]) -> Tuple[str, Dict[str, np.ndarray]]:
+    case, params = job
+    return case.case_id, evaluate_case(case, params)
+
+
+@dataclass
+class GoldenSet:
+    """Per path: case ids and a NaN-padded (cases × width) output matrix."""
+
+    params: Dict[str, float]
+    ids: Dict[str, np.ndarray]
+    values: Dict[str, np.ndarray]
+
+
+def _stack(rows: Sequence[np.ndarray]) -> np.ndarray:
+    width = max((row.shape[0] for row in rows), default=0)
+    matrix = np.full((len(rows), width), np.nan)
+    for idx, row in enumerate(rows):
+        matrix[idx, :row.shape[0]] = row
+    return matrix
+
+
+def evaluate_cases(cases: Sequence[GoldenCase], params: Dict[str, float], workers: Optional[int]) -> GoldenSet:
+    jobs = [(case, params) for case in cases]
+    if workers == 1 or len(jobs) <= 1:
+        results = [_evaluate(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunk = max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))
+            results = list(pool.map(_evaluate, jobs, chunksize=chunk))
+    collected: Dict[str, Tuple[List[str], List[np.ndarray]]] = {}
+    for case_id, outputs in results:
+        for kind, vector in outputs.items():
+            ids, rows = collected.setdefault(kind, ([], []))
+            ids.append(case_id)
+            rows.append(vector)
+    return GoldenSet(
+        params=dict(params),
+        ids={kind: np.array(ids) for kind, (ids, _) in collected.items()},
+        values={kind: _stack(rows) for kind, (_, rows) in collected.items()},
+    )
+
+
+# ---------- Storage ----------
+
+def save_golden(path: Path, golden: GoldenSet) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    arrays: Dict[str, np.ndarray] = {"params": np.array(json.dumps(golden.params))}
+    for kind in golden.values:
+        arrays[f"{kind}.ids"] = golden.ids[kind]
+        arrays[f"{kind}.values"] = golden.values[kind]
+    np.savez_compressed(path, **arrays)
+
+
+def load_golden(path: Path) -> GoldenSet:
+    """A recorded .npz, or a JSON export of ``{path: {case id: [values]}}``."""
+    if path.suffix.lower() == ".json":
+        with path.open() as fh:
+            data = json.load(fh)
+        params = dict(DEFAULT_PARAMS, **data.pop("params", {}))
+        return GoldenSet(
+            params=params,
+            ids={kind: np.array(list(cases)) for kind, cases in data.items()},
+            values={kind: _stack([np.asarray(v, dtype=np.float64) for v in cases.values()]) for kind, cases in data.items()},
+        )
+    with np.load(path) as archive:
+        params = json.loads(str(archive["params"]))
+        kinds = [name[:-len(".ids")] for name in archive.files if name.endswith(".ids")]
+        return GoldenSet(
+            params=params,
+            ids={kind: archive[f"{kind}.ids"] for kind in kinds},
+            values={kind: archive[f"{kind}.values"] for kind in kinds},
+        )
+
+
+# ---------- Comparison ----------
+
+@dataclass
+class PathReport:
+    kind: str
+    ids: np.ndarray
+    max_dev: np.ndarray
+    rms_dev: np.ndarray
+    missing: List[str]
+    shape_mismatch: List[str]
+
+    def failures(self, tolerance: float) -> np.ndarray:
+        return np.flatnonzero(self.max_dev > tolerance)
+
+
+def compare_path(kind: str, current: GoldenSet, reference: GoldenSet) -> PathReport:
+    """Align one path's cases by id and diff the matrices in one pass."""
+    cur_ids = current.ids[kind]
+    ref_pos = {case_id: pos for pos, case_id in enumerate(reference.ids.get(kind, np.array([])).tolist())}
+    present = np.array([case_id in ref_pos for case_id in cur_ids.tolist()], dtype=bool)
+    missing = cur_ids[~present].tolist()
+    cur = current.values[kind][present]
+    ref_rows = np.array([ref_pos[case_id] for case_id in cur_ids[present].tolist()], dtype=np.int64)
+    ref = reference.values[kind][ref_rows] if ref_rows.size else np.zeros((0, cur.shape[1]))
+
+    width = max(cur.shape[1], ref.shape[1])
+    cur = np.pad(cur, ((0, 0), (0, width - cur.shape[1])), constant_values=np.nan)
+    ref = np.pad(ref, ((0, 0), (0, width - ref.shape[1])), constant_values=np.nan)
+    cur_valid = ~np.isnan(cur)
+    ref_valid = ~np.isnan(ref)
+    mismatched = (cur_valid != ref_valid).any(axis=1)
+    both = cur_valid & ref_valid
+    diff = np.where(both, np.abs(cur - ref), 0.0)
+    counts = np.maximum(both.sum(axis=1), 1)
+    max_dev = np.where(mismatched, np.inf, diff.max(axis=1, initial=0.0))
+    rms_dev = np.where(mismatched, np.inf, np.sqrt((diff * diff).sum(axis=1) / counts))
+    ids = cur_ids[present]
+    return PathReport(kind, ids, max_dev, rms_dev, missing, ids[mismatched].tolist())
+
+
+def print_summary(reports: Sequence[PathReport], tolerance: float, show: int) -> int:
+    """Compact per-path table plus the worst failing cases; returns the failure count."""
+    print(f"  {'path':<22} {'cases':>6} {'missing':>8} {'fail':>5} {'max dev':>11} {'median rms':>11}  worst case")
+    total_failures = 0
+    worst: List[Tuple[float, str, str, float]] = []
+    for report in reports:
+        failing = report.failures(tolerance)
+        total_failures += failing.size
+        if report.ids.size:
+            top = int(report.max_dev.argmax())
+            worst_max, worst_id = report.max_dev[top], str(report.ids[top])
+            median_rms = float(np.median(report.rms_dev[np.isfinite(report.rms_dev)])) if np.isfinite(report.rms_dev).any() else float("inf")
+        else:
+            worst_max, worst_id, median_rms = 0.0, "—", 0.0
+        print(f"  {report.kind:<22} {report.ids.size:>6} {len(report.missing):>8} {failing.size:>5} "
+              f"{worst_max:>11.3g} {median_rms:>11.3g}  {worst_id}")
+        worst.extend((float(report.max_dev[i]), report.kind, str(report.ids[i]), float(report.rms_dev[i])) for i in failing)
+    if worst and show:
+        worst.sort(reverse=True)
+        print(f"\nWorst {min(show, len(worst))} of {len(worst)} failing case(s) (tolerance {tolerance:g}):")
+        for max_dev, kind, case_id, rms in worst[:show]:
+            print(f"  {kind:<22} {case_id:<48} max {max_dev:.3g}  rms {rms:.3g}")
+    return total_failures
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Record or check golden outputs of the Python curve paths")
+    ap.add_argument("mode", choices=("record", "check"))
+    ap.add_argument("--golden", type=str, default=str(GOLDEN_PATH), help="Reference .npz (record/check) or JSON export (check)")
+    ap.add_argument("--synthetic", type=int, default=32, help="Number of seeded synthetic cases")
+    ap.add_argument("--seed", type=int, default=0, help="First synthetic seed")
+    ap.add_argument("--no-testdata", action="store_true", help="Only run synthetic cases")
+    ap.add_argument("--tolerance", type=float, default=TOLERANCE, help="Max |deviation| allowed per case")
+    ap.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count; 1 = inline)")
+    ap.add_argument("--show", type=int, default=10, help="Failing cases to list")
+    args = ap.parse_args()
+
+    golden_path = Path(args.golden)
+    reference = load_golden(golden_path) if args.mode == "check" else None
+    params = reference.params if reference is not None else dict(DEFAULT_PARAMS)
+
+    start = time.perf_counter()
+    cases = [] if args.no_testdata else testdata_cases()
+    cases.extend(synthetic_case(seed) for seed in range(args.seed, args.seed + args.synthetic))
+    built = time.perf_counter()
+    current = evaluate_cases(cases, params, args.workers)
+    evaluated = time.perf_counter()
+    outputs = sum(ids.size for ids in current.ids.values())
+    print(f"{len(cases)} cases, {outputs} path outputs: built in {built - start:.2f}s, evaluated in {evaluated - built:.2f}s")
+
+    if reference is None:
+        save_golden(golden_path, current)
+        print(f"Recorded {golden_path}")
+        return
+
+    reports = [compare_path(kind, current, reference) for kind in sorted(current.values)]
+    print(f"Compared against {golden_path} in {(time.perf_counter() - evaluated) * 1000:.1f} ms")
+    failures = print_summary(reports, args.tolerance, args.show)
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Per-channel ink-limit search driven by the density solver.
+
+The measured ramp is converted to visual density (L* → Y → −log10 Y), and each step's
+density increment is split between channels in the proportions ``compute_density_metrics``
+allocates that step's ΔL*. Accumulating the increments gives every channel's density
+D_c(x) alongside its ink fraction ink_c(x) = draw / 65535.
+
+Scaling a channel's end point by s scales its whole curve. Its density then follows
+its own measured response R_c (accumulated density vs ink over the rising part of the
+curve, extended linearly past the measured maximum):
+
+  D_c(x; s) = D_c(x) · R_c(s · ink_c(x)) / R_c(ink_c(x))
+
+so s = 1 reproduces the measurement. Density that the solver left unallocated stays
+fixed. Predicted Dmax and the channel's contribution both grow with s, so the smallest
+scale meeting the targets is bracketed per channel: every round evaluates a batch of
+candidate scales in one (candidates × steps) array pass and keeps the interval around
+the first candidate that passes. Channels are searched one after another in quad order,
+each with the limits already found held, so the first channels searched give up the most
+ink. A channel the solver attributes no density to cannot move any prediction and is
+reported as unconstrained rather than cut to ``--min-scale``. The combined limits are
+re-checked against every target at the end; when they miss, nothing is written and the
+exit status is 1.
+
+Usage:
+  python scripts/ink_limit_search.py --quad data/P800.quad --measurement data/P800.txt \
+      --target-dmax 1.55 [--min-contribution K=40] [--channel K --channel LK] \
+      [--candidates 16] [--tolerance 1e-4] [--output limited.quad]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from channel_density import EPSILON, compute_density_metrics, sample_draw
+from colorimetry import lstar_to_density
+from compare_density_mappings import load_measurement_pairs
+from quad_files import QUAD_MAX, load_quad_curves, read_quad, write_quad
+
+DEFAULT_CANDIDATES = 16
+DEFAULT_TOLERANCE = 1e-4
+DEFAULT_MIN_SCALE = 0.05
+DEFAULT_MAX_SCALE = 2.0
+EXTRAPOLATION_SPAN = 0.2
+
+
+@dataclass(frozen=True)
+class ChannelResponse:
+    """Accumulated density vs ink fraction for one channel, with a linear tail."""
+
+    ink: np.ndarray
+    density: np.ndarray
+    tail_slope: float
+
+    def __call__(self, ink: np.ndarray) -> np.ndarray:
+        inside = np.interp(ink, self.ink, self.density)
+        beyond = self.density[-1] + self.tail_slope * (ink - self.ink[-1])
+        return np.where(ink > self.ink[-1], beyond, inside)
+
+
+def channel_response(ink: np.ndarray, density: np.ndarray) -> ChannelResponse:
+    rising = slice(0, int(np.argmax(ink)) + 1)
+    x = np.concatenate(([0.0], np.maximum.accumulate(ink[rising])))
+    y = np.concatenate(([0.0], np.maximum.accumulate(density[rising])))
+    # Keep the last density seen at each distinct ink level.
+    x, last = np.unique(x[::-1], return_index=True)
+    y = y[::-1][last]
+    if x.shape[0] < 2 or x[-1] <= EPSILON:
+        return ChannelResponse(np.array([0.0, 1.0]), np.zeros(2), 0.0)
+    start = int(np.searchsorted(x, x[-1] * (1.0 - EXTRAPOLATION_SPAN)))
+    start = min(start, x.shape[0] - 2)
+    slope = (y[-1] - y[start]) / (x[-1] - x[start])
+    if slope <= 0.0:
+        slope = y[-1] / x[-1]
+    return ChannelResponse(x, y, float(slope))
+
+
+@dataclass
+class InkModel:
+    """Per-channel density model of one quad printed through one measured ramp."""
+
+    channels: List[str]
+    inputs: np.ndarray
+    ink: np.ndarray
+    """(channels, steps) ink fraction sampled at the ramp inputs."""
+    density: np.ndarray
+    """(channels, steps) accumulated density attributed to each channel."""
+    unattributed: np.ndarray
+    """(steps,) measured density not allocated to any channel (paper + solver leftovers)."""
+    responses: List[ChannelResponse]
+    peaks: np.ndarray
+    """(channels,) current end point as an ink fraction."""
+
+    def predict(self, scales: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(batch, channels) scales → predicted Dmax (batch,) and contribution % (batch, channels)."""
+        scales = np.atleast_2d(np.asarray(scales, dtype=np.float64))
+        channel_density = np.empty((scales.shape[0],) + self.density.shape)
+        for c, response in enumerate(self.responses):
+            measured = response(self.ink[c])
+            scaled = response(scales[:, c:c + 1] * self.ink[c])
+            gain = np.where(measured > EPSILON, scaled / np.where(measured > EPSILON, measured, 1.0), scales[:, c:c + 1])
+            channel_density[:, c] = self.density[c] * gain
+        totals = self.unattributed + channel_density.sum(axis=1)
+        final = channel_density[:, :, -1]
+        attributed = final.sum(axis=1, keepdims=True)
+        contribution = np.where(attributed > EPSILON, final / np.where(attributed > EPSILON, attributed, 1.0), 0.0)
+        return totals.max(axis=1), contribution * 100.0
+
+
+def build_model(quad_curves: Dict[str, List[float]], pairs: Sequence[Tuple[float, float]]) -> InkModel:
+    lab_rows = [{"GRAY": gray, "LAB_L": lab_l} for gray, lab_l in pairs]
+    metrics = compute_density_metrics(quad_curves, lab_rows)
+    channels: List[str] = list(metrics["active_channels"])  # type: ignore[arg-type]
+    inputs = np.array([gray for gray, _ in pairs], dtype=np.float64)
+    measured = lstar_to_density(np.array([lab_l for _, lab_l in pairs], dtype=np.float64))
+    increments = np.diff(measured, prepend=measured[0]).clip(min=0.0)
+
+    fractions = np.zeros((len(channels), inputs.shape[0]))
+    for idx, profile in enumerate(metrics["density_profiles"]):  # type: ignore[arg-type]
+        for name, share in profile["shares"].items():
+            fractions[channels.index(name), idx] = share
+    density = np.cumsum(fractions * increments, axis=1)
+    ink = np.array(
+        [[sample_draw(quad_curves[name], gray) / QUAD_MAX for gray in inputs.tolist()] for name in channels]
+    )
+    return InkModel(
+        channels=channels,
+        inputs=inputs,
+        ink=ink,
+        density=density,
+        unattributed=measured - density.sum(axis=0),
+        responses=[channel_response(ink[c], density[c]) for c in range(len(channels))],
+        peaks=np.array([max(quad_curves[name]) / QUAD_MAX for name in channels]),
+    )
+
+
+LIMITED, UNREACHABLE, UNCONSTRAINED = "limited", "unreachable", "unconstrained"
+
+
+@dataclass
+class LimitResult:
+    channel: str
+    status: str
+    """``limited``, ``unreachable`` (the largest allowed scale falls short) or
+    ``unconstrained`` (no attributed density, so the limit does not matter)."""
+    scale: Optional[float]
+    """Smallest passing scale; None unless ``limited``."""
+    peak: float
+    """Current end point, ink fraction."""
+    dmax: float
+    contribution: float
+    evaluations: int
+
+    @property
+    def new_peak(self) -> Optional[float]:
+        return None if self.scale is None else self.peak * self.scale
+
+
+def _bracket(
+    model: InkModel,
+    column: int,
+    held: np.ndarray,
+    dmax_target: float,
+    target: float,
+    min_scale: float,
+    max_scale: float,
+    candidates: int,
+    tolerance: float,
+) -> Tuple[Optional[float], int]:
+    """Smallest scale for one channel (others at ``held``) meeting the targets, and evaluations."""
+    evaluations = 0
+
+    def passes(trial: np.ndarray) -> np.ndarray:
+        nonlocal evaluations
+        scales = np.tile(held, (trial.shape[0], 1))
+        scales[:, column] = trial
+        dmax, contribution = model.predict(scales)
+        evaluations += trial.shape[0]
+        return (dmax >= dmax_target) & (contribution[:, column] >= target)
+
+    lo = float(min_scale)
+    hi = float(min(max_scale, 1.0 / max(float(model.peaks[column]), EPSILON)))
+    passed = passes(np.array([lo, hi]))
+    if passed[0]:
+        return lo, evaluations
+    if not passed[1]:
+        return None, evaluations
+    steps = np.linspace(0.0, 1.0, candidates + 2)[1:-1]
+    while hi - lo > tolerance:
+        trial = lo + (hi - lo) * steps
+        passed = passes(trial)
+        first = int(passed.argmax()) if passed.any() else candidates
+        if first < candidates:
+            hi = float(trial[first])
+        if first > 0:
+            lo = float(trial[first - 1])
+    return hi, evaluations
+
+
+def search_limits(
+    model: InkModel,
+    channels: Sequence[str],
+    target_dmax: Optional[float],
+    min_contribution: Dict[str, float],
+    min_scale: float = DEFAULT_MIN_SCALE,
+    max_scale: float = DEFAULT_MAX_SCALE,
+    candidates: int = DEFAULT_CANDIDATES,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> Tuple[List[LimitResult], np.ndarray]:
+    """Smallest end-point scale per channel meeting every target, searched in order.
+
+    Each channel is searched with the scales already found held; returns the results and
+    the combined (channels,) scale vector.
+    """
+    dmax_target = -np.inf if target_dmax is None else target_dmax
+    scales = np.ones(len(model.channels))
+    results: List[LimitResult] = []
+    evaluations = 0
+    for name in channels:
+        column = model.channels.index(name)
+        target = min_contribution.get(name, -np.inf)
+        if model.density[column, -1] <= EPSILON:
+            # Its scale moves nothing; only its own contribution target can rule it out.
+            _, contribution = model.predict(scales)
+            evaluations += 1
+            status, scale = (UNCONSTRAINED if contribution[0, column] >= target else UNREACHABLE), None
+        else:
+            scale, used = _bracket(model, column, scales, dmax_target, target, min_scale, max_scale,
+                                   candidates, tolerance)
+            evaluations += used
+            status = UNREACHABLE if scale is None else LIMITED
+            if scale is not None:
+                scales[column] = scale
+        dmax, contribution = model.predict(scales)
+        results.append(LimitResult(
+            channel=name,
+            status=status,
+            scale=scale,
+            peak=float(model.peaks[column]),
+            dmax=float(dmax[0]),
+            contribution=float(contribution[0, column]),
+            evaluations=evaluations,
+        ))
+    return results, scales
+
+
+def unmet_targets(
+    model: InkModel, scales: np.ndarray, target_dmax: Optional[float], min_contribution: Dict[str, float]
+) -> List[str]:
+    """Targets the combined ``scales`` miss, as readable strings."""
+    dmax, contribution = model.predict(scales)
+    unmet = []
+    if target_dmax is not None and dmax[0] < target_dmax:
+        unmet.append(f"Dmax {dmax[0]:.3f} < {target_dmax:.3f}")
+    for name, target in min_contribution.items():
+        value = contribution[0, model.channels.index(name)]
+        if value < target:
+            unmet.append(f"{name} contribution {value:.1f}% < {target:.1f}%")
+    return unmet
+
+
+def parse_contributions(items: Sequence[str]) -> Dict[str, float]:
+    targets: Dict[str, float] = {}
+    for item in items:
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"expected CHANNEL=PERCENT, got {item!r}")
+        targets[name.strip()] = float(value)
+    return targets
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Find the smallest channel ink limits that reach density targets")
+    ap.add_argument("--quad", required=True, help=".quad whose curves were printed for the measurement")
+    ap.add_argument("--measurement", required=True, help="LAB .txt or CGATS.17/.ti3 ramp measured through the quad")
+    ap.add_argument("--target-dmax", type=float, default=None, help="Visual density the ramp must reach")
+    ap.add_argument("--min-contribution", action="append", default=[], metavar="CH=PCT",
+                    help="Minimum contribution %% for a channel (repeatable)")
+    ap.add_argument("--channel", action="append", default=[], help="Channel(s) to search (default: all active)")
+    ap.add_argument("--min-scale", type=float, default=DEFAULT_MIN_SCALE, help="Smallest end-point scale tried")
+    ap.add_argument("--max-scale", type=float, default=DEFAULT_MAX_SCALE,
+                    help="Largest end-point scale tried (also capped at 100%% ink)")
+    ap.add_argument("--candidates", type=int, default=DEFAULT_CANDIDATES, help="Candidate scales per channel per round")
+    ap.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Scale bracket width to stop at")
+    ap.add_argument("--output", type=str, default="",
+                    help="Write a .quad with every found limit applied (only when the combined limits meet the targets)")
+    args = ap.parse_args()
+
+    try:
+        min_contribution = parse_contributions(args.min_contribution)
+    except ValueError as exc:
+        ap.error(str(exc))
+    if args.target_dmax is None and not min_contribution:
+        ap.error("pass --target-dmax and/or --min-contribution")
+
+    quad_curves = load_quad_curves(args.quad)
+    model = build_model(quad_curves, load_measurement_pairs(args.measurement))
+    channels = args.channel or [name for name in model.channels if name in min_contribution] or model.channels
+    unknown = [name for name in list(channels) + list(min_contribution) if name not in model.channels]
+    if unknown:
+        ap.error(f"not active in {args.quad}: {', '.join(sorted(set(unknown)))}")
+
+    start = time.perf_counter()
+    results, scales = search_limits(model, channels, args.target_dmax, min_contribution, args.min_scale,
+                                    args.max_scale, max(1, args.candidates), args.tolerance)
+    elapsed = time.perf_counter() - start
+
+    current_dmax, current_contribution = model.predict(np.ones(len(model.channels)))
+    print(f"{args.quad} through {args.measurement}: Dmax {current_dmax[0]:.3f} at current limits")
+    print("  channel  limit now  new limit   scale    Dmax   contribution")
+    for r in results:
+        now = f"{current_contribution[0, model.channels.index(r.channel)]:.1f}%"
+        if r.scale is None:
+            print(f"  {r.channel:<7} {r.peak * 100:8.1f}%   {r.status} (contribution now {now})")
+            continue
+        flag = "  (extrapolated)" if r.scale > 1.0 else ""
+        print(f"  {r.channel:<7} {r.peak * 100:8.1f}%  {r.new_peak * 100:8.1f}%  {r.scale:6.3f}  {r.dmax:6.3f}"
+              f"  {r.contribution:9.1f}%{flag}")
+    evaluations = results[-1].evaluations if results else 0
+    print(f"\n{evaluations} candidate evaluations in {elapsed * 1000:.1f} ms")
+
+    combined_dmax, combined_contribution = model.predict(scales)
+    shares = " ".join(f"{name}={value:.1f}%" for name, value in zip(model.channels, combined_contribution[0].tolist()))
+    print(f"All limits together: predicted Dmax {combined_dmax[0]:.3f}, contributions {shares}")
+    unmet = unmet_targets(model, scales, args.target_dmax, min_contribution)
+    if unmet:
+        suffix = f"; {args.output} not written" if args.output else ""
+        raise SystemExit(f"Targets not met with all limits applied: {', '.join(unmet)}{suffix}")
+
+    if args.output:
+        found = {r.channel: r.scale for r in results if r.scale is not None}
+        quad = read_quad(args.quad)
+        factors = np.array([found.get(name, 1.0) for name in quad.channels])[:, None]
+        values = np.clip(np.rint(quad.values * factors), 0, QUAD_MAX)
+        applied = ", ".join(f"{name} x{scale:.4f}" for name, scale in found.items()) or "none"
+        comments = [f"# Ink limits scaled: {applied}"]
+        write_quad(args.output, quad.channels, values, comments)
+        print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
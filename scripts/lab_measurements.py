@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Shared reader for LAB measurement .txt files (Color Muse style).
+
+The whole file is read in one call and converted to columnar NumPy arrays
+(GRAY, LAB_L, LAB_A, LAB_B). Tab, comma and whitespace separators are accepted,
+as are common header spellings (``GRAY``/``INPUT``, ``LAB_L``/``L*``/``L`` ...)
+and headerless files whose columns follow the GRAY, L, a, b order.
+
+Parsed files are cached per process, keyed by (path, mtime, size), so scripts that
+read the same file repeatedly pay for parsing once.
+
+Usage (benchmark against the legacy per-row readers):
+  python scripts/lab_measurements.py --benchmark [--rows 200000]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+import warnings
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+PathLike = Union[str, Path]
+
+COLUMN_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "GRAY": ("GRAY", "GREY", "INPUT", "INPUT%", "INPUT_PERCENT", "PERCENT", "%", "STEP"),
+    "LAB_L": ("LAB_L", "L*", "L", "LSTAR", "L_STAR"),
+    "LAB_A": ("LAB_A", "A*", "A", "ASTAR", "A_STAR"),
+    "LAB_B": ("LAB_B", "B*", "B", "BSTAR", "B_STAR"),
+}
+COLUMN_ORDER = ("GRAY", "LAB_L", "LAB_A", "LAB_B")
+# Optional per-patch L* standard deviation (written by replicate_merge.py).
+SD_ALIASES = ("LAB_L_SD", "L*_SD", "L_SD", "SD_L", "STDEV_L")
+CACHE_LIMIT = 64
+
+_SEPARATORS = str.maketrans({",": " ", "\t": " ", ";": " "})
+
+
+@dataclass(frozen=True)
+class LabColumns:
+    """Columnar LAB measurements sorted by GRAY; arrays are read-only."""
+
+    path: str
+    gray: np.ndarray
+    lab_l: np.ndarray
+    lab_a: np.ndarray
+    lab_b: np.ndarray
+    lab_l_sd: Optional[np.ndarray] = None
+    """Per-patch L* standard deviation, when the file carries one."""
+
+    def __len__(self) -> int:
+        return int(self.gray.shape[0])
+
+    def column(self, name: str) -> np.ndarray:
+        return {"GRAY": self.gray, "LAB_L": self.lab_l, "LAB_A": self.lab_a, "LAB_B": self.lab_b}[name]
+
+    def pairs(self) -> List[Tuple[float, float]]:
+        """(input_percent, L*) tuples, the shape used by the density-mapping pipelines."""
+        return list(zip(self.gray.tolist(), self.lab_l.tolist()))
+
+    def rows(self) -> List[Dict[str, float]]:
+        """Row dicts keyed by the canonical column names."""
+        columns = [self.column(name).tolist() for name in COLUMN_ORDER]
+        return [dict(zip(COLUMN_ORDER, values)) for values in zip(*columns)]
+
+    def select(self, mask: np.ndarray) -> "LabColumns":
+        sd = None if self.lab_l_sd is None else self.lab_l_sd[mask]
+        return _freeze(self.path, self.gray[mask], self.lab_l[mask], self.lab_a[mask], self.lab_b[mask], sd)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        path: str,
+        gray: np.ndarray,
+        lab_l: np.ndarray,
+        lab_a: Optional[np.ndarray] = None,
+        lab_b: Optional[np.ndarray] = None,
+        lab_l_sd: Optional[np.ndarray] = None,
+    ) -> "LabColumns":
+        """Build sorted, read-only columns from measurements produced by another reader."""
+        gray = np.asarray(gray, dtype=np.float64)
+        order = np.argsort(gray, kind="stable")
+        zeros = np.zeros(gray.shape[0])
+        arrays = [
+            np.array(np.asarray(values, dtype=np.float64)[order])
+            for values in (gray, lab_l, zeros if lab_a is None else lab_a, zeros if lab_b is None else lab_b)
+        ]
+        sd = None if lab_l_sd is None else np.array(np.asarray(lab_l_sd, dtype=np.float64)[order])
+        return _freeze(path, *arrays, sd)
+
+
+_CACHE: "OrderedDict[Tuple[str, int, int], LabColumns]" = OrderedDict()
+
+
+def _freeze(path: str, *arrays: Optional[np.ndarray]) -> LabColumns:
+    for arr in arrays:
+        if arr is not None:
+            arr.flags.writeable = False
+    return LabColumns(path, *arrays)
+
+
+def _canonical(token: str) -> Optional[str]:
+    key = token.strip().strip('"').upper().replace(" ", "_")
+    for name, aliases in COLUMN_ALIASES.items():
+        if key in aliases:
+            return name
+    return None
+
+
+def _is_number(token: str) -> bool:
+    try:
+        float(token)
+    except ValueError:
+        return False
+    return True
+
+
+def _parse_rows(body: str, width: int) -> np.ndarray:
+    """Bulk-convert separator-normalized data lines into a (rows, width) float array.
+
+    The fast path hands the whole body to NumPy's C tokenizer; files with ragged or
+    non-numeric rows fall back to a per-line scan that keeps only complete numeric rows.
+    """
+    lines = [line for line in body.splitlines() if line.strip()]
+    with warnings.catch_warnings():
+        # fromstring warns (instead of raising) when it stops early on a non-numeric token.
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            flat = np.fromstring(body, dtype=np.float64, sep=" ")
+        except (DeprecationWarning, ValueError):
+            flat = None
+    if flat is not None and flat.size == width * len(lines):
+        return flat.reshape(-1, width)
+
+    values: List[List[float]] = []
+    for line in lines:
+        parts = line.split()
+        if len(parts) < width:
+            continue
+        try:
+            values.append([float(p) for p in parts[:width]])
+        except ValueError:
+            continue
+    return np.array(values, dtype=np.float64).reshape(-1, width)
+
+
+def _parse_text(text: str, path: str) -> LabColumns:
+    text = text.lstrip("\ufeff \t\r\n").translate(_SEPARATORS)
+    if not text:
+        raise ValueError(f"No measurement rows found in {path}")
+
+    first_line, _, rest = text.partition("\n")
+    header = first_line.split()
+    width = len(header)
+    sd_index = None
+    if not all(_is_number(t) for t in header):
+        index = {}
+        for position, token in enumerate(header):
+            name = _canonical(token)
+            if name and name not in index:
+                index[name] = position
+            elif sd_index is None and token.strip().strip('"').upper().replace(" ", "_") in SD_ALIASES:
+                sd_index = position
+        body = rest
+    else:
+        index = {name: i for i, name in enumerate(COLUMN_ORDER[:width])}
+        body = text
+
+    if "GRAY" not in index or "LAB_L" not in index:
+        # Headers without recognizable names still follow the GRAY, L, a, b layout.
+        index = {name: i for i, name in enumerate(COLUMN_ORDER[:width])}
+    if width < 2:
+        raise ValueError(f"Expected at least GRAY and L* columns in {path}")
+
+    table = _parse_rows(body, width)
+    order = np.argsort(table[:, index["GRAY"]], kind="stable")
+    table = table[order]
+    zeros = np.zeros(table.shape[0])
+
+    def pick(name: str) -> np.ndarray:
+        return np.ascontiguousarray(table[:, index[name]]) if name in index else zeros.copy()
+
+    sd = None if sd_index is None else np.ascontiguousarray(table[:, sd_index])
+    return _freeze(path, pick("GRAY"), pick("LAB_L"), pick("LAB_A"), pick("LAB_B"), sd)
+
+
+def read_lab_columns(path: PathLike, use_cache: bool = True) -> LabColumns:
+    """Read a LAB .txt file into sorted columnar arrays, reusing cached parses."""
+    path_str = os.fspath(path)
+    try:
+        info = os.stat(path_str)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Input file not found: {path_str}") from None
+    key = (os.path.abspath(path_str), info.st_mtime_ns, info.st_size)
+    if use_cache and key in _CACHE:
+        _CACHE.move_to_end(key)
+        return _CACHE[key]
+
+    with open(path_str, "r", encoding="utf-8", errors="ignore") as fh:
+        columns = _parse_text(fh.read(), path_str)
+    if use_cache:
+        _CACHE[key] = columns
+        while len(_CACHE) > CACHE_LIMIT:
+            _CACHE.popitem(last=False)
+    return columns
+
+
+def clear_cache() -> None:
+    _CACHE.clear()
+
+
+# ---------- Benchmark ----------
+
+def _legacy_parse_lab_txt(path: str) -> List[Tuple[float, float]]:
+    pairs: List[Tuple[float, float]] = []
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for i, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            if i == 0 and ("GRAY" in line.upper() or "LAB" in line.upper()):
+                continue
+            parts = [p.strip() for p in line.replace(",", "\t").split("\t") if p.strip()]
+            if len(parts) < 2:
+                continue
+            try:
+                x = float(parts[0])
+                L = float(parts[1])
+            except ValueError:
+                continue
+            if 0.0 <= x <= 100.0 and 0.0 <= L <= 100.0:
+                pairs.append((x, L))
+    pairs.sort(key=lambda t: t[0])
+    return pairs
+
+
+def _legacy_load_lab_measurements(path: str) -> List[Dict[str, float]]:
+    import csv
+
+    rows: List[Dict[str, float]] = []
+    with open(path) as fh:
+        for row in csv.DictReader(fh, delimiter="\t"):
+            rows.append({key: float(value) for key, value in row.items()})
+    rows.sort(key=lambda r: r["GRAY"])
+    return rows
+
+
+def _legacy_read_measurements(path: str) -> List[Tuple[float, float, float]]:
+    import csv
+
+    with open(path, "r", encoding="utf-8") as handle:
+        rows = list(csv.DictReader(handle, delimiter="\t"))
+    max_l = max(float(row["LAB_L"]) for row in rows)
+    min_l = min(float(row["LAB_L"]) for row in rows)
+    samples = []
+    for row in rows:
+        gray = float(row["GRAY"])
+        lab_l = float(row["LAB_L"])
+        samples.append((gray, lab_l, (max_l - lab_l) / (max_l - min_l) * 100.0))
+    samples.sort(key=lambda s: s[0])
+    return samples
+
+
+def write_synthetic(path: Path, rows: int) -> None:
+    gray = np.linspace(0.0, 100.0, rows)
+    lab_l = 97.0 - 0.9 * gray + np.random.default_rng(0).normal(0.0, 0.2, rows)
+    lab_a = np.random.default_rng(1).normal(0.0, 0.5, rows)
+    lab_b = np.random.default_rng(2).normal(0.0, 0.5, rows)
+    with path.open("w", encoding="utf-8") as fh:
+        fh.write("GRAY\tLAB_L\tLAB_A\tLAB_B\n")
+        for values in zip(gray, lab_l, lab_a, lab_b):
+            fh.write("\t".join(f"{v:.4f}" for v in values) + "\n")
+
+
+def run_benchmark(rows: int, repeats: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "synthetic_lab.txt"
+        write_synthetic(path, rows)
+        size_mb = path.stat().st_size / (1024 * 1024)
+        print(f"Benchmark file: {rows} rows, {size_mb:.1f} MB, best of {repeats}")
+
+        def best(fn) -> float:
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                fn()
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        def shared_cold() -> None:
+            clear_cache()
+            read_lab_columns(path)
+
+        cases = [
+            ("parse_lab_txt (legacy)", lambda: _legacy_parse_lab_txt(str(path))),
+            ("load_lab_measurements (legacy)", lambda: _legacy_load_lab_measurements(str(path))),
+            ("read_measurements (legacy)", lambda: _legacy_read_measurements(str(path))),
+            ("read_lab_columns (cold)", shared_cold),
+            ("read_lab_columns (cached)", lambda: read_lab_columns(path)),
+        ]
+        for label, fn in cases:
+            print(f"  {label:<32} {best(fn) * 1000.0:>10.2f} ms")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Shared LAB measurement reader")
+    ap.add_argument("inputs", nargs="*", help="LAB .txt files to summarize")
+    ap.add_argument("--benchmark", action="store_true", help="Time the shared reader against the legacy readers")
+    ap.add_argument("--rows", type=int, default=200_000, help="Benchmark: synthetic row count")
+    ap.add_argument("--repeats", type=int, default=3, help="Benchmark: repetitions per reader")
+    args = ap.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.rows, args.repeats)
+    for name in args.inputs:
+        columns = read_lab_columns(name)
+        print(
+            f"{name}: {len(columns)} rows, GRAY {columns.gray.min():.1f}–{columns.gray.max():.1f}%, "
+            f"L* {columns.lab_l.min():.2f}–{columns.lab_l.max():.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
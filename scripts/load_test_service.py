@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Load test for scripts/pipeline_service.py.
+
+Opens ``--concurrency`` keep-alive connections and sends ``--requests`` POSTs spread over
+the endpoints. ``--unique`` controls how many distinct payloads are used per endpoint
+(fewer → more cache hits and coalescing). Reports requests/sec and latency percentiles,
+plus the server's cache counters.
+
+Usage:
+  python scripts/pipeline_service.py &
+  python scripts/load_test_service.py [--url http://127.0.0.1:8765] [--requests 2000]
+      [--concurrency 32] [--unique 50] [--routes pipeline,invert,density]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+from typing import Dict, List, Tuple
+from urllib.parse import urlparse
+
+ROUTES = ("pipeline", "invert", "density")
+
+
+def synthetic_pairs(seed: int, points: int = 21) -> List[List[float]]:
+    rng = random.Random(seed)
+    pairs = []
+    for i in range(points):
+        x = i * 100.0 / (points - 1)
+        pairs.append([x, max(0.0, min(100.0, 97.0 - 0.8 * x + rng.gauss(0.0, 0.6)))])
+    return pairs
+
+
+def synthetic_quad(seed: int) -> Dict[str, List[float]]:
+    rng = random.Random(seed)
+    curves = {}
+    for name, start, peak in (("LK", 0.0, 0.45), ("C", 0.25, 0.7), ("K", 0.55, 1.0)):
+        scale = peak * (0.9 + 0.2 * rng.random())
+        curves[name] = [
+            0.0 if i / 255 < start else 65535.0 * scale * ((i / 255 - start) / (1 - start)) ** 1.3
+            for i in range(256)
+        ]
+    return curves
+
+
+def build_payload(route: str, seed: int) -> bytes:
+    pairs = synthetic_pairs(seed)
+    if route == "pipeline":
+        payload = {"pairs": pairs, "method": ("legacy", "cie", "hybrid", "pops")[seed % 4]}
+    elif route == "invert":
+        payload = {"pairs": pairs, "sample_count": 256}
+    else:
+        payload = {
+            "quad_curves": synthetic_quad(seed),
+            "lab_rows": [{"GRAY": x, "LAB_L": lab_l} for x, lab_l in pairs],
+        }
+    return json.dumps(payload).encode("utf-8")
+
+
+async def post(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str, path: str, body: bytes) -> int:
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value.strip())
+    await reader.readexactly(length)
+    return status
+
+
+async def get_json(host: str, port: int, path: str) -> Dict[str, object]:
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    return json.loads(raw.split(b"\r\n\r\n", 1)[1] or b"{}")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+async def run(url: str, total: int, concurrency: int, unique: int, routes: Tuple[str, ...]) -> None:
+    parsed = urlparse(url)
+    host, port = parsed.hostname or "127.0.0.1", parsed.port or 80
+    rng = random.Random(0)
+    plan = [(route, rng.randrange(unique)) for route in (rng.choice(routes) for _ in range(total))]
+    bodies = {(route, seed): build_payload(route, seed) for route, seed in set(plan)}
+    queue: "asyncio.Queue[Tuple[str, int]]" = asyncio.Queue()
+    for item in plan:
+        queue.put_nowait(item)
+
+    latencies: List[float] = []
+    failures: Dict[int, int] = {}
+
+    async def client() -> None:
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while True:
+                try:
+                    route, seed = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                start = time.perf_counter()
+                status = await post(reader, writer, host, f"/{route}", bodies[(route, seed)])
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    failures[status] = failures.get(status, 0) + 1
+        finally:
+            writer.close()
+
+    before = await get_json(host, port, "/stats")
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    after = await get_json(host, port, "/stats")
+
+    latencies.sort()
+    print(f"{len(latencies)} requests in {elapsed:.2f}s over {concurrency} connections "
+          f"({unique} distinct payloads per route: {','.join(routes)})")
+    print(f"  throughput  {len(latencies) / elapsed:10.1f} req/s")
+    for label, pct in (("p50", 50), ("p90", 90), ("p99", 99)):
+        print(f"  {label:<10}  {percentile(latencies, pct) * 1000.0:10.2f} ms")
+    print(f"  max         {latencies[-1] * 1000.0 if latencies else 0.0:10.2f} ms")
+    delta = {key: int(after.get(key, 0)) - int(before.get(key, 0)) for key in ("hits", "misses", "coalesced", "errors")}
+    print(f"  server      hits={delta['hits']} misses={delta['misses']} coalesced={delta['coalesced']} errors={delta['errors']}")
+    if failures:
+        print(f"  failures    {failures}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Load-test the local pipeline service")
+    ap.add_argument("--url", type=str, default="http://127.0.0.1:8765", help="Service base URL")
+    ap.add_argument("--requests", type=int, default=2000, help="Total requests")
+    ap.add_argument("--concurrency", type=int, default=32, help="Concurrent keep-alive connections")
+    ap.add_argument("--unique", type=int, default=50, help="Distinct payloads per route")
+    ap.add_argument("--routes", type=str, default=",".join(ROUTES), help="Comma-separated routes to exercise")
+    args = ap.parse_args()
+
+    routes = tuple(route.strip() for route in args.routes.split(",") if route.strip())
+    unknown = [route for route in routes if route not in ROUTES]
+    if unknown:
+        ap.error(f"unknown routes: {', '.join(unknown)}")
+    asyncio.run(run(args.url, args.requests, args.concurrency, max(1, args.unique), routes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Local SQLite catalog of measurement files, .quad files and their derived metrics.
+
+``index`` walks one or more directories and parses every LAB .txt, CGATS/.ti3 and .quad
+file once, storing:
+
+  - files:               path, kind, size, mtime, content hash
+  - measurement_metrics: print_report region stats per pipeline method, Dmax, L* range
+  - quad_metrics:        channel count, total-ink peak and where it occurs
+  - density_constants:   compute_density_metrics constants for each quad that has a
+                         measurement file with the same stem next to it
+
+Reindexing is incremental: unchanged (size, mtime) entries are skipped, touched files
+whose hash did not change only refresh their stat, and deleted files are pruned. Queries
+then read the catalog instead of re-parsing the raw files.
+
+Usage:
+  python scripts/measurement_catalog.py index data/ testdata/ [--db artifacts/catalog.sqlite]
+  python scripts/measurement_catalog.py worst --region shadow [--method cie] [--limit 10]
+  python scripts/measurement_catalog.py constants [--channel K]
+  python scripts/measurement_catalog.py sql "SELECT kind, COUNT(*) FROM files GROUP BY kind"
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from cgats_reader import is_cgats, read_neutral_ramp
+from channel_density import compute_density_metrics
+from colorimetry import lstar_to_density
+from compare_density_mappings import parse_lab_txt, region_stats, run_pipeline
+from lab_measurements import LabColumns, read_lab_columns
+from quad_diff import total_ink
+from quad_files import read_quad
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_DB = REPO_ROOT / "artifacts" / "catalog.sqlite"
+SCHEMA_VERSION = 1
+HASH_CHUNK = 1024 * 1024
+
+METHODS = ("legacy", "hybrid", "cie", "pops", "segment_cubic")
+MEASUREMENT_SUFFIXES = (".txt", ".ti3", ".cgats")
+QUAD_SUFFIX = ".quad"
+SIGMA = 0.15
+THRESHOLD = 0.12
+ROLLOFF = 0.10
+
+REGION_COLUMNS = {
+    "highlight": "residual_hi",
+    "mid": "residual_mid",
+    "shadow": "residual_sh",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    indexed_at REAL NOT NULL,
+    error TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS measurement_metrics (
+    path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    method TEXT NOT NULL,
+    points INTEGER NOT NULL,
+    dmax REAL NOT NULL,
+    l_min REAL NOT NULL,
+    l_max REAL NOT NULL,
+    residual_hi REAL NOT NULL,
+    residual_mid REAL NOT NULL,
+    residual_sh REAL NOT NULL,
+    corr_hi REAL NOT NULL,
+    corr_mid REAL NOT NULL,
+    corr_sh REAL NOT NULL,
+    slope_mid REAL NOT NULL,
+    PRIMARY KEY (path, method)
+);
+CREATE TABLE IF NOT EXISTS quad_metrics (
+    path TEXT PRIMARY KEY REFERENCES files(path) ON DELETE CASCADE,
+    channels TEXT NOT NULL,
+    ink_peak REAL NOT NULL,
+    ink_peak_input REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS density_constants (
+    quad_path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    measurement_path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    channel TEXT NOT NULL,
+    constant REAL NOT NULL,
+    contribution_pct REAL NOT NULL,
+    PRIMARY KEY (quad_path, channel)
+);
+"""
+
+
+def file_digest(path: str) -> str:
+    """Return a hex digest of the file contents."""
+    hasher = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def connect(db_path: os.PathLike) -> sqlite3.Connection:
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(os.fspath(db_path))
+    conn.execute("PRAGMA foreign_keys = ON")
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version not in (0, SCHEMA_VERSION):
+        raise SystemExit(f"{db_path}: catalog schema {version} is not supported (expected {SCHEMA_VERSION}); delete it to rebuild")
+    conn.executescript(SCHEMA)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+
+# ---------- Parsing ----------
+
+def classify(path: str) -> Optional[str]:
+    lower = path.lower()
+    if lower.endswith(QUAD_SUFFIX):
+        return "quad"
+    if lower.endswith((".ti3", ".cgats")):
+        return "cgats"
+    if lower.endswith(".txt"):
+        try:
+            return "cgats" if is_cgats(path) else "lab"
+        except OSError:
+            return None
+    return None
+
+
+def load_columns(path: str, kind: str) -> LabColumns:
+    if kind == "cgats":
+        return read_neutral_ramp(path).columns
+    return read_lab_columns(path)
+
+
+def measurement_rows(path: str, kind: str) -> List[Tuple]:
+    if kind == "cgats":
+        pairs = read_neutral_ramp(path).pairs()
+    else:
+        pairs = parse_lab_txt(path)
+    if len(pairs) < 2:
+        raise ValueError("Not enough rows parsed; expected at least 2 measurement pairs.")
+    l_values = [lab_l for _, lab_l in pairs]
+    dmax = float(lstar_to_density(np.array(l_values)).max())
+    rows = []
+    for method in METHODS:
+        stats = region_stats(run_pipeline(pairs, method=method, sigma=SIGMA, threshold=THRESHOLD, rolloff=ROLLOFF))
+        rows.append((
+            path, method, len(pairs), dmax, min(l_values), max(l_values),
+            stats["residual_mean_abs_hi"], stats["residual_mean_abs_mid"], stats["residual_mean_abs_sh"],
+            stats["corr_mean_abs_hi"], stats["corr_mean_abs_mid"], stats["corr_mean_abs_sh"],
+            stats["slope_mid"],
+        ))
+    return rows
+
+
+def quad_row(path: str) -> Tuple:
+    quad = read_quad(path)
+    ink = total_ink(quad.values)
+    peak = int(ink.argmax())
+    return (path, ",".join(quad.channels), float(ink[peak]), peak / (ink.shape[0] - 1) * 100.0)
+
+
+def sibling_measurement(quad_path: str, known: Dict[str, str]) -> Optional[str]:
+    stem = os.path.splitext(quad_path)[0]
+    for suffix in MEASUREMENT_SUFFIXES:
+        candidate = stem + suffix
+        if known.get(candidate) in ("lab", "cgats"):
+            return candidate
+    return None
+
+
+def density_rows(quad_path: str, measurement_path: str, kind: str) -> List[Tuple]:
+    quad_curves = read_quad(quad_path).as_dict()
+    lab_rows = load_columns(measurement_path, kind).rows()
+    metrics = compute_density_metrics(quad_curves, lab_rows)
+    constants: Dict[str, float] = metrics["density_constants"]  # type: ignore[assignment]
+    contribution: Dict[str, float] = metrics["contribution_pct"]  # type: ignore[assignment]
+    return [
+        (quad_path, measurement_path, name, value, contribution.get(name, 0.0))
+        for name, value in constants.items()
+    ]
+
+
+# ---------- Indexing ----------
+
+def walk(roots: Iterable[str]) -> Dict[str, str]:
+    found: Dict[str, str] = {}
+    for root in roots:
+        if os.path.isfile(root):
+            candidates: Iterable[str] = [root]
+        else:
+            candidates = (
+                os.path.join(dirpath, name)
+                for dirpath, _, names in os.walk(root)
+                for name in names
+            )
+        for candidate in candidates:
+            path = os.path.abspath(candidate)
+            kind = classify(path)
+            if kind:
+                found[path] = kind
+    return found
+
+
+def index(conn: sqlite3.Connection, roots: Sequence[str], prune: bool = True) -> Dict[str, int]:
+    """Bring the catalog up to date with ``roots``; returns counters for the summary line."""
+    counts = {"parsed": 0, "unchanged": 0, "touched": 0, "failed": 0, "pruned": 0, "pairs": 0}
+    found = walk(roots)
+    known = {path: (size, mtime, digest) for path, size, mtime, digest in
+             conn.execute("SELECT path, size, mtime_ns, digest FROM files")}
+    changed: set = set()
+
+    with conn:
+        for path, kind in sorted(found.items()):
+            info = os.stat(path)
+            previous = known.get(path)
+            if previous and previous[0] == info.st_size and previous[1] == info.st_mtime_ns:
+                counts["unchanged"] += 1
+                continue
+            digest = file_digest(path)
+            if previous and previous[2] == digest:
+                conn.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?",
+                             (info.st_size, info.st_mtime_ns, path))
+                counts["touched"] += 1
+                continue
+
+            conn.execute("DELETE FROM files WHERE path = ?", (path,))
+            error = ""
+            try:
+                if kind == "quad":
+                    row = quad_row(path)
+                    pending = [("INSERT INTO quad_metrics VALUES (?, ?, ?, ?)", [row])]
+                else:
+                    pending = [("INSERT INTO measurement_metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                measurement_rows(path, kind))]
+            except (OSError, ValueError, KeyError, IndexError) as exc:
+                error = str(exc) or exc.__class__.__name__
+                pending = []
+                counts["failed"] += 1
+            conn.execute("INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (path, kind, info.st_size, info.st_mtime_ns, digest, time.time(), error))
+            for statement, rows in pending:
+                conn.executemany(statement, rows)
+            if not error:
+                counts["parsed"] += 1
+                changed.add(path)
+
+        if prune:
+            roots_abs = [os.path.abspath(root) for root in roots]
+            for path in known:
+                inside = any(path == root or path.startswith(root.rstrip(os.sep) + os.sep) for root in roots_abs)
+                if inside and path not in found:
+                    conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                    counts["pruned"] += 1
+
+        # Density constants need both halves of a quad/measurement pair; redo a pair when either side changed.
+        kinds = {path: kind for path, kind in conn.execute("SELECT path, kind FROM files WHERE error = ''")}
+        for quad_path in (path for path, kind in kinds.items() if kind == "quad"):
+            measurement = sibling_measurement(quad_path, kinds)
+            if measurement is None:
+                conn.execute("DELETE FROM density_constants WHERE quad_path = ?", (quad_path,))
+                continue
+            stale = quad_path in changed or measurement in changed or conn.execute(
+                "SELECT 1 FROM density_constants WHERE quad_path = ? AND measurement_path = ? LIMIT 1",
+                (quad_path, measurement),
+            ).fetchone() is None
+            if not stale:
+                continue
+            conn.execute("DELETE FROM density_constants WHERE quad_path = ?", (quad_path,))
+            try:
+                rows = density_rows(quad_path, measurement, kinds[measurement])
+            except (OSError, ValueError, KeyError, IndexError, ZeroDivisionError):
+                continue
+            conn.executemany("INSERT INTO density_constants VALUES (?, ?, ?, ?, ?)", rows)
+            counts["pairs"] += 1
+    return counts
+
+
+# ---------- Queries ----------
+
+def print_rows(cursor: sqlite3.Cursor) -> None:
+    headers = [column[0] for column in cursor.description or []]
+    rows = cursor.fetchall()
+    cells = [[f"{value:.5f}" if isinstance(value, float) else str(value) for value in row] for row in rows]
+    widths = [max([len(h)] + [len(row[i]) for row in cells]) for i, h in enumerate(headers)]
+    print("  ".join(h.ljust(w) for h, w in zip(headers, widths)))
+    for row in cells:
+        print("  ".join(value.ljust(w) for value, w in zip(row, widths)))
+    if not rows:
+        print("(no rows)")
+
+
+def query_worst(conn: sqlite3.Connection, region: str, method: Optional[str], limit: int) -> sqlite3.Cursor:
+    column = REGION_COLUMNS[region]
+    sql = (
+        f"SELECT m.path, m.method, m.points, m.dmax, m.{column} AS residual "
+        "FROM measurement_metrics m JOIN files f USING (path) WHERE f.error = ''"
+    )
+    params: List[object] = []
+    if method:
+        sql += " AND m.method = ?"
+        params.append(method)
+    sql += f" ORDER BY m.{column} DESC LIMIT ?"
+    params.append(limit)
+    return conn.execute(sql, params)
+
+
+def query_constants(conn: sqlite3.Connection, channel: Optional[str]) -> sqlite3.Cursor:
+    sql = "SELECT quad_path, measurement_path, channel, constant, contribution_pct FROM density_constants"
+    params: List[object] = []
+    if channel:
+        sql += " WHERE channel = ?"
+        params.append(channel)
+    return conn.execute(sql + " ORDER BY quad_path, constant DESC", params)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Index measurements and .quad files into a SQLite catalog")
+    ap.add_argument("--db", type=str, default=str(DEFAULT_DB), help=f"Catalog path (default: {DEFAULT_DB})")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p_index = sub.add_parser("index", help="Parse new/changed files under the given paths")
+    p_index.add_argument("paths", nargs="+", help="Directories or files to index")
+    p_index.add_argument("--no-prune", action="store_true", help="Keep entries for files that disappeared")
+
+    p_worst = sub.add_parser("worst", help="Measurements with the largest residual in a region")
+    p_worst.add_argument("--region", choices=sorted(REGION_COLUMNS), default="shadow")
+    p_worst.add_argument("--method", choices=METHODS, default=None)
+    p_worst.add_argument("--limit", type=int, default=10)
+
+    p_const = sub.add_parser("constants", help="Density constants per quad/measurement pair")
+    p_const.add_argument("--channel", type=str, default=None)
+
+    p_sql = sub.add_parser("sql", help="Run a read-only SQL query against the catalog")
+    p_sql.add_argument("query", help="SQL statement")
+
+    args = ap.parse_args()
+    with closing(connect(args.db)) as conn:
+        if args.command == "index":
+            start = time.perf_counter()
+            counts = index(conn, args.paths, prune=not args.no_prune)
+            print(
+                f"Indexed in {time.perf_counter() - start:.2f}s: {counts['parsed']} parsed, "
+                f"{counts['unchanged']} unchanged, {counts['touched']} touched (same hash), "
+                f"{counts['failed']} failed, {counts['pruned']} pruned, {counts['pairs']} density pairs"
+            )
+        elif args.command == "worst":
+            print_rows(query_worst(conn, args.region, args.method, args.limit))
+        elif args.command == "constants":
+            print_rows(query_constants(conn, args.channel))
+        else:
+            conn.execute("PRAGMA query_only = ON")
+            try:
+                print_rows(conn.execute(args.query))
+            except sqlite3.Error as exc:
+                raise SystemExit(f"SQL error: {exc}") from None
+
+
+if __name__ == "__main__":
+    main()
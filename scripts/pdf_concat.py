@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Stream single-page PDFs into one document without re-rendering them.
+
+Built for the pages matplotlib writes (``fig.savefig(buf, format="pdf")``): one
+classic xref table, one flat page tree. Each source's objects are sliced out by
+their xref offsets, renumbered into the output and written immediately, so the
+output grows page by page and nothing but the page object numbers is kept. Stream
+data is copied byte for byte; only dictionaries are rewritten (object references,
+with each page's ``/Parent`` pointing at the output page tree). The page tree,
+catalog, info dictionary and xref are written on ``close()``.
+
+This lets worker processes render report pages in parallel while the main
+process only concatenates bytes.
+"""
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+HEADER = b"%PDF-1.4\n%\xac\xdc \xab\xba\n"
+CATALOG, PAGES, INFO = 1, 2, 3
+
+_REFERENCE = re.compile(rb"(\d+) (\d+) R\b")
+_OBJECT_HEADER = re.compile(rb"\s*(\d+) (\d+) obj\b")
+_STREAM = re.compile(rb">>\s*stream\r?\n")
+
+
+def _pdf_text(value: str) -> bytes:
+    """A PDF text string: literal when ASCII, UTF-16BE hex otherwise."""
+    if value.isascii():
+        escaped = value.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        return b"(" + escaped.encode("ascii") + b")"
+    return b"<FEFF" + value.encode("utf-16-be").hex().upper().encode("ascii") + b">"
+
+
+def _reference(data: bytes, key: bytes) -> int:
+    match = re.search(re.escape(key) + rb"\s+(\d+) \d+ R", data)
+    if match is None:
+        raise ValueError(f"PDF dictionary has no {key.decode()} reference")
+    return int(match.group(1))
+
+
+def split_objects(data: bytes) -> Tuple[Dict[int, bytes], bytes]:
+    """Object number → body (between ``obj`` and ``endobj``), plus the trailer dictionary."""
+    match = re.search(rb"startxref\s+(\d+)\s+%%EOF\s*$", data)
+    if match is None or not data.startswith(b"%PDF-"):
+        raise ValueError("Not a single-revision PDF")
+    xref = int(match.group(1))
+    if data[xref:xref + 4] != b"xref":
+        raise ValueError("PDF uses an xref stream; only classic xref tables are supported")
+    lines = data[xref:].split(b"\n")
+    offsets: List[int] = []
+    row = 1
+    while not lines[row].startswith(b"trailer"):
+        first, count = (int(value) for value in lines[row].split())
+        for number in range(first, first + count):
+            entry = lines[row + 1 + number - first].split()
+            if entry[2] == b"n":
+                offsets.append(int(entry[0]))
+        row += 1 + count
+    trailer = data[data.index(b"trailer", xref):match.start()]
+
+    objects: Dict[int, bytes] = {}
+    bounds = sorted(offsets) + [xref]
+    for start, end in zip(bounds, bounds[1:]):
+        chunk = data[start:end]
+        header = _OBJECT_HEADER.match(chunk)
+        if header is None:
+            raise ValueError(f"No object at offset {start}")
+        body = chunk[header.end():chunk.rindex(b"endobj")]
+        objects[int(header.group(1))] = body
+    return objects, trailer
+
+
+class PdfConcatWriter:
+    """Append single-page PDFs (as bytes) to one output file, in order."""
+
+    def __init__(self, path: Path, metadata: Optional[Dict[str, str]] = None) -> None:
+        self.path = Path(path)
+        self.metadata = dict(metadata or {})
+        self.fh: BinaryIO = self.path.open("wb")
+        self.fh.write(HEADER)
+        self.offsets: Dict[int, int] = {}
+        self.next_number = INFO + 1
+        self.pages: List[int] = []
+
+    def __enter__(self) -> "PdfConcatWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _write(self, number: int, body: bytes) -> None:
+        self.offsets[number] = self.fh.tell()
+        self.fh.write(b"%d 0 obj\n" % number + body.strip(b"\n") + b"\nendobj\n")
+
+    def add_pdf(self, data: bytes) -> int:
+        """Copy every page of one PDF; returns how many pages it had."""
+        objects, trailer = split_objects(data)
+        catalog = _reference(trailer, b"/Root")
+        info = _reference(trailer, b"/Info") if b"/Info" in trailer else None
+        tree = _reference(objects[catalog], b"/Pages")
+        kids = re.search(rb"/Kids\s*\[([^\]]*)\]", objects[tree])
+        page_numbers = [int(ref.group(1)) for ref in _REFERENCE.finditer(kids.group(1))] if kids else []
+        if any(b"/Type /Pages" in objects[number] for number in page_numbers):
+            raise ValueError("Nested page trees are not supported")
+
+        skipped = {catalog, tree, info}
+        renumber = {number: self.next_number + idx for idx, number in enumerate(n for n in sorted(objects) if n not in skipped)}
+        self.next_number += len(renumber)
+        targets = dict(renumber)
+        targets[tree] = PAGES  # each page's /Parent becomes the output page tree
+
+        def rewrite(match: "re.Match[bytes]") -> bytes:
+            return b"%d 0 R" % targets[int(match.group(1))]
+
+        for number, new_number in renumber.items():
+            body = objects[number]
+            stream = _STREAM.search(body)
+            head, tail = (body[:stream.start()], body[stream.start():]) if stream else (body, b"")
+            head = _REFERENCE.sub(rewrite, head)
+            self._write(new_number, head + tail)
+        self.pages.extend(renumber[number] for number in page_numbers)
+        return len(page_numbers)
+
+    def close(self) -> None:
+        if self.fh.closed:
+            return
+        kids = b" ".join(b"%d 0 R" % number for number in self.pages)
+        self._write(PAGES, b"<< /Type /Pages /Kids [ " + kids + b" ] /Count %d >>" % len(self.pages))
+        self._write(CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % PAGES)
+        entries = b" ".join(b"/" + key.encode("ascii") + b" " + _pdf_text(value) for key, value in self.metadata.items())
+        self._write(INFO, b"<< " + entries + b" >>")
+
+        xref = self.fh.tell()
+        size = self.next_number
+        self.fh.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for number in range(1, size):
+            offset = self.offsets.get(number)
+            self.fh.write(b"%010d 00000 n \n" % offset if offset is not None else b"0000000000 65535 f \n")
+        self.fh.write(
+            b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, CATALOG, INFO, xref)
+        )
+        self.fh.close()
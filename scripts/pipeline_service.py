@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Local asyncio HTTP/JSON service exposing the Python correction pipelines.
+
+Endpoints (POST, JSON body → JSON response):
+
+  /pipeline  {"pairs": [[input %, L*], ...], "method": "cie", "sigma": 0.15,
+              "threshold": 0.12, "rolloff": 0.10, "weights": [..]}
+                                                              → run_pipeline result
+  /density   {"quad_curves": {"K": [256 draws], ...},
+              "lab_rows": [{"GRAY": .., "LAB_L": ..}, ...]}  → compute_density_metrics
+  /invert    {"pairs": [[input %, L*], ...], "sample_count": 256}
+             or {"samples": [{"input_percent", "lab_l", "ink_percent"}, ...]}
+                                                              → invert_mapping
+
+GET /health and GET /stats report liveness and cache counters.
+
+CPU-bound work runs in a process pool. Responses are kept in an LRU cache keyed by a
+hash of the endpoint and canonical JSON payload, and identical requests that arrive
+while the first is still computing share its result instead of being recomputed.
+
+Only the standard library is used (HTTP/1.1 with keep-alive, no chunked bodies); the
+server is meant for localhost tools, not as a public endpoint.
+
+Usage:
+  python scripts/pipeline_service.py [--host 127.0.0.1] [--port 8765] [--workers 4] [--cache-size 512]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_SIZE = 512
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class RequestError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+# ---------- Worker-side handlers (run in the process pool) ----------
+
+def handle_pipeline(payload: Dict[str, Any]) -> Dict[str, Any]:
+    from compare_density_mappings import run_pipeline
+
+    pairs = [(float(x), float(lab_l)) for x, lab_l in payload["pairs"]]
+    if len(pairs) < 2:
+        raise ValueError("expected at least 2 measurement pairs")
+    order = sorted(range(len(pairs)), key=pairs.__getitem__)
+
+    def per_pair(key: str) -> Optional[List[float]]:
+        values = payload.get(key)
+        return None if values is None else [float(values[i]) for i in order]
+
+    result = run_pipeline(
+        [pairs[i] for i in order],
+        method=payload.get("method", "cie"),
+        sigma=float(payload.get("sigma", 0.15)),
+        threshold=float(payload.get("threshold", 0.12)),
+        rolloff=float(payload.get("rolloff", 0.10)),
+        densities=per_pair("densities"),
+        weights=per_pair("weights"),
+    )
+    return dataclasses.asdict(result)
+
+
+def handle_density(payload: Dict[str, Any]) -> Dict[str, Any]:
+    from channel_density import compute_density_metrics
+
+    quad_curves = {str(name): [float(v) for v in values] for name, values in payload["quad_curves"].items()}
+    lab_rows = sorted(
+        ({"GRAY": float(row["GRAY"]), "LAB_L": float(row["LAB_L"])} for row in payload["lab_rows"]),
+        key=lambda row: row["GRAY"],
+    )
+    return compute_density_metrics(quad_curves, lab_rows)
+
+
+def handle_invert(payload: Dict[str, Any]) -> Dict[str, Any]:
+    from generate_triforce_plots import Sample, invert_mapping
+
+    if "samples" in payload:
+        samples = [
+            Sample(float(s["input_percent"]), float(s["lab_l"]), float(s["ink_percent"]))
+            for s in payload["samples"]
+        ]
+    else:
+        pairs = sorted((float(x), float(lab_l)) for x, lab_l in payload["pairs"])
+        l_values = [lab_l for _, lab_l in pairs]
+        max_l, min_l = max(l_values), min(l_values)
+        if max_l == min_l:
+            raise ValueError("All LAB_L values are identical; cannot normalize to ink range.")
+        samples = [Sample(x, lab_l, (max_l - lab_l) / (max_l - min_l) * 100.0) for x, lab_l in pairs]
+    if len(samples) < 2:
+        raise ValueError("expected at least 2 samples")
+    mapping = invert_mapping(samples, sample_count=int(payload.get("sample_count", 256)))
+    return {"mapping": [list(point) for point in mapping]}
+
+
+HANDLERS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "/pipeline": handle_pipeline,
+    "/density": handle_density,
+    "/invert": handle_invert,
+}
+
+
+def run_handler(route: str, body: bytes) -> bytes:
+    """Process-pool entry point: decode, compute and encode in the worker."""
+    return json.dumps(HANDLERS[route](json.loads(body))).encode("utf-8")
+
+
+# ---------- Cache & coalescing ----------
+
+@dataclasses.dataclass
+class ServiceStats:
+    requests: int = 0
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    errors: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dataclasses.asdict(self)
+
+
+class ResultCache:
+    """LRU of encoded responses plus in-flight futures for request coalescing."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self.pending: Dict[str, "asyncio.Future[bytes]"] = {}
+
+    @staticmethod
+    def key(route: str, payload: Any) -> str:
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.blake2b(f"{route}\n{canonical}".encode("utf-8"), digest_size=20).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: bytes) -> None:
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+class PipelineService:
+    def __init__(self, workers: Optional[int], cache_size: int) -> None:
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.cache = ResultCache(cache_size)
+        self.stats = ServiceStats()
+
+    async def compute(self, route: str, body: bytes) -> bytes:
+        try:
+            payload = json.loads(body or b"{}")
+        except json.JSONDecodeError as exc:
+            raise RequestError(400, f"invalid JSON: {exc}") from None
+        key = self.cache.key(route, payload)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.stats.hits += 1
+            return cached
+        inflight = self.cache.pending.get(key)
+        if inflight is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        self.stats.misses += 1
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[bytes]" = loop.create_future()
+        self.cache.pending[key] = future
+        try:
+            result = await loop.run_in_executor(self.pool, run_handler, route, body)
+        except Exception as exc:
+            error = RequestError(400, f"{exc.__class__.__name__}: {exc}")
+            future.set_exception(error)
+            # Mark retrieved so an error nobody else awaited is not logged as unhandled.
+            future.exception()
+            raise error from None
+        else:
+            self.cache.put(key, result)
+            future.set_result(result)
+            return result
+        finally:
+            del self.cache.pending[key]
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, bytes]:
+        self.stats.requests += 1
+        if method == "GET" and path == "/health":
+            return 200, b'{"status":"ok"}'
+        if method == "GET" and path == "/stats":
+            data = dict(self.stats.as_dict(), cached=len(self.cache.entries), inflight=len(self.cache.pending))
+            return 200, json.dumps(data).encode("utf-8")
+        if path not in HANDLERS:
+            return 404, json.dumps({"error": f"unknown route {path}"}).encode("utf-8")
+        if method != "POST":
+            return 405, json.dumps({"error": "use POST"}).encode("utf-8")
+        try:
+            return 200, await self.compute(path, body)
+        except RequestError as exc:
+            self.stats.errors += 1
+            return exc.status, json.dumps({"error": str(exc)}).encode("utf-8")
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                raw_length = headers.get("content-length", "0") or "0"
+                try:
+                    length = int(raw_length)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # The body's extent is unknown, so the connection cannot be reused.
+                    status = 400
+                    payload = json.dumps({"error": f"invalid Content-Length {raw_length!r}"}).encode("utf-8")
+                    keep_alive = False
+                elif length > MAX_BODY_BYTES:
+                    status, payload = 413, b'{"error":"body too large"}'
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self.dispatch(method.upper(), target.split("?", 1)[0], body)
+                    keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    def close(self) -> None:
+        self.pool.shutdown(cancel_futures=True)
+
+
+async def serve(host: str, port: int, workers: Optional[int], cache_size: int) -> None:
+    service = PipelineService(workers, cache_size)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Serving pipelines on http://{host}:{port} (workers={workers or 'auto'}, cache={cache_size})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Local HTTP/JSON service for the correction pipelines")
+    ap.add_argument("--host", type=str, default=DEFAULT_HOST, help=f"Bind address (default {DEFAULT_HOST})")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default {DEFAULT_PORT})")
+    ap.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count)")
+    ap.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE, help="LRU cache entries")
+    args = ap.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.cache_size))
+    except KeyboardInterrupt:
+        print(f"\nStopped at {time.strftime('%H:%M:%S')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Vectorized .quad diff and total-ink analyzer.
+
+Everything is computed on (channels × 256) arrays from scripts/quad_files.py:
+
+  - per-channel max / mean |Δ| between two quads and where the largest changes sit
+  - per-input total ink (sum over channels, in % of one full channel) and its peak
+  - ink-limit hits: samples at channel saturation and inputs over a total-ink limit
+  - channel crossovers: inputs where one channel's curve crosses another's
+
+Comparing one quad against a directory fans the work out over a process pool and
+ranks the variants by largest change.
+
+Usage:
+  python scripts/quad_diff.py before.quad after.quad [--top 10] [--total-limit 100]
+  python scripts/quad_diff.py base.quad quads/ [--workers 8] [--top 20]
+  python scripts/quad_diff.py --ink some.quad
+"""
+from __future__ import annotations
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from quad_files import CURVE_LENGTH, QUAD_MAX, QuadCurves, read_quad
+
+DEFAULT_TOTAL_LIMIT = 100.0
+
+
+def input_percent(index: np.ndarray) -> np.ndarray:
+    return np.asarray(index, dtype=np.float64) / (CURVE_LENGTH - 1) * 100.0
+
+
+def align(first: QuadCurves, second: QuadCurves) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Stack both quads on the union of channel names (missing channels read as zero)."""
+    names = list(first.channels) + [name for name in second.channels if name not in first.channels]
+    a = np.zeros((len(names), CURVE_LENGTH))
+    b = np.zeros((len(names), CURVE_LENGTH))
+    for quad, target in ((first, a), (second, b)):
+        rows = [names.index(name) for name in quad.channels]
+        target[rows] = quad.values
+    return names, a, b
+
+
+@dataclass
+class QuadDiff:
+    channels: List[str]
+    before: np.ndarray
+    after: np.ndarray
+
+    @property
+    def delta(self) -> np.ndarray:
+        return self.after - self.before
+
+    def channel_stats(self) -> List[Dict[str, float]]:
+        magnitude = np.abs(self.delta)
+        peak = magnitude.argmax(axis=1)
+        return [
+            {
+                "channel": name,
+                "max_delta": float(magnitude[i, peak[i]]),
+                "max_delta_pct": float(magnitude[i, peak[i]] / QUAD_MAX * 100.0),
+                "mean_delta": float(magnitude[i].mean()),
+                "at_input": float(input_percent(peak[i])),
+            }
+            for i, name in enumerate(self.channels)
+        ]
+
+    def largest_changes(self, top: int) -> List[Tuple[str, float, int, int]]:
+        """(channel, input %, before, after) for the ``top`` largest |Δ| samples."""
+        flat = np.abs(self.delta).ravel()
+        count = min(top, int(np.count_nonzero(flat)))
+        if count == 0:
+            return []
+        picks = np.argpartition(-flat, count - 1)[:count]
+        picks = picks[np.argsort(-flat[picks], kind="stable")]
+        rows, cols = np.unravel_index(picks, self.delta.shape)
+        return [
+            (self.channels[r], float(input_percent(c)), int(self.before[r, c]), int(self.after[r, c]))
+            for r, c in zip(rows.tolist(), cols.tolist())
+        ]
+
+    def max_delta(self) -> float:
+        return float(np.abs(self.delta).max()) if self.delta.size else 0.0
+
+
+def diff_quads(first: QuadCurves, second: QuadCurves) -> QuadDiff:
+    channels, before, after = align(first, second)
+    return QuadDiff(channels, before, after)
+
+
+# ---------- Ink analysis ----------
+
+def total_ink(values: np.ndarray) -> np.ndarray:
+    """Per-input total ink in % of one full channel."""
+    return values.sum(axis=0) / QUAD_MAX * 100.0
+
+
+def limit_hits(values: np.ndarray, total_limit: float) -> Dict[str, object]:
+    saturated = values >= QUAD_MAX
+    over = np.flatnonzero(total_ink(values) > total_limit)
+    return {
+        "saturated_samples": saturated.sum(axis=1),
+        "over_limit_inputs": input_percent(over),
+    }
+
+
+def crossovers(channels: Sequence[str], values: np.ndarray) -> List[Tuple[str, str, List[float]]]:
+    """Inputs where two inked channels swap order (sign change of their difference).
+
+    Samples where the curves are exactly equal are skipped over, so a difference that
+    passes through zero (+, 0, −) is a crossing while one that only touches it (+, 0, +)
+    is not. Every sample from one side to the other must be inked.
+    """
+    diff = values[:, None, :] - values[None, :, :]
+    sign = np.sign(diff)
+    inked = (values[:, None, :] > 0) & (values[None, :, :] > 0)
+    gaps = np.cumsum(~inked, axis=2)
+    out = []
+    for i, j in zip(*np.triu_indices(len(channels), k=1)):
+        nonzero = np.flatnonzero((sign[i, j] != 0) & inked[i, j])
+        before, after = nonzero[:-1], nonzero[1:]
+        flips = (sign[i, j, before] != sign[i, j, after]) & (gaps[i, j, after] == gaps[i, j, before])
+        if flips.any():
+            # Report the midpoint between the samples on either side of the crossing
+            # (the equal sample itself when the curves meet exactly on one).
+            where = (before[flips] + after[flips]) / 2.0
+            out.append((channels[i], channels[j], input_percent(where).round(1).tolist()))
+    return out
+
+
+def print_ink_report(quad: QuadCurves, total_limit: float) -> None:
+    ink = total_ink(quad.values)
+    peak = int(ink.argmax())
+    hits = limit_hits(quad.values, total_limit)
+    print(f"{quad.path}: {len(quad.channels)} channels ({','.join(quad.channels)})")
+    print(f"  total ink peak {ink[peak]:.1f}% at input {input_percent(peak):.1f}%")
+    over = hits["over_limit_inputs"]
+    if len(over):
+        print(f"  {len(over)} inputs over {total_limit:.0f}% total ink ({over[0]:.1f}%–{over[-1]:.1f}%)")
+    saturated = [f"{name}={count}" for name, count in zip(quad.channels, hits["saturated_samples"].tolist()) if count]
+    if saturated:
+        print(f"  saturated samples (=65535): {' '.join(saturated)}")
+    for first, second, where in crossovers(quad.channels, quad.values):
+        shown = ", ".join(f"{w:.1f}%" for w in where[:6]) + (" …" if len(where) > 6 else "")
+        print(f"  crossover {first}/{second} at {shown}")
+
+
+def print_diff_report(first: QuadCurves, second: QuadCurves, top: int, total_limit: float) -> None:
+    diff = diff_quads(first, second)
+    print(f"Diff: {first.path} → {second.path}")
+    print("  channel   max|Δ|   (% full)   mean|Δ|   at input")
+    for row in diff.channel_stats():
+        print(
+            f"  {row['channel']:<8} {row['max_delta']:>7.0f}   {row['max_delta_pct']:>7.2f}%  "
+            f"{row['mean_delta']:>8.1f}   {row['at_input']:>6.1f}%"
+        )
+    changes = diff.largest_changes(top)
+    if changes:
+        print(f"\n  Largest changes (top {len(changes)}):")
+        for name, where, before, after in changes:
+            print(f"    {name:<6} {where:>6.1f}%  {before:>6} → {after:<6} ({after - before:+d})")
+    ink_before = total_ink(diff.before)
+    ink_after = total_ink(diff.after)
+    print(
+        f"\n  total ink peak {ink_before.max():.1f}% → {ink_after.max():.1f}% "
+        f"(max per-input change {np.abs(ink_after - ink_before).max():.2f}%)"
+    )
+    print()
+    print_ink_report(second, total_limit)
+
+
+# ---------- Directory scan ----------
+
+def _scan_one(base: QuadCurves, path: str) -> Dict[str, object]:
+    try:
+        other = read_quad(path)
+    except (OSError, ValueError) as exc:
+        return {"path": path, "error": str(exc)}
+    diff = diff_quads(base, other)
+    stats = diff.channel_stats()
+    worst = max(stats, key=lambda row: row["max_delta"]) if stats else None
+    return {
+        "path": path,
+        "error": "",
+        "max_delta": diff.max_delta(),
+        "worst_channel": worst["channel"] if worst else "",
+        "at_input": worst["at_input"] if worst else 0.0,
+        "ink_peak": float(total_ink(other.values).max()),
+    }
+
+
+def scan_directory(base: QuadCurves, directory: str, workers: Optional[int]) -> List[Dict[str, object]]:
+    paths = sorted(
+        os.path.join(root, name)
+        for root, _, files in os.walk(directory)
+        for name in files
+        if name.lower().endswith(".quad") and os.path.abspath(os.path.join(root, name)) != os.path.abspath(base.path)
+    )
+    job = partial(_scan_one, base)
+    if workers == 1 or len(paths) <= 1:
+        return [job(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunk = max(1, len(paths) // (4 * (workers or os.cpu_count() or 1)))
+        return list(pool.map(job, paths, chunksize=chunk))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Diff .quad files and analyze total ink")
+    ap.add_argument("base", nargs="?", help="Baseline .quad")
+    ap.add_argument("other", nargs="?", help="Second .quad, or a directory of .quad variants")
+    ap.add_argument("--ink", action="append", default=[], help="Only run the total-ink analysis on this .quad (repeatable)")
+    ap.add_argument("--top", type=int, default=10, help="Largest changes / directory rows to list")
+    ap.add_argument("--total-limit", type=float, default=DEFAULT_TOTAL_LIMIT,
+                    help="Total-ink limit in %% of one full channel (default 100)")
+    ap.add_argument("--workers", type=int, default=None, help="Process pool size for directory scans (1 = inline)")
+    args = ap.parse_args()
+
+    for path in args.ink:
+        print_ink_report(read_quad(path), args.total_limit)
+    if not args.base:
+        if not args.ink:
+            ap.error("pass BASE OTHER, or --ink QUAD")
+        return
+    if not args.other:
+        print_ink_report(read_quad(args.base), args.total_limit)
+        return
+
+    base = read_quad(args.base)
+    if not os.path.isdir(args.other):
+        print_diff_report(base, read_quad(args.other), args.top, args.total_limit)
+        return
+
+    rows = scan_directory(base, args.other, args.workers)
+    failed = [row for row in rows if row["error"]]
+    ranked = sorted((row for row in rows if not row["error"]), key=lambda row: -row["max_delta"])
+    print(f"Scanned {len(rows)} quads under {args.other} against {args.base}")
+    print("  max|Δ|  channel  at input  ink peak  file")
+    for row in ranked[: args.top]:
+        print(
+            f"  {row['max_delta']:>6.0f}  {row['worst_channel']:<7}  {row['at_input']:>6.1f}%  "
+            f"{row['ink_peak']:>7.1f}%  {row['path']}"
+        )
+    for row in failed:
+        print(f"  FAIL {row['path']}: {row['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Shared reader/writer for QuadToneRIP .quad files.
+
+Values are collected in one pass and converted with a single NumPy call into a
+(channels × 256) array. Channel names come from the ``## QuadToneRIP K,C,M,...``
+header, as in the app's parseQuadFile; files without that header fall back to the
+``# <name> curve`` markers that quadGEN writes before each block.
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from lab_measurements import PathLike
+
+QUAD_HEADER = "## QuadToneRIP "
+CURVE_LENGTH = 256
+QUAD_MAX = 65535
+
+
+@dataclass(frozen=True)
+class QuadCurves:
+    """Channel names and a read-only (channels, 256) float array of draw values."""
+
+    path: str
+    channels: List[str]
+    values: np.ndarray
+    comments: List[str]
+
+    def as_dict(self) -> Dict[str, List[float]]:
+        return {name: row.tolist() for name, row in zip(self.channels, self.values)}
+
+
+def parse_quad_text(text: str, path: str = "<text>") -> QuadCurves:
+    header: Optional[List[str]] = None
+    markers: List[str] = []
+    comments: List[str] = []
+    numeric: List[str] = []
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            if header is None and line.startswith(QUAD_HEADER):
+                header = [name.strip() for name in line[len(QUAD_HEADER):].split(",") if name.strip()]
+                continue
+            token = line.lstrip("#").strip()
+            if token.endswith("curve"):
+                markers.append(token[:-5].strip())
+            elif not line.startswith("##"):
+                comments.append(line)
+            continue
+        numeric.append(line)
+
+    values = np.array(numeric, dtype=np.float64) if numeric else np.zeros(0)
+    if values.size < CURVE_LENGTH:
+        raise ValueError(
+            f"{path}: Insufficient data: found only {values.size} values, need at least {CURVE_LENGTH} for one channel"
+        )
+    blocks = values.size // CURVE_LENGTH
+    channels = header or markers or [f"Channel{i + 1}" for i in range(blocks)]
+    count = min(len(channels), blocks)
+    table = np.ascontiguousarray(values[: count * CURVE_LENGTH].reshape(count, CURVE_LENGTH))
+    table.flags.writeable = False
+    return QuadCurves(path, channels[:count], table, comments)
+
+
+def read_quad(path: PathLike) -> QuadCurves:
+    path_str = os.fspath(path)
+    with open(path_str, "r", encoding="utf-8", errors="ignore") as fh:
+        return parse_quad_text(fh.read(), path_str)
+
+
+def load_quad_curves(path: PathLike) -> Dict[str, List[float]]:
+    """Parse .quad file into channel->draw list mapping."""
+    return read_quad(path).as_dict()
+
+
+def format_quad(channels: Sequence[str], values: np.ndarray, comments: Sequence[str] = ()) -> str:
+    """Render a .quad with the app's layout: header, comments, then ``# <name> curve`` blocks."""
+    ints = np.clip(np.rint(values), 0, QUAD_MAX).astype(np.uint16)
+    lines = [QUAD_HEADER + ",".join(channels)]
+    lines.extend(comment if comment.startswith("#") else f"# {comment}" for comment in comments)
+    for name, row in zip(channels, ints):
+        lines.append(f"# {name} curve")
+        lines.append("\n".join(map(str, row.tolist())))
+    return "\n".join(lines) + "\n"
+
+
+def write_quad(path: PathLike, channels: Sequence[str], values: np.ndarray, comments: Sequence[str] = ()) -> None:
+    with open(os.fspath(path), "w", encoding="utf-8") as fh:
+        fh.write(format_quad(channels, values, comments))
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Headless batch linearizer: bake a measured correction into every channel of a .quad.
+
+For each (quad, measurement) pair the correction curve from ``run_pipeline`` is
+composed with all channels at once, mirroring the app's measurement path in
+apply1DLUTFixedDomain:
+
+  y_c(x) = baseline_c( LUT(x) )      (PCHIP for both LUT and baselines)
+
+followed by the same per-channel peak rescale so ink limits are preserved. The result
+is written as a new .quad with 16-bit integer values. Batches run in a process pool.
+
+Usage:
+  python scripts/quad_linearizer.py --pair data/P800.quad data/P800.txt [--pair ...] \
+      [--manifest pairs.csv] [--out-dir linearized] [--method legacy] [--workers 8]
+
+A manifest is a CSV with ``quad,measurement[,output]`` columns (header optional).
+Outputs default to ``<quad>_linearized.quad`` in --out-dir, with the measurement stem
+added when one quad is paired with several measurements; two rows that would still
+write the same file stop the run before anything is processed.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from compare_density_mappings import load_measurement_pairs, run_pipeline
+from interpolation import pchip_interpolate
+from quad_files import QUAD_MAX, read_quad, write_quad
+
+METHODS = ("legacy", "cie", "hybrid", "pops", "segment_cubic", "cie_cubic", "pchip")
+
+
+def apply_correction(curves: np.ndarray, correction: Sequence[float]) -> np.ndarray:
+    """Compose a printer-space correction with every channel; returns uint16 (channels, N).
+
+    ``curves`` is (channels, N) draw values; ``correction`` is any-length samples of
+    corrected(t) on an even 0..1 grid (e.g. ``PipelineResult.corrected``).
+    """
+    curves = np.atleast_2d(np.asarray(curves, dtype=np.float64))
+    correction = np.asarray(correction, dtype=np.float64)
+    n = curves.shape[1]
+    t = np.linspace(0.0, 1.0, n)
+    lut_x = np.linspace(0.0, 1.0, correction.shape[0])
+    remapped = np.clip(pchip_interpolate(lut_x, correction, t), 0.0, 1.0) * (n - 1)
+
+    mapped = pchip_interpolate(np.arange(n, dtype=np.float64), curves, remapped)
+    adjusted = np.clip(np.rint(mapped), 0, QUAD_MAX)
+
+    baseline_peak = curves.max(axis=1)
+    corrected_peak = adjusted.max(axis=1)
+    rescale = (baseline_peak > 0) & (corrected_peak > 0) & (np.abs(corrected_peak - baseline_peak) > 1)
+    ratio = np.where(rescale, baseline_peak / np.where(corrected_peak > 0, corrected_peak, 1.0), 1.0)
+    adjusted = np.where(rescale[:, None], np.clip(np.rint(adjusted * ratio[:, None]), 0, QUAD_MAX), adjusted)
+    return adjusted.astype(np.uint16)
+
+
+@dataclass(frozen=True)
+class LinearizeJob:
+    quad: str
+    measurement: str
+    output: str
+    method: str = "legacy"
+    sigma: float = 0.15
+    threshold: float = 0.12
+    rolloff: float = 0.10
+
+
+def linearize_pair(job: LinearizeJob) -> Dict[str, object]:
+    """Run one job end to end; returns a summary row (errors are reported, not raised)."""
+    start = time.perf_counter()
+    try:
+        quad = read_quad(job.quad)
+        pairs = load_measurement_pairs(job.measurement)
+        result = run_pipeline(pairs, method=job.method, sigma=job.sigma, threshold=job.threshold, rolloff=job.rolloff)
+        values = apply_correction(quad.values, result.corrected)
+        comments = [
+            "# Linearization Applied (LAB measurements):",
+            f"# - Global: {os.path.basename(job.measurement)} ({len(pairs)} points, affects all channels)",
+            f"#   Pipeline: {job.method}",
+        ]
+        write_quad(job.output, quad.channels, values, comments)
+    except (OSError, ValueError) as exc:
+        return {"quad": job.quad, "measurement": job.measurement, "output": "", "error": str(exc)}
+    change = np.abs(values.astype(np.int64) - quad.values.astype(np.int64)).max(axis=1)
+    return {
+        "quad": job.quad,
+        "measurement": job.measurement,
+        "output": job.output,
+        "channels": len(quad.channels),
+        "max_change": int(change.max()) if change.size else 0,
+        "seconds": time.perf_counter() - start,
+        "error": "",
+    }
+
+
+def _stem(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def default_output(quad: str, out_dir: str, measurement: str = "") -> str:
+    """``<quad>_linearized.quad``, or ``<quad>_<measurement>_linearized.quad`` when given."""
+    stem = f"{_stem(quad)}_{_stem(measurement)}" if measurement else _stem(quad)
+    return os.path.join(out_dir, f"{stem}_linearized.quad")
+
+
+def output_paths(rows: Sequence[Sequence[str]], out_dir: str) -> List[str]:
+    """Output per row: the explicit one, else the quad stem (plus the measurement stem when
+    several rows share a quad). Raises ValueError when two rows would still write one file."""
+    defaults = [default_output(row[0], out_dir) for row in rows]
+    outputs = []
+    for row, default in zip(rows, defaults):
+        if len(row) > 2 and row[2]:
+            outputs.append(row[2])
+        elif defaults.count(default) > 1:
+            outputs.append(default_output(row[0], out_dir, row[1]))
+        else:
+            outputs.append(default)
+    seen: Dict[str, int] = {}
+    for index, path in enumerate(outputs):
+        key = os.path.normcase(os.path.abspath(path))
+        if key in seen:
+            first = rows[seen[key]]
+            raise ValueError(
+                f"{rows[index][0]} + {rows[index][1]} and {first[0]} + {first[1]} would both write {path}"
+            )
+        seen[key] = index
+    return outputs
+
+
+def read_manifest(path: str) -> List[List[str]]:
+    with open(path, newline="", encoding="utf-8") as fh:
+        rows = [row for row in csv.reader(fh) if row and not row[0].startswith("#")]
+    if rows and rows[0][0].strip().lower() == "quad":
+        rows = rows[1:]
+    return [[cell.strip() for cell in row] for row in rows]
+
+
+def run_batch(jobs: Sequence[LinearizeJob], workers: Optional[int]) -> List[Dict[str, object]]:
+    if workers == 1 or len(jobs) <= 1:
+        return [linearize_pair(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(linearize_pair, jobs, chunksize=max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Apply measured corrections to .quad files in batch")
+    ap.add_argument("--pair", nargs=2, action="append", default=[], metavar=("QUAD", "MEASUREMENT"),
+                    help="A .quad and its LAB/CGATS measurement file (repeatable)")
+    ap.add_argument("--manifest", type=str, default="", help="CSV of quad,measurement[,output] rows")
+    ap.add_argument("--out-dir", type=str, default="linearized", help="Directory for outputs without an explicit path")
+    ap.add_argument("--method", choices=METHODS, default="legacy", help="run_pipeline method (default legacy)")
+    ap.add_argument("--sigma", type=float, default=0.15, help="Gaussian kernel radius (0..1)")
+    ap.add_argument("--threshold", type=float, default=0.12, help="Hybrid: highlight threshold (0..1)")
+    ap.add_argument("--rolloff", type=float, default=0.10, help="Hybrid: transition width (0..1)")
+    ap.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count; 1 = inline)")
+    args = ap.parse_args()
+
+    rows = [list(pair) for pair in args.pair]
+    if args.manifest:
+        rows.extend(read_manifest(args.manifest))
+    if not rows:
+        ap.error("nothing to do: pass --pair or --manifest")
+
+    try:
+        outputs = output_paths(rows, args.out_dir)
+    except ValueError as exc:
+        ap.error(str(exc))
+    os.makedirs(args.out_dir, exist_ok=True)
+    jobs = [
+        LinearizeJob(
+            quad=row[0],
+            measurement=row[1],
+            output=output,
+            method=args.method,
+            sigma=args.sigma,
+            threshold=args.threshold,
+            rolloff=args.rolloff,
+        )
+        for row, output in zip(rows, outputs)
+    ]
+
+    start = time.perf_counter()
+    summaries = run_batch(jobs, args.workers)
+    elapsed = time.perf_counter() - start
+    failures = [s for s in summaries if s["error"]]
+    for summary in summaries:
+        if summary["error"]:
+            print(f"FAIL {summary['quad']} + {summary['measurement']}: {summary['error']}")
+        else:
+            print(f"ok   {summary['output']}  (max change {summary['max_change']})")
+    print(f"\n{len(summaries) - len(failures)}/{len(summaries)} linearized in {elapsed:.2f}s")
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
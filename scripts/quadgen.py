@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the Python tools: ``quadgen <command> [args...]``.
+
+Each command runs one script's ``main()`` with the remaining arguments passed through
+unchanged (``quadgen <command> --help`` shows them). The script's module, and whatever it
+imports, is loaded only when its command runs, so ``quadgen --help`` needs nothing beyond
+the standard library and matplotlib/reportlab load only for the drawing parts of
+density-report.
+
+``--import-time`` starts a fresh interpreter per command and reports how long loading
+the command takes (median over ``--repeats``), the whole process wall time next to a
+bare ``python -c pass``, and any heavy module it pulled in. With ``--budget-ms`` a light
+command over budget, or one that loads a heavy module, fails the run.
+
+Usage:
+  python scripts/quadgen.py compare --input data/P800.txt
+  python scripts/quadgen.py image-diff before.png after.png --min-delta 0.02
+  python scripts/quadgen.py --import-time [compare plots ...] [--repeats 5] [--budget-ms 150]
+"""
+from __future__ import annotations
+
+import argparse
+import importlib
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, List, Optional, Sequence
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+HEAVY_MODULES = ("matplotlib", "reportlab", "scipy", "pandas")
+DEFAULT_REPEATS = 5
+
+
+@dataclass(frozen=True)
+class Command:
+    module: str
+    summary: str
+    light: bool = True
+    """Held to the startup budget; heavy commands are only timed."""
+    path: str = ""
+    """Directory (relative to scripts/) holding the module when it lives elsewhere."""
+
+
+COMMANDS: Dict[str, Command] = {
+    "compare": Command("compare_density_mappings", "Compare L*→density pipelines on a measurement file"),
+    "density-report": Command("generate_channel_density_report", "Channel density PDF report (one or many datasets)", light=False),
+    "plots": Command("generate_triforce_plots", "TRIFORCE_V4 measurement and correction SVGs"),
+    "image-diff": Command("compare_images", "Assert two screenshots differ (or nearly match)", path="../tests/utils"),
+    "image-index": Command("image_index", "Near-duplicate clusters / nearest baseline for screenshot sets", path="../tests/utils"),
+    "linearize": Command("quad_linearizer", "Batch: bake measured corrections into .quad files"),
+    "bands": Command("curve_uncertainty", "Batch: bootstrap confidence bands for corrected curves"),
+    "merge-replicates": Command("replicate_merge", "Batch: merge replicate measurements with outlier rejection"),
+    "golden": Command("golden_harness", "Batch: record/check golden curve and density outputs"),
+    "ink-limit": Command("ink_limit_search", "Batch: per-channel ink-limit search"),
+    "density-edit": Command("channel_density", "Time incremental density re-solves; compare joint NNLS constants"),
+    "catalog": Command("measurement_catalog", "Index and query measurement/.quad files in SQLite"),
+    "serve": Command("pipeline_service", "Local HTTP/JSON pipeline service"),
+    "load-test": Command("load_test_service", "Load test for the pipeline service"),
+    "quad-diff": Command("quad_diff", "Diff .quad files and report total ink"),
+    "acv": Command("acv_curves", "Read and evaluate Photoshop .acv curves"),
+    "cube": Command("cube_lut", "Read .cube LUTs and extract the neutral axis"),
+    "cgats": Command("cgats_reader", "Read CGATS.17 / .ti3 neutral ramps"),
+    "lab": Command("lab_measurements", "Read LAB .txt measurement files"),
+    "spectral": Command("spectral_density", "Spectral reflectance → visual and Status A densities"),
+    "neutrality": Command("colorimetry", "Flag tinted patches (ΔE2000 to neutral); validate the colorimetry kernels"),
+}
+
+# Runs in a fresh interpreter: time loading one command's module, list heavy modules it pulled in.
+PROBE = """
+import sys, time
+sys.path.insert(0, {scripts!r})
+start = time.perf_counter()
+import quadgen
+quadgen.load(sys.argv[1])
+elapsed = time.perf_counter() - start
+heavy = [name for name in quadgen.HEAVY_MODULES if name in sys.modules]
+print(elapsed, len(sys.modules), ",".join(heavy))
+"""
+
+
+def load(name: str) -> ModuleType:
+    """Import the module behind ``name`` (nothing else is imported up front)."""
+    command = COMMANDS[name]
+    if command.path:
+        directory = str((SCRIPTS_DIR / command.path).resolve())
+        if directory not in sys.path:
+            sys.path.insert(0, directory)
+    return importlib.import_module(command.module)
+
+
+def run(name: str, argv: Sequence[str]) -> None:
+    module = load(name)
+    sys.argv = [f"quadgen {name}", *argv]
+    module.main()
+
+
+@dataclass
+class StartupTiming:
+    name: str
+    import_ms: float
+    process_ms: float
+    modules: int
+    heavy: List[str]
+    error: str = ""
+
+
+def _process_ms(args: Sequence[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run(args, check=True, capture_output=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def measure_startup(name: str, repeats: int) -> StartupTiming:
+    probe = PROBE.format(scripts=str(SCRIPTS_DIR))
+    imports: List[float] = []
+    processes: List[float] = []
+    modules = 0
+    heavy: List[str] = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", probe, name], capture_output=True, text=True)
+        processes.append((time.perf_counter() - start) * 1000)
+        if proc.returncode != 0:
+            lines = proc.stderr.strip().splitlines()
+            return StartupTiming(name, float("nan"), float("nan"), 0, [], lines[-1] if lines else f"exit {proc.returncode}")
+        elapsed, count, loaded = (proc.stdout.strip().split(" ") + [""])[:3]
+        imports.append(float(elapsed) * 1000)
+        modules = int(count)
+        heavy = [module for module in loaded.split(",") if module]
+    return StartupTiming(name, statistics.median(imports), statistics.median(processes), modules, heavy)
+
+
+def report_startup(names: Sequence[str], repeats: int, budget_ms: Optional[float]) -> int:
+    """Print the startup table; returns the number of budget violations."""
+    baseline = statistics.median(_process_ms([sys.executable, "-c", "pass"]) for _ in range(repeats))
+    print(f"python -c pass: {baseline:.1f} ms (median of {repeats})")
+    print(f"  {'command':<18} {'import ms':>10} {'process ms':>11} {'modules':>8}  heavy")
+    violations = 0
+    for name in names:
+        timing = measure_startup(name, repeats)
+        command = COMMANDS[name]
+        if timing.error:
+            print(f"  {name:<18} {'—':>10} {'—':>11} {'—':>8}  ERROR {timing.error}")
+            violations += 1
+            continue
+        flags = []
+        if command.light and timing.heavy:
+            flags.append("loads heavy modules")
+        if budget_ms is not None and command.light and timing.import_ms > budget_ms:
+            flags.append(f"over {budget_ms:g} ms budget")
+        if not command.light:
+            flags.append("heavy command, not budgeted")
+        violations += sum(1 for flag in flags if not flag.startswith("heavy command"))
+        note = f"  [{'; '.join(flags)}]" if flags else ""
+        print(f"  {name:<18} {timing.import_ms:>10.1f} {timing.process_ms:>11.1f} {timing.modules:>8}  "
+              f"{','.join(timing.heavy) or '—'}{note}")
+    return violations
+
+
+def build_parser() -> argparse.ArgumentParser:
+    width = max(len(name) for name in COMMANDS)
+    listing = "\n".join(f"  {name:<{width}}  {command.summary}" for name, command in COMMANDS.items())
+    ap = argparse.ArgumentParser(
+        prog="quadgen",
+        description="quadGEN Python tools. Run 'quadgen <command> --help' for a command's options.",
+        epilog=f"commands:\n{listing}",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    ap.add_argument("--import-time", nargs="*", metavar="COMMAND",
+                    help="Measure per-command startup in fresh interpreters (default: all commands)")
+    ap.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Interpreter launches per command")
+    ap.add_argument("--budget-ms", type=float, default=None,
+                    help="Fail when a light command's import time exceeds this")
+    return ap
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] in COMMANDS:
+        run(argv[0], argv[1:])
+        return
+
+    ap = build_parser()
+    args = ap.parse_args(argv)
+    if args.import_time is None:
+        ap.print_help()
+        raise SystemExit(2)
+    names = args.import_time or list(COMMANDS)
+    unknown = [name for name in names if name not in COMMANDS]
+    if unknown:
+        ap.error(f"unknown command(s): {', '.join(unknown)}")
+    if report_startup(names, max(1, args.repeats), args.budget_ms):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Merge replicate LAB / CGATS measurements of the same target into one dataset.
+
+Files are read one at a time (LAB .txt via lab_measurements, CGATS.17/.ti3 neutral ramps
+via cgats_reader) and reduced to their reads' L*/a*/b* triples keyed by input %; nothing
+else of a file is held once it has been added. The medians below need every read of a
+patch, so memory grows with the total read count (24 bytes per read).
+
+Outlier reads are rejected by a robust z-score per patch,
+
+  z = 0.6745 · |x − median| / MAD
+
+on each of L*, a*, b* (MAD floored at the median MAD across patches, so three nearly
+identical reads do not make a fourth look wild). Only patches with at least three reads
+can reject, and at most a minority of their reads. Means and sample standard deviations
+are then computed from the kept reads.
+
+The merged file is a LAB .txt with per-patch standard deviations and read counts:
+
+  GRAY  LAB_L  LAB_A  LAB_B  LAB_L_SD  LAB_A_SD  LAB_B_SD  N
+
+Every reader in scripts/ accepts it, and compare_density_mappings / run_pipeline weight
+patches by inverse L* variance when the LAB_L_SD column is present. Patches with a single
+read get the median SD of the others.
+
+Usage:
+  python scripts/replicate_merge.py read1.txt read2.txt read3.ti3 -o merged.txt \
+      [--z-threshold 3.5] [--verbose]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from cgats_reader import is_cgats, read_neutral_ramp
+from lab_measurements import LabColumns, PathLike, read_lab_columns
+
+Z_THRESHOLD = 3.5
+MAD_SCALE = 0.6745
+MAD_FLOOR = 0.05
+MIN_READS_FOR_REJECTION = 3
+KEY_DECIMALS = 6
+HEADER = ("GRAY", "LAB_L", "LAB_A", "LAB_B", "LAB_L_SD", "LAB_A_SD", "LAB_B_SD", "N")
+
+
+def read_replicate(path: PathLike) -> LabColumns:
+    """One replicate's measurements as columns (CGATS neutral ramp or LAB .txt)."""
+    if is_cgats(path):
+        return read_neutral_ramp(path).columns
+    return read_lab_columns(path, use_cache=False)
+
+
+def _batch_stats(index: np.ndarray, values: np.ndarray, patches: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-patch (count, mean, M2) of the given reads."""
+    count = np.bincount(index, minlength=patches).astype(np.float64)
+    safe = np.where(count > 0, count, 1)[:, None]
+    mean = np.stack([np.bincount(index, values[:, k], patches) for k in range(3)], axis=1) / safe
+    dev = values - mean[index]
+    m2 = np.stack([np.bincount(index, dev[:, k] * dev[:, k], patches) for k in range(3)], axis=1)
+    return count, mean, m2
+
+
+@dataclass
+class RejectedRead:
+    source: str
+    gray: float
+    lab: Tuple[float, float, float]
+    z: float
+
+
+@dataclass
+class MergedMeasurements:
+    gray: np.ndarray
+    mean: np.ndarray
+    """(patches, 3) L*, a*, b* means over the kept reads."""
+    sd: np.ndarray
+    """(patches, 3) sample standard deviations (single-read patches: median of the others)."""
+    count: np.ndarray
+    rejected: List[RejectedRead]
+    sources: List[str]
+
+    def columns(self) -> LabColumns:
+        return LabColumns.from_arrays(
+            "merged:" + ",".join(self.sources), self.gray, self.mean[:, 0], self.mean[:, 1], self.mean[:, 2],
+            lab_l_sd=self.sd[:, 0],
+        )
+
+    def pairs(self) -> List[Tuple[float, float]]:
+        return self.columns().pairs()
+
+
+class ReplicateMerger:
+    """Per-patch reads collected over any number of replicate files."""
+
+    def __init__(self) -> None:
+        self.keys: Dict[float, int] = {}
+        self.gray: List[float] = []
+        self.reads: List[Tuple[int, np.ndarray, np.ndarray]] = []
+        self.sources: List[str] = []
+
+    def _indices(self, gray: np.ndarray) -> np.ndarray:
+        index = np.empty(gray.shape[0], dtype=np.int64)
+        for i, value in enumerate(np.round(gray, KEY_DECIMALS).tolist()):
+            slot = self.keys.get(value)
+            if slot is None:
+                slot = self.keys[value] = len(self.gray)
+                self.gray.append(value)
+            index[i] = slot
+        return index
+
+    def add(self, columns: LabColumns, source: str) -> None:
+        """Keep one replicate's L*/a*/b* reads, keyed by patch."""
+        index = self._indices(columns.gray)
+        values = np.stack([columns.lab_l, columns.lab_a, columns.lab_b], axis=1)
+        self.reads.append((len(self.sources), index, values))
+        self.sources.append(source)
+
+    def add_file(self, path: PathLike) -> None:
+        self.add(read_replicate(path), os.fspath(path))
+
+    def finish(self, z_threshold: float = Z_THRESHOLD) -> MergedMeasurements:
+        """Reject outlier reads, then report means and deviations per patch (sorted by input)."""
+        patches = len(self.gray)
+        source = np.concatenate([np.full(idx.shape[0], src) for src, idx, _ in self.reads])
+        index = np.concatenate([idx for _, idx, _ in self.reads])
+        values = np.concatenate([vals for _, _, vals in self.reads])
+        order = np.argsort(index, kind="stable")
+        source, index, values = source[order], index[order], values[order]
+        starts = np.searchsorted(index, np.arange(patches + 1))
+
+        medians = np.zeros((patches, 3))
+        mads = np.full((patches, 3), np.nan)
+        for p in range(patches):
+            block = values[starts[p]:starts[p + 1]]
+            medians[p] = np.median(block, axis=0)
+            if block.shape[0] >= MIN_READS_FOR_REJECTION:
+                mads[p] = np.median(np.abs(block - medians[p]), axis=0)
+        pooled = np.nanmedian(mads, axis=0) if np.isfinite(mads).any() else np.zeros(3)
+        floor = np.maximum(np.nan_to_num(pooled), MAD_FLOOR)
+        scale = np.maximum(np.nan_to_num(mads, nan=np.inf), floor)
+        z = (MAD_SCALE * np.abs(values - medians[index]) / scale[index]).max(axis=1)
+        reject = z > z_threshold
+        # Never reject a majority (or below the minimum read count) at a patch.
+        rejected_per_patch = np.bincount(index[reject], minlength=patches)
+        reads_per_patch = np.diff(starts)
+        allowed = (reads_per_patch >= MIN_READS_FOR_REJECTION) & (2 * rejected_per_patch < reads_per_patch)
+        reject &= allowed[index]
+
+        count, mean, m2 = _batch_stats(index[~reject], values[~reject], patches)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sd = np.sqrt(m2 / (count - 1)[:, None])
+        single = count < 2
+        if single.any():
+            fill = np.nanmedian(sd[~single], axis=0) if (~single).any() else np.zeros(3)
+            sd[single] = np.nan_to_num(fill)
+
+        rejected = [
+            RejectedRead(self.sources[source[i]], self.gray[index[i]], tuple(values[i].tolist()), float(z[i]))
+            for i in np.flatnonzero(reject)
+        ]
+        gray = np.array(self.gray)
+        by_input = np.argsort(gray, kind="stable")
+        return MergedMeasurements(
+            gray=gray[by_input], mean=mean[by_input], sd=sd[by_input], count=count[by_input],
+            rejected=rejected, sources=list(self.sources),
+        )
+
+
+def merge_replicates(paths: Sequence[PathLike], z_threshold: float = Z_THRESHOLD) -> MergedMeasurements:
+    merger = ReplicateMerger()
+    for path in paths:
+        merger.add_file(path)
+    return merger.finish(z_threshold)
+
+
+def write_merged(path: PathLike, merged: MergedMeasurements) -> None:
+    lines = ["\t".join(HEADER)]
+    for gray, mean, sd, count in zip(merged.gray.tolist(), merged.mean.tolist(), merged.sd.tolist(), merged.count.tolist()):
+        lines.append("\t".join([f"{gray:g}"] + [f"{v:.4f}" for v in mean + sd] + [str(int(count))]))
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write("\n".join(lines) + "\n")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Merge replicate LAB/CGATS measurements with outlier rejection")
+    ap.add_argument("inputs", nargs="+", help="Replicate LAB .txt or CGATS.17/.ti3 files of the same target")
+    ap.add_argument("-o", "--output", type=str, default="", help="Merged LAB .txt to write")
+    ap.add_argument("--z-threshold", type=float, default=Z_THRESHOLD, help="Robust z-score above which a read is dropped")
+    ap.add_argument("--verbose", action="store_true", help="List every rejected read")
+    args = ap.parse_args()
+
+    start = time.perf_counter()
+    merged = merge_replicates(args.inputs, args.z_threshold)
+    elapsed = time.perf_counter() - start
+
+    reads = int(merged.count.sum()) + len(merged.rejected)
+    print(f"{len(merged.sources)} files, {merged.gray.shape[0]} patches, {reads} reads merged in {elapsed * 1000:.1f} ms")
+    print(f"  rejected {len(merged.rejected)} read(s) with robust |z| > {args.z_threshold:g}")
+    sd_l = merged.sd[:, 0]
+    print(f"  L* SD per patch: median {np.median(sd_l):.3f}, max {sd_l.max():.3f} at {merged.gray[sd_l.argmax()]:g}%")
+    if args.verbose:
+        for read in merged.rejected:
+            l_star, a_star, b_star = read.lab
+            print(f"    {read.gray:7.2f}%  L*={l_star:7.3f} a*={a_star:6.2f} b*={b_star:6.2f}  z={read.z:5.1f}  {read.source}")
+    if args.output:
+        write_merged(args.output, merged)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
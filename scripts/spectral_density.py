@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Spectral reflectance → density, computed for every patch in one matrix product.
+
+Each response is a column of a (bands × responses) weighting matrix normalized so a
+perfect white integrates to 1:
+
+  visual                        ISO visual density, CIE 1931 ȳ(λ) weighted by D50
+  status_a_red/_green/_blue     ISO 5-3 Status A spectral products
+
+Densities for every patch and every response then come from one product
+
+  D = −log10( R · W )    with R: (patches × bands), W: (bands × responses)
+
+Weights are tabulated at 10 nm from 380 to 730 nm and resampled onto the file's
+wavelengths when a .ti3 uses a different grid. Reflectance given in percent (ArgyllCMS
+default) is rescaled to 0..1: ``--reflectance auto`` trusts a ``SPECTRAL_NORM`` header
+keyword and otherwise guesses percent when any value exceeds 1.5, so files whose
+brightest patch is at most 1.5 % need ``--reflectance percent``.
+
+Usage:
+  python scripts/spectral_density.py testdata/cgats17_21step_rich.ti3 [--reflectance percent]
+  python scripts/spectral_density.py --benchmark [--patches 20000]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from cgats_reader import read_neutral_ramp
+
+EPS = 1e-6
+
+TABLE_WAVELENGTHS = np.arange(380.0, 731.0, 10.0)
+
+# CIE 1931 2° photopic luminosity ȳ(λ), 380–730 nm at 10 nm.
+CIE_Y_BAR = np.array([
+    0.000039, 0.000120, 0.000396, 0.001210, 0.004000, 0.011600, 0.023000, 0.038000,
+    0.060000, 0.090980, 0.139020, 0.208020, 0.323000, 0.503000, 0.710000, 0.862000,
+    0.954000, 0.994950, 0.995000, 0.952000, 0.870000, 0.757000, 0.631000, 0.503000,
+    0.381000, 0.265000, 0.175000, 0.107000, 0.061000, 0.032000, 0.017000, 0.008210,
+    0.004102, 0.002091, 0.001047, 0.000520,
+])
+
+# CIE D50 relative spectral power, 380–730 nm at 10 nm.
+D50_SPD = np.array([
+    24.49, 29.87, 49.31, 56.51, 60.03, 57.82, 74.82, 87.25,
+    90.61, 91.37, 95.11, 91.96, 95.72, 96.61, 97.13, 102.10,
+    100.75, 102.32, 100.00, 97.74, 98.92, 93.50, 97.69, 99.27,
+    99.04, 95.72, 98.86, 95.67, 98.19, 103.00, 99.13, 87.38,
+    91.60, 92.89, 76.85, 81.68,
+])
+
+# ISO 5-3 Status A spectral products as log10 values (peak 5.000), 380–730 nm at 10 nm;
+# None marks bands outside the response.
+STATUS_A_LOG = {
+    "red": [None] * 22 + [
+        2.568, 4.638, 5.000, 4.871, 4.604, 4.286, 3.900, 3.551, 3.165, 2.776, 2.383, 1.970,
+        1.551, 1.141,
+    ],
+    "green": [None] * 12 + [
+        1.650, 3.822, 4.782, 5.000, 4.906, 4.644, 4.221, 3.609, 2.766, 1.579,
+    ] + [None] * 14,
+    "blue": [None] * 3 + [
+        3.602, 4.819, 5.000, 4.912, 4.620, 4.040, 2.989, 1.566, 0.165,
+    ] + [None] * 24,
+}
+
+
+def _from_log(values: Sequence[Optional[float]]) -> np.ndarray:
+    return np.array([0.0 if value is None else 10.0 ** value for value in values])
+
+
+RESPONSES: Dict[str, np.ndarray] = {
+    "visual": CIE_Y_BAR * D50_SPD,
+    **{f"status_a_{channel}": _from_log(values) for channel, values in STATUS_A_LOG.items()},
+}
+DEFAULT_RESPONSES = ("visual", "status_a_red", "status_a_green", "status_a_blue")
+REFLECTANCE_UNITS = ("auto", "fraction", "percent")
+
+
+def weighting_matrix(
+    wavelengths: Sequence[float], responses: Sequence[str] = ("visual",)
+) -> np.ndarray:
+    """(bands × responses) weights resampled to ``wavelengths``, each column summing to 1."""
+    wl = np.asarray(wavelengths, dtype=np.float64)
+    columns = [np.interp(wl, TABLE_WAVELENGTHS, RESPONSES[name], left=0.0, right=0.0) for name in responses]
+    weights = np.stack(columns, axis=1)
+    totals = weights.sum(axis=0)
+    if np.any(totals <= 0.0):
+        raise ValueError("Spectral bands do not overlap the weighting functions (380–730 nm)")
+    return weights / totals
+
+
+def reflectance_scale(
+    spectra: np.ndarray, unit: str = "auto", keywords: Optional[Mapping[str, str]] = None
+) -> float:
+    """Factor taking the file's reflectance to 0..1.
+
+    ``unit`` is ``fraction``, ``percent`` or ``auto``; ``auto`` uses the header's
+    ``SPECTRAL_NORM`` (the value of a perfect white) when present and otherwise guesses
+    percent from any value above 1.5.
+    """
+    if unit == "fraction":
+        return 1.0
+    if unit == "percent":
+        return 0.01
+    if unit != "auto":
+        raise ValueError(f"Unknown reflectance unit '{unit}' (expected one of {', '.join(REFLECTANCE_UNITS)})")
+    norm = (keywords or {}).get("SPECTRAL_NORM")
+    if norm:
+        try:
+            value = float(norm)
+        except ValueError:
+            raise ValueError(f"SPECTRAL_NORM '{norm}' is not a number") from None
+        if value <= 0.0:
+            raise ValueError(f"SPECTRAL_NORM must be positive, got {norm}")
+        return 1.0 / value
+    return 0.01 if spectra.size and float(np.nanmax(spectra)) > 1.5 else 1.0
+
+
+def spectral_densities(
+    spectra: np.ndarray,
+    wavelengths: Sequence[float],
+    responses: Sequence[str] = DEFAULT_RESPONSES,
+    scale: Optional[float] = None,
+) -> np.ndarray:
+    """Return (patches × responses) densities for a (patches × bands) reflectance matrix.
+
+    ``scale`` takes the values to 0..1 reflectance; ``None`` applies the ``auto`` guess.
+    """
+    spectra = np.asarray(spectra, dtype=np.float64)
+    weights = weighting_matrix(wavelengths, responses)
+    if scale is None:
+        scale = reflectance_scale(spectra)
+    reflectance = (spectra @ weights) * scale
+    return -np.log10(np.clip(reflectance, EPS, 1.0))
+
+
+def visual_density(spectra: np.ndarray, wavelengths: Sequence[float], scale: Optional[float] = None) -> np.ndarray:
+    """Visual density per patch (1-D)."""
+    return spectral_densities(spectra, wavelengths, ("visual",), scale)[:, 0]
+
+
+def read_ramp_spectral_densities(
+    path: str, responses: Sequence[str] = DEFAULT_RESPONSES, unit: str = "auto"
+) -> Tuple[list, Optional[np.ndarray]]:
+    """Neutral-ramp (input %, L*) pairs plus (points × responses) densities when the file has spectra."""
+    ramp = read_neutral_ramp(path, spectral=True)
+    densities = None
+    if ramp.spectra is not None and ramp.wavelengths is not None and ramp.spectra.shape[1]:
+        scale = reflectance_scale(ramp.spectra, unit, ramp.keywords)
+        densities = spectral_densities(ramp.spectra, ramp.wavelengths, responses, scale)
+    return ramp.pairs(), densities
+
+
+def read_ramp_densities(path: str, unit: str = "auto") -> Tuple[list, Optional[np.ndarray]]:
+    """Neutral-ramp (input %, L*) pairs plus visual densities when the file has spectra."""
+    pairs, densities = read_ramp_spectral_densities(path, ("visual",), unit)
+    return pairs, None if densities is None else densities[:, 0]
+
+
+# ---------- Benchmark ----------
+
+def _per_patch_density(spectra: np.ndarray, wavelengths: Sequence[float]) -> list:
+    columns = weighting_matrix(wavelengths).T.tolist()
+    scale = reflectance_scale(spectra)
+    out = []
+    for row in spectra.tolist():
+        densities = []
+        for weights in columns:
+            total = 0.0
+            for value, weight in zip(row, weights):
+                total += value * weight
+            densities.append(-np.log10(min(1.0, max(EPS, total * scale))))
+        out.append(densities)
+    return out
+
+
+def run_benchmark(patches: int, repeats: int) -> None:
+    rng = np.random.default_rng(0)
+    spectra = np.clip(rng.uniform(0.02, 0.9, (patches, 1)) + rng.normal(0.0, 0.01, (patches, 36)), 0.0, 1.0)
+    print(
+        f"Benchmark: {patches} patches × {TABLE_WAVELENGTHS.size} bands × {len(DEFAULT_RESPONSES)} responses, "
+        f"best of {repeats}"
+    )
+
+    def best(fn) -> float:
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    loop = best(lambda: _per_patch_density(spectra, TABLE_WAVELENGTHS))
+    batched = best(lambda: spectral_densities(spectra, TABLE_WAVELENGTHS))
+    print(f"  {'per-patch loop':<20} {loop * 1000.0:>10.2f} ms")
+    print(f"  {'batched matmul':<20} {batched * 1000.0:>10.2f} ms")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Visual and Status A densities from .ti3 spectral reflectance")
+    ap.add_argument("inputs", nargs="*", help=".ti3 / CGATS files with SPEC_* columns")
+    ap.add_argument(
+        "--reflectance", choices=REFLECTANCE_UNITS, default="auto",
+        help="Spectral value units (default auto: SPECTRAL_NORM header, else percent when any value > 1.5)",
+    )
+    ap.add_argument("--benchmark", action="store_true", help="Time the batched path against a per-patch loop")
+    ap.add_argument("--patches", type=int, default=20_000, help="Benchmark: synthetic patch count")
+    ap.add_argument("--repeats", type=int, default=3, help="Benchmark: repetitions")
+    args = ap.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.patches, args.repeats)
+    labels = ("D(vis)", "D(A-R)", "D(A-G)", "D(A-B)")
+    for name in args.inputs:
+        pairs, densities = read_ramp_spectral_densities(name, DEFAULT_RESPONSES, args.reflectance)
+        if densities is None:
+            print(f"{name}: no spectral data")
+            continue
+        dmax = "  ".join(f"{label}={value:.3f}" for label, value in zip(labels, densities.max(axis=0).tolist()))
+        print(f"{name}: {len(pairs)} ramp points, Dmax {dmax}")
+        print(f"  {'input':>8}  {'L*':>7}  " + "  ".join(f"{label:>7}" for label in labels))
+        for (gray, lab_l), row in zip(pairs, densities.tolist()):
+            print(f"  {gray:7.2f}%  {lab_l:7.3f}  " + "  ".join(f"{value:7.4f}" for value in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,39 @@
 #!/usr/bin/env python3
-"""Compare two screenshots and assert that they differ by at least a minimum delta."""
+"""Compare two screenshots and assert that they differ by at least a minimum delta.
+
+``--max-delta`` and ``--min-ssim`` flip the assertion for regions that must stay nearly identical.
+For whole directories (near-duplicate clusters, nearest baseline) see ``image_index.py``.
+"""
 from __future__ import annotations
 
 import argparse
+import os
 import sys
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Tuple
+from typing import List, Tuple
 
+import numpy as np
 from PIL import Image, ImageChops, ImageStat
 
+from image_cache import CACHE_ENV, DEFAULT_MAX_BYTES, ImageCache, decode_rgb, same_bytes
+
+Box = Tuple[int, int, int, int]
+
+# Decoded-image cache shared by every load in this process; configured from the CLI/environment.
+IMAGE_CACHE: ImageCache | None = None
+
+PYRAMID_MAX_LEVELS = 4
+PYRAMID_MIN_SIDE = 16
+EXACT_BAND_ROWS = 256
+DEFAULT_MIN_DELTA = 0.01
+
+SSIM_WINDOW = 8
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+SSIM_BAND_TILES = 64
+LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description=__doc__)
@@ -17,8 +42,26 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--min-delta",
         type=float,
-        default=0.01,
-        help="Minimum normalized mean absolute difference (0-1) required for success",
+        help=(
+            "Minimum normalized mean absolute difference (0-1) required for success "
+            f"(default: {DEFAULT_MIN_DELTA}, or 0 with --max-delta/--min-ssim)"
+        ),
+    )
+    parser.add_argument(
+        "--max-delta",
+        type=float,
+        help="Maximum normalized mean absolute difference (0-1) allowed; asserts the images are nearly identical",
+    )
+    parser.add_argument(
+        "--min-ssim",
+        type=float,
+        help="Minimum mean structural similarity (SSIM, -1..1) required; asserts the images are nearly identical",
+    )
+    parser.add_argument(
+        "--ssim-window",
+        type=int,
+        default=SSIM_WINDOW,
+        help="SSIM mode: side of the square tiles over which local statistics are computed",
     )
     parser.add_argument(
         "--crop",
@@ -27,16 +70,107 @@ def parse_args() -> argparse.Namespace:
         metavar=("LEFT", "TOP", "RIGHT", "BOTTOM"),
         help="Optional crop box to narrow the comparison region",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--tile",
+        type=int,
+        metavar="SIZE",
+        help="Compare in SIZE x SIZE tiles and report bounding boxes of changed regions",
+    )
+    parser.add_argument(
+        "--tile-threshold",
+        type=float,
+        help="Normalized per-tile mean delta above which a tile counts as changed (default: --min-delta)",
+    )
+    parser.add_argument(
+        "--heatmap",
+        type=Path,
+        help="Tiled mode: write a per-tile delta heatmap PNG (forces a full scan)",
+    )
+    parser.add_argument(
+        "--full-scan",
+        action="store_true",
+        help="Tiled mode: keep scanning after --min-delta is proven so every changed region is reported",
+    )
+    parser.add_argument(
+        "--pyramid",
+        action="store_true",
+        help="Compare coarse downsampled levels first and refine only when the result is inconclusive",
+    )
+    parser.add_argument(
+        "--pyramid-levels",
+        type=int,
+        default=PYRAMID_MAX_LEVELS,
+        help="Pyramid mode: maximum number of 2x downsampling levels",
+    )
+    parser.add_argument(
+        "--pyramid-margin",
+        type=float,
+        help=(
+            "Pyramid mode: heuristically accept a coarse 'too similar' result when it is below --min-delta by "
+            "more than this; coarse levels can hide changes of any size (default: always confirm failures at "
+            "full resolution)"
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help=f"Directory for the decoded-image cache (default: ${CACHE_ENV}; disabled when unset)",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=DEFAULT_MAX_BYTES / (1024 * 1024),
+        help="Size bound for the decoded-image cache before least-recently-used entries are evicted",
+    )
+    parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="Print decoded-image cache hit statistics",
+    )
+    args = parser.parse_args()
+    if args.tile is not None or args.pyramid:
+        for flag, value in (("--max-delta", args.max_delta), ("--min-ssim", args.min_ssim)):
+            if value is not None:
+                parser.error(f"{flag} needs the full-resolution comparison; it cannot be combined with --tile or --pyramid")
+    args.explicit_min_delta = args.min_delta is not None
+    if args.min_delta is None:
+        upper_bound_mode = args.max_delta is not None or args.min_ssim is not None
+        args.min_delta = 0.0 if upper_bound_mode else DEFAULT_MIN_DELTA
+    return args
 
 
 def load_image(path: Path) -> Image.Image:
+    if IMAGE_CACHE is not None:
+        pixels = IMAGE_CACHE.load_rgb(path)
+        height, width = pixels.shape[:2]
+        return Image.frombuffer("RGB", (width, height), pixels, "raw", "RGB", 0, 1)
     try:
         return Image.open(path).convert("RGB")
     except Exception as exc:  # pragma: no cover - defensive logging
         raise SystemExit(f"Unable to load image {path}: {exc}")
 
 
+def identical_files(before: Path, after: Path) -> bool:
+    """Byte-identical inputs have zero delta; detect them from the file hash without decoding."""
+    if IMAGE_CACHE is not None:
+        return IMAGE_CACHE.identical(before, after)
+    return same_bytes(before, after)
+
+
+def require_delta(delta: float, min_delta: float, detail: str = "") -> None:
+    if delta < min_delta:
+        raise SystemExit(
+            f"Images too similar: normalized delta {delta:.6f} < required {min_delta:.6f}{detail}"
+        )
+
+
+def require_at_most(delta: float, max_delta: float | None) -> None:
+    if max_delta is not None and delta > max_delta:
+        raise SystemExit(
+            f"Images differ too much: normalized delta {delta:.6f} > allowed {max_delta:.6f}"
+        )
+
+
 def normalized_mean_diff(diff_image: Image.Image) -> float:
     stat = ImageStat.Stat(diff_image)
     mean_per_channel = stat.mean  # 0-255 per channel
@@ -44,7 +178,17 @@ def normalized_mean_diff(diff_image: Image.Image) -> float:
     return sum(mean_per_channel) / (len(mean_per_channel) * 255.0)
 
 
-def compare(before: Path, after: Path, min_delta: float, crop: Tuple[int, int, int, int] | None) -> float:
+def compare(
+    before: Path,
+    after: Path,
+    min_delta: float,
+    crop: Tuple[int, int, int, int] | None,
+    max_delta: float | None = None,
+) -> float:
+    if identical_files(before, after):
+        require_delta(0.0, min_delta)
+        return 0.0
+
     img_before = load_image(before)
     img_after = load_image(after)
 
@@ -59,18 +203,431 @@ def compare(before: Path, after: Path, min_delta: float, crop: Tuple[int, int, i
 
     diff = ImageChops.difference(img_before, img_after)
     delta = normalized_mean_diff(diff)
+    require_delta(delta, min_delta)
+    require_at_most(delta, max_delta)
+    return delta
 
-    if delta < min_delta:
+
+@dataclass
+class TiledDiff:
+    delta: float
+    """Normalized mean delta over the scanned rows; a lower bound of the full delta when ``early_exit``."""
+    early_exit: bool
+    scanned_rows: int
+    total_rows: int
+    tile_deltas: np.ndarray
+    """Per-tile normalized mean delta (tile rows x tile columns); unscanned rows are NaN."""
+    regions: List[Box] = field(default_factory=list)
+    """Pixel bounding boxes (left, top, right, bottom) of connected runs of changed tiles."""
+
+
+def load_array(path: Path) -> np.ndarray:
+    """Return (height, width, 3) uint8 pixels; memory-mapped when the decoded-image cache is active."""
+    if IMAGE_CACHE is not None:
+        return IMAGE_CACHE.load_rgb(path)
+    return decode_rgb(path)
+
+
+def region_size(path: Path, crop: Tuple[int, int, int, int] | None) -> Tuple[int, int]:
+    """(width, height) of the compared region, read from the image header only."""
+    if crop is not None:
+        left, top, right, bottom = crop
+        return right - left, bottom - top
+    with Image.open(path) as image:
+        return image.size
+
+
+def tile_edges(length: int, tile: int) -> np.ndarray:
+    return np.arange(0, length, tile)
+
+
+def changed_regions(mask: np.ndarray, tile: int, width: int, height: int, offset: Tuple[int, int]) -> List[Box]:
+    """Group 4-connected changed tiles and return their pixel bounding boxes."""
+    seen = np.zeros_like(mask, dtype=bool)
+    rows, cols = mask.shape
+    ox, oy = offset
+    regions: List[Box] = []
+    for r0, c0 in zip(*np.nonzero(mask)):
+        if seen[r0, c0]:
+            continue
+        seen[r0, c0] = True
+        stack = [(r0, c0)]
+        top, bottom, left, right = r0, r0, c0, c0
+        while stack:
+            r, c = stack.pop()
+            top, bottom = min(top, r), max(bottom, r)
+            left, right = min(left, c), max(right, c)
+            for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                if 0 <= nr < rows and 0 <= nc < cols and mask[nr, nc] and not seen[nr, nc]:
+                    seen[nr, nc] = True
+                    stack.append((nr, nc))
+        regions.append(
+            (
+                ox + int(left) * tile,
+                oy + int(top) * tile,
+                ox + min(width, (int(right) + 1) * tile),
+                oy + min(height, (int(bottom) + 1) * tile),
+            )
+        )
+    regions.sort(key=lambda box: (box[1], box[0]))
+    return regions
+
+
+def write_heatmap(path: Path, tile_deltas: np.ndarray, size: Tuple[int, int]) -> None:
+    """Write tile deltas as a red-scale PNG stretched to the compared region."""
+    grid = np.nan_to_num(tile_deltas, nan=0.0)
+    peak = float(grid.max()) if grid.size else 0.0
+    scaled = (grid / peak * 255.0) if peak > 0 else grid
+    red = scaled.clip(0, 255).astype(np.uint8)
+    rgb = np.stack([red, np.zeros_like(red), np.zeros_like(red)], axis=-1)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.fromarray(rgb, mode="RGB").resize(size, Image.NEAREST).save(path)
+
+
+def compare_tiled(
+    before: Path,
+    after: Path,
+    min_delta: float,
+    crop: Tuple[int, int, int, int] | None,
+    tile: int,
+    tile_threshold: float | None = None,
+    heatmap: Path | None = None,
+    full_scan: bool = False,
+) -> TiledDiff:
+    """Tile-wise comparison that stops as soon as ``min_delta`` is proven.
+
+    Each band of tile rows is reduced to per-tile sums with a single ``np.add.reduceat`` pass.
+    Because absolute differences are non-negative, the running sum over the scanned bands is a
+    lower bound on the full-image sum, so the scan ends once it alone reaches ``min_delta``.
+    """
+    if tile <= 0:
+        raise SystemExit(f"Tile size must be positive, got {tile}")
+
+    if identical_files(before, after):
+        width, height = region_size(before, crop)
+        tile_deltas = np.zeros((len(tile_edges(height, tile)), len(tile_edges(width, tile))))
+        if heatmap is not None:
+            write_heatmap(heatmap, tile_deltas, (width, height))
+        require_delta(0.0, min_delta, f" (heatmap={heatmap})" if heatmap is not None else "")
+        return TiledDiff(0.0, False, len(tile_deltas), len(tile_deltas), tile_deltas)
+
+    arr_before = load_array(before)
+    arr_after = load_array(after)
+    if arr_before.shape != arr_after.shape:
         raise SystemExit(
-            f"Images too similar: normalized delta {delta:.6f} < required {min_delta:.6f}"
+            f"Image dimensions differ: {arr_before.shape[1::-1]} vs {arr_after.shape[1::-1]}. Cannot compare."
         )
+    offset = (0, 0)
+    if crop is not None:
+        left, top, right, bottom = crop
+        arr_before = arr_before[top:bottom, left:right]
+        arr_after = arr_after[top:bottom, left:right]
+        offset = (left, top)
 
-    return delta
+    height, width = arr_before.shape[:2]
+    channels = arr_before.shape[2]
+    threshold = min_delta if tile_threshold is None else tile_threshold
+    row_starts = tile_edges(height, tile)
+    col_starts = tile_edges(width, tile)
+    col_counts = np.diff(np.append(col_starts, width))
+
+    tile_deltas = np.full((len(row_starts), len(col_starts)), np.nan)
+    required = min_delta * height * width * channels * 255.0
+    stop_early = not full_scan and heatmap is None
+    running = 0.0
+    scanned = 0
+    for index, top in enumerate(row_starts):
+        bottom = min(height, top + tile)
+        band = np.abs(
+            arr_before[top:bottom].astype(np.int16) - arr_after[top:bottom].astype(np.int16)
+        ).sum(axis=2, dtype=np.int64)
+        sums = np.add.reduceat(band.sum(axis=0), col_starts)
+        tile_deltas[index] = sums / (col_counts * (bottom - top) * channels * 255.0)
+        running += float(sums.sum())
+        scanned = index + 1
+        if stop_early and running >= required and scanned < len(row_starts):
+            break
+
+    early_exit = scanned < len(row_starts)
+    # Normalizing the partial sum by the whole region keeps an early-exit value a true lower bound.
+    delta = running / (max(1, height * width) * channels * 255.0)
+
+    # Regions and heatmap come first so a failing comparison still says where pixels changed.
+    mask = np.nan_to_num(tile_deltas, nan=0.0) > threshold
+    result = TiledDiff(
+        delta=delta,
+        early_exit=early_exit,
+        scanned_rows=scanned,
+        total_rows=len(row_starts),
+        tile_deltas=tile_deltas,
+        regions=changed_regions(mask, tile, width, height, offset),
+    )
+    if heatmap is not None:
+        write_heatmap(heatmap, tile_deltas, (width, height))
+    details = [f"region={','.join(str(v) for v in box)}" for box in result.regions]
+    if heatmap is not None:
+        details.append(f"heatmap={heatmap}")
+    require_delta(delta, min_delta, f" ({' '.join(details)})" if details else "")
+    return result
+
+
+@dataclass
+class PyramidDiff:
+    delta: float
+    level: int
+    """Pyramid level that decided the result (0 = full resolution)."""
+    scale: int
+    """Downsampling factor of ``level`` along each axis."""
+    bound: str
+    """``exact`` at full resolution, ``lower`` when the coarse delta already proves --min-delta,
+    ``margin`` when a coarse 'too similar' result was accepted under --pyramid-margin."""
+    error_bound: float
+    """Full-resolution delta lies within [delta, delta + error_bound]: 0 at full resolution and
+    inf whenever a coarse level decided, since a block-sum delta only bounds it from below."""
+    evaluated: List[Tuple[int, float]] = field(default_factory=list)
+
+
+def block_sums(sums: np.ndarray, level: int) -> np.ndarray:
+    """Merge 2x2 blocks of per-block pixel sums into ``level``; odd edges are zero-padded.
+
+    Zero padding adds nothing to either image, so partial edge blocks keep exact sums.
+    """
+    height, width = sums.shape[:2]
+    if height % 2 or width % 2:
+        sums = np.pad(sums, ((0, height % 2), (0, width % 2), (0, 0)))
+    # A level-L block sums at most 4**L pixels of 255, which fits uint16 up to level 4.
+    dtype = np.uint16 if 255 * 4 ** level <= np.iinfo(np.uint16).max else np.uint32
+    rows = sums[0::2].astype(dtype) + sums[1::2]
+    return rows[:, 0::2] + rows[:, 1::2]
+
+
+def exact_delta(arr_before: np.ndarray, arr_after: np.ndarray) -> float:
+    """Full-resolution normalized mean delta, reduced in row bands to bound peak memory."""
+    total = 0
+    for top in range(0, arr_before.shape[0], EXACT_BAND_ROWS):
+        band_before = arr_before[top:top + EXACT_BAND_ROWS].astype(np.int16)
+        band_after = arr_after[top:top + EXACT_BAND_ROWS].astype(np.int16)
+        total += int(np.abs(band_before - band_after).sum(dtype=np.int64))
+    return total / (max(1, arr_before.size) * 255.0)
+
+
+def compare_pyramid(
+    before: Path,
+    after: Path,
+    min_delta: float,
+    crop: Tuple[int, int, int, int] | None,
+    max_levels: int = PYRAMID_MAX_LEVELS,
+    margin: float | None = None,
+) -> PyramidDiff:
+    """Coarse-to-fine comparison over a 2x block-sum pyramid.
+
+    Each level stores per-block pixel sums, so by the triangle inequality its delta
+    (sum of |block_before - block_after| over all pixels) never exceeds the delta of any finer
+    level. A coarse level that reaches ``min_delta`` therefore settles the comparison exactly.
+    Averaging can hide high-frequency changes, so a coarse level below ``min_delta`` is only
+    accepted as 'too similar' when a ``margin`` is given and it falls short by more than that.
+    That acceptance is a heuristic, not a bound: a checkerboard change cancels out in every
+    block sum however large it is. Everything else is refined down to full resolution.
+    """
+    if identical_files(before, after):
+        require_delta(0.0, min_delta)
+        return PyramidDiff(0.0, 0, 1, "exact", 0.0, [(0, 0.0)])
+
+    arr_before = load_array(before)
+    arr_after = load_array(after)
+    if arr_before.shape != arr_after.shape:
+        raise SystemExit(
+            f"Image dimensions differ: {arr_before.shape[1::-1]} vs {arr_after.shape[1::-1]}. Cannot compare."
+        )
+    if crop is not None:
+        left, top, right, bottom = crop
+        arr_before = arr_before[top:bottom, left:right]
+        arr_after = arr_after[top:bottom, left:right]
+
+    height, width, channels = arr_before.shape
+    norm = max(1, height * width) * channels * 255.0
+    sums_before: np.ndarray = arr_before
+    sums_after: np.ndarray = arr_after
+    pyramid: List[Tuple[np.ndarray, np.ndarray]] = []
+    while len(pyramid) < max_levels and min(sums_before.shape[:2]) >= 2 * PYRAMID_MIN_SIDE:
+        level = len(pyramid) + 1
+        sums_before = block_sums(sums_before, level)
+        sums_after = block_sums(sums_after, level)
+        pyramid.append((sums_before, sums_after))
+
+    evaluated: List[Tuple[int, float]] = []
+    for level in range(len(pyramid), 0, -1):
+        level_before, level_after = pyramid[level - 1]
+        delta = float(np.abs(level_before.astype(np.int64) - level_after).sum()) / norm
+        evaluated.append((level, delta))
+        if delta >= min_delta:
+            return PyramidDiff(delta, level, 2 ** level, "lower", float("inf"), evaluated)
+        if margin is not None and delta + margin < min_delta:
+            require_delta(
+                delta,
+                min_delta,
+                f" (pyramid level={level} scale=1/{2 ** level} accepted by heuristic margin={margin:.6f};"
+                " full-resolution delta not checked)",
+            )
+
+    delta = exact_delta(arr_before, arr_after)
+    evaluated.append((0, delta))
+    require_delta(delta, min_delta, " (pyramid level=0 scale=1/1 error_bound=0.000000)")
+    return PyramidDiff(delta, 0, 1, "exact", 0.0, evaluated)
+
+
+@dataclass
+class SsimResult:
+    ssim: float
+    """Mean SSIM over all tiles."""
+    worst: float
+    worst_box: Box
+    """Pixel box (left, top, right, bottom) of the least similar tile."""
+    tile_ssim: np.ndarray
+
+
+def window_starts(length: int, window: int) -> np.ndarray:
+    """Non-overlapping window origins; a final window is shifted inward to cover any remainder."""
+    starts = np.arange(0, length - window + 1, window)
+    if starts[-1] + window < length:
+        starts = np.append(starts, length - window)
+    return starts
+
+
+def luminance(pixels: np.ndarray) -> np.ndarray:
+    return pixels @ LUMA_WEIGHTS
+
+
+def tile_ssim(gray_before: np.ndarray, gray_after: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """SSIM for every (row window, column window) pair, gathered as one (rows, win, cols, win) batch."""
+    index = (rows[:, :, None, None], cols[None, None, :, :])
+    tiles_before = gray_before[index].astype(np.float64)
+    tiles_after = gray_after[index].astype(np.float64)
+    axes = (1, 3)
+    mean_before = tiles_before.mean(axis=axes)
+    mean_after = tiles_after.mean(axis=axes)
+    var_before = (tiles_before * tiles_before).mean(axis=axes) - mean_before ** 2
+    var_after = (tiles_after * tiles_after).mean(axis=axes) - mean_after ** 2
+    covariance = (tiles_before * tiles_after).mean(axis=axes) - mean_before * mean_after
+    numerator = (2 * mean_before * mean_after + SSIM_C1) * (2 * covariance + SSIM_C2)
+    denominator = (mean_before ** 2 + mean_after ** 2 + SSIM_C1) * (var_before + var_after + SSIM_C2)
+    return numerator / denominator
+
+
+def compare_ssim(
+    before: Path,
+    after: Path,
+    min_ssim: float,
+    crop: Tuple[int, int, int, int] | None,
+    window: int = SSIM_WINDOW,
+) -> SsimResult:
+    """Tile-wise SSIM on luminance, computed in bands of tile rows to bound memory."""
+    if window <= 0:
+        raise SystemExit(f"SSIM window must be positive, got {window}")
+    if identical_files(before, after):
+        width, height = region_size(before, crop)
+        box = (0, 0, min(window, width), min(window, height))
+        return SsimResult(1.0, 1.0, box, np.ones((1, 1)))
+
+    arr_before = load_array(before)
+    arr_after = load_array(after)
+    if arr_before.shape != arr_after.shape:
+        raise SystemExit(
+            f"Image dimensions differ: {arr_before.shape[1::-1]} vs {arr_after.shape[1::-1]}. Cannot compare."
+        )
+    offset = (0, 0)
+    if crop is not None:
+        left, top, right, bottom = crop
+        arr_before = arr_before[top:bottom, left:right]
+        arr_after = arr_after[top:bottom, left:right]
+        offset = (left, top)
+
+    gray_before = luminance(arr_before)
+    gray_after = luminance(arr_after)
+    height, width = gray_before.shape
+    win_rows = min(window, height)
+    win_cols = min(window, width)
+    row_starts = window_starts(height, win_rows)
+    col_starts = window_starts(width, win_cols)
+    cols = col_starts[:, None] + np.arange(win_cols)
+
+    bands = []
+    for first in range(0, len(row_starts), SSIM_BAND_TILES):
+        rows = row_starts[first:first + SSIM_BAND_TILES, None] + np.arange(win_rows)
+        bands.append(tile_ssim(gray_before, gray_after, rows, cols))
+    scores = np.concatenate(bands, axis=0)
+
+    mean_ssim = float(scores.mean())
+    worst_row, worst_col = np.unravel_index(int(np.argmin(scores)), scores.shape)
+    left = offset[0] + int(col_starts[worst_col])
+    top = offset[1] + int(row_starts[worst_row])
+    result = SsimResult(mean_ssim, float(scores[worst_row, worst_col]), (left, top, left + win_cols, top + win_rows), scores)
+    if mean_ssim < min_ssim:
+        raise SystemExit(
+            f"Images structurally differ: SSIM {mean_ssim:.6f} < required {min_ssim:.6f} "
+            f"(worst tile {result.worst:.6f} at {','.join(str(v) for v in result.worst_box)})"
+        )
+    return result
 
 
 def main() -> None:
+    global IMAGE_CACHE
     args = parse_args()
-    delta = compare(args.before, args.after, args.min_delta, tuple(args.crop) if args.crop else None)
+    crop = tuple(args.crop) if args.crop else None
+    cache_dir = args.cache_dir or (Path(os.environ[CACHE_ENV]) if os.environ.get(CACHE_ENV) else None)
+    if cache_dir is not None:
+        IMAGE_CACHE = ImageCache(cache_dir, int(args.cache_max_mb * 1024 * 1024))
+    try:
+        run(args, crop)
+    finally:
+        if args.cache_stats and IMAGE_CACHE is not None:
+            print(IMAGE_CACHE.stats.describe())
+
+
+def run(args: argparse.Namespace, crop: Tuple[int, int, int, int] | None) -> None:
+    if args.tile is not None:
+        result = compare_tiled(
+            args.before,
+            args.after,
+            args.min_delta,
+            crop,
+            args.tile,
+            tile_threshold=args.tile_threshold,
+            heatmap=args.heatmap,
+            full_scan=args.full_scan,
+        )
+        if result.early_exit:
+            print(f"delta>={result.delta:.6f} (early exit after {result.scanned_rows}/{result.total_rows} tile rows)")
+        else:
+            print(f"delta={result.delta:.6f}")
+        for left, top, right, bottom in result.regions:
+            print(f"region={left},{top},{right},{bottom}")
+        if args.heatmap:
+            print(f"heatmap={args.heatmap}")
+        return
+    if args.pyramid:
+        result = compare_pyramid(
+            args.before,
+            args.after,
+            args.min_delta,
+            crop,
+            max_levels=args.pyramid_levels,
+            margin=args.pyramid_margin,
+        )
+        print(
+            f"delta={result.delta:.6f} level={result.level} scale=1/{result.scale} "
+            f"bound={result.bound} error_bound={result.error_bound:.6f}"
+        )
+        return
+    if args.min_ssim is not None:
+        result = compare_ssim(args.before, args.after, args.min_ssim, crop, window=args.ssim_window)
+        print(
+            f"ssim={result.ssim:.6f} worst_tile={result.worst:.6f} "
+            f"at={','.join(str(v) for v in result.worst_box)}"
+        )
+        if args.max_delta is None and not args.explicit_min_delta:
+            return
+    delta = compare(args.before, args.after, args.min_delta, crop, max_delta=args.max_delta)
     print(f"delta={delta:.6f}")
 
 
@@ -0,0 +1,144 @@
+"""Content-addressed cache of decoded RGB screenshots.
+
+Decoded images are stored as raw ``uint8`` RGB buffers named after the hash of the source file,
+so a baseline that is compared many times is decoded once and memory-mapped afterwards.
+Eviction is least-recently-used (by file mtime, refreshed on every hit) and bounded by size.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+from PIL import Image
+
+CACHE_ENV = "QUADGEN_IMAGE_CACHE"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+HASH_CHUNK = 1024 * 1024
+
+
+def file_digest(path: Path) -> str:
+    """Return a hex digest of the file contents."""
+    hasher = hashlib.blake2b(digest_size=20)
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(HASH_CHUNK), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def decode_rgb(path: Path) -> np.ndarray:
+    try:
+        with Image.open(path) as image:
+            return np.asarray(image.convert("RGB"), dtype=np.uint8)
+    except Exception as exc:  # pragma: no cover - defensive logging
+        raise SystemExit(f"Unable to load image {path}: {exc}")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    identical_pairs: int = 0
+
+    def describe(self) -> str:
+        lookups = self.hits + self.misses
+        rate = (self.hits / lookups * 100.0) if lookups else 0.0
+        return (
+            f"cache hits={self.hits} misses={self.misses} hit_rate={rate:.1f}% "
+            f"evictions={self.evictions} identical_pairs={self.identical_pairs}"
+        )
+
+
+class ImageCache:
+    """Decoded-image store keyed by file hash."""
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def digest(self, path: Path) -> str:
+        """Hash ``path``, memoized per process on (path, mtime, size)."""
+        info = path.stat()
+        key = (str(path.resolve()), info.st_mtime_ns, info.st_size)
+        digest = self._digests.get(key)
+        if digest is None:
+            digest = file_digest(path)
+            self._digests[key] = digest
+        return digest
+
+    def _entry(self, digest: str) -> Path | None:
+        matches = list(self.root.glob(f"{digest}_*.rgb"))
+        return matches[0] if matches else None
+
+    def load_rgb(self, path: Path) -> np.ndarray:
+        """Return a read-only (height, width, 3) uint8 array, memory-mapped when cached."""
+        digest = self.digest(path)
+        entry = self._entry(digest)
+        if entry is not None:
+            width, height = (int(v) for v in entry.stem.split("_", 1)[1].split("x"))
+            try:
+                os.utime(entry)
+                self.stats.hits += 1
+                return np.memmap(entry, dtype=np.uint8, mode="r", shape=(height, width, 3))
+            except (OSError, ValueError):
+                # Entry evicted by a concurrent run or truncated; fall through and rebuild it.
+                pass
+
+        self.stats.misses += 1
+        pixels = decode_rgb(path)
+        height, width = pixels.shape[:2]
+        target = self.root / f"{digest}_{width}x{height}.rgb"
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(pixels.tobytes())
+            os.replace(tmp_name, target)
+        except OSError:
+            Path(tmp_name).unlink(missing_ok=True)
+            return pixels
+        self.evict()
+        return pixels
+
+    def evict(self) -> None:
+        """Drop least-recently-used entries until the cache fits in ``max_bytes``."""
+        entries = []
+        total = 0
+        for entry in self.root.glob("*.rgb"):
+            try:
+                info = entry.stat()
+            except OSError:
+                continue
+            entries.append((info.st_mtime_ns, info.st_size, entry))
+            total += info.st_size
+        entries.sort()
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                entry.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.stats.evictions += 1
+
+    def identical(self, first: Path, second: Path) -> bool:
+        """True when both files have the same bytes; never decodes either image."""
+        same = same_bytes(first, second, self.digest)
+        if same:
+            self.stats.identical_pairs += 1
+        return same
+
+
+def same_bytes(first: Path, second: Path, digest=file_digest) -> bool:
+    if first.stat().st_size != second.stat().st_size:
+        return False
+    return digest(first) == digest(second)
+
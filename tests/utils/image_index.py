@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""Perceptual-hash index for directories of screenshots.
+
+Every image is reduced to a 64-bit DCT perceptual hash (hashing runs in a worker pool) and the
+hashes go into a BK-tree keyed by Hamming distance, so near-duplicate and nearest-baseline
+lookups touch only the few images within ``--radius`` bits instead of diffing every pair.
+Hash distance only proposes candidates: each one is confirmed with ``compare_images.compare``
+against ``--max-delta`` before it is reported.
+
+Usage:
+  python tests/utils/image_index.py clusters artifacts/screenshots [--radius 6] [--max-delta 0.002]
+  python tests/utils/image_index.py nearest new/*.png --baseline baselines/ [--require-match]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+import compare_images
+from image_cache import CACHE_ENV, DEFAULT_MAX_BYTES, ImageCache
+
+Box = Tuple[int, int, int, int]
+
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp", ".bmp")
+HASH_SIDE = 8
+HASH_SAMPLE = 32
+DEFAULT_RADIUS = 6
+DEFAULT_MAX_DELTA = 0.002
+DEFAULT_MAX_CANDIDATES = 8
+
+# Rows of the DCT-II basis that survive the low-pass crop to HASH_SIDE x HASH_SIDE coefficients.
+DCT_BASIS = np.cos(
+    np.pi * np.arange(HASH_SIDE)[:, None] * (2 * np.arange(HASH_SAMPLE)[None, :] + 1) / (2 * HASH_SAMPLE)
+)
+
+
+# ---------- Hashing ----------
+
+@dataclass
+class ImageHash:
+    path: Path
+    value: int = 0
+    size: Tuple[int, int] = (0, 0)
+    """(width, height) of the hashed region; only equal sizes can be confirmed by ``compare``."""
+    error: str = ""
+
+
+def hamming(first: int, second: int) -> int:
+    return (first ^ second).bit_count()
+
+
+def perceptual_hash(path: Path, crop: Box | None = None) -> ImageHash:
+    """64-bit pHash: low-frequency DCT coefficients of a 32x32 luminance thumbnail vs their median."""
+    try:
+        with Image.open(path) as image:
+            region = image.crop(crop) if crop is not None else image
+            size = region.size
+            thumb = region.convert("L").resize((HASH_SAMPLE, HASH_SAMPLE), Image.LANCZOS)
+    except Exception as exc:
+        return ImageHash(path, error=str(exc))
+    coefficients = DCT_BASIS @ np.asarray(thumb, dtype=np.float64) @ DCT_BASIS.T
+    flat = coefficients.ravel()
+    # The DC term only carries overall brightness and would dominate the median.
+    bits = flat > np.median(flat[1:])
+    return ImageHash(path, int.from_bytes(np.packbits(bits).tobytes(), "big"), size)
+
+
+def _hash_job(job: Tuple[Path, Box | None]) -> ImageHash:
+    return perceptual_hash(*job)
+
+
+def collect_images(inputs: Iterable[Path]) -> List[Path]:
+    """Image files named directly or found (recursively) under directories, in sorted order."""
+    found: List[Path] = []
+    for item in inputs:
+        if item.is_dir():
+            found.extend(sorted(p for p in item.rglob("*") if p.suffix.lower() in IMAGE_SUFFIXES))
+        else:
+            found.append(item)
+    return found
+
+
+def hash_images(paths: Sequence[Path], crop: Box | None = None, workers: int | None = None) -> List[ImageHash]:
+    """Hash every image in a process pool (``workers == 1`` hashes inline), keeping input order."""
+    jobs = [(path, crop) for path in paths]
+    if workers == 1 or len(jobs) <= 1:
+        return [_hash_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunk = max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))
+        return list(pool.map(_hash_job, jobs, chunksize=chunk))
+
+
+# ---------- BK-tree ----------
+
+class BKTree:
+    """Metric tree over hashes: each child edge is labelled with its Hamming distance to the parent.
+
+    By the triangle inequality a search of radius r from a node at distance d only needs children
+    whose edge label lies in [d - r, d + r]. Equal hashes share one node.
+    """
+
+    def __init__(self) -> None:
+        self.root: List | None = None
+        """Nodes are [hash, items, {distance: child}]."""
+        self.size = 0
+
+    def add(self, value: int, item: int) -> None:
+        self.size += 1
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> List[Tuple[int, int]]:
+        """(distance, item) for every item within ``radius`` bits, nearest first."""
+        found: List[Tuple[int, int]] = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= radius:
+                found.extend((distance, item) for item in node[1])
+            for edge, child in node[2].items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        found.sort()
+        return found
+
+
+@dataclass
+class ImageIndex:
+    hashes: List[ImageHash]
+    """Successfully hashed images; ``BKTree`` items are positions in this list."""
+    tree: BKTree
+    failed: List[ImageHash] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+def build_index(paths: Sequence[Path], crop: Box | None = None, workers: int | None = None) -> ImageIndex:
+    start = time.perf_counter()
+    hashed = hash_images(paths, crop, workers)
+    hashes = [entry for entry in hashed if not entry.error]
+    tree = BKTree()
+    for item, entry in enumerate(hashes):
+        tree.add(entry.value, item)
+    return ImageIndex(hashes, tree, [entry for entry in hashed if entry.error], time.perf_counter() - start)
+
+
+# ---------- Queries ----------
+
+def confirm(first: Path, second: Path, max_delta: float, crop: Box | None) -> float | None:
+    """Exact normalized delta when ``compare`` accepts the pair as nearly identical, else None."""
+    try:
+        return compare_images.compare(first, second, 0.0, crop, max_delta=max_delta)
+    except SystemExit:
+        return None
+
+
+@dataclass
+class ClusterResult:
+    clusters: List[List[Path]]
+    """Groups of confirmed near-duplicates (largest first); singletons are left out."""
+    candidates: int
+    """Pairs proposed by the hash index, i.e. the only pairs that were pixel-compared."""
+    confirmed: int
+    seconds: float
+
+
+def duplicate_clusters(index: ImageIndex, radius: int, max_delta: float, crop: Box | None = None) -> ClusterResult:
+    """Union images whose hashes are within ``radius`` and whose exact delta is within ``max_delta``."""
+    start = time.perf_counter()
+    parent = list(range(len(index.hashes)))
+
+    def root(item: int) -> int:
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    candidates = confirmed = 0
+    for item, entry in enumerate(index.hashes):
+        for _, other in index.tree.search(entry.value, radius):
+            if other <= item or index.hashes[other].size != entry.size or root(item) == root(other):
+                continue
+            candidates += 1
+            if confirm(entry.path, index.hashes[other].path, max_delta, crop) is not None:
+                confirmed += 1
+                parent[root(other)] = root(item)
+
+    groups: Dict[int, List[Path]] = {}
+    for item, entry in enumerate(index.hashes):
+        groups.setdefault(root(item), []).append(entry.path)
+    clusters = sorted((paths for paths in groups.values() if len(paths) > 1), key=lambda paths: (-len(paths), paths[0]))
+    return ClusterResult(clusters, candidates, confirmed, time.perf_counter() - start)
+
+
+@dataclass
+class NearestMatch:
+    query: Path
+    baseline: Path | None = None
+    distance: int = -1
+    """Hash distance of the chosen baseline (-1 when nothing was confirmed)."""
+    delta: float = float("nan")
+    candidates: int = 0
+    error: str = ""
+
+
+def nearest_baseline(
+    query: ImageHash,
+    index: ImageIndex,
+    radius: int,
+    max_delta: float,
+    crop: Box | None = None,
+    max_candidates: int = DEFAULT_MAX_CANDIDATES,
+) -> NearestMatch:
+    """Closest confirmed baseline among the ``max_candidates`` nearest hashes within ``radius``."""
+    if query.error:
+        return NearestMatch(query.path, error=query.error)
+    match = NearestMatch(query.path)
+    resolved = query.path.resolve()
+    for distance, item in index.tree.search(query.value, radius):
+        if match.candidates >= max_candidates:
+            break
+        baseline = index.hashes[item]
+        if baseline.size != query.size or baseline.path.resolve() == resolved:
+            continue
+        match.candidates += 1
+        delta = confirm(query.path, baseline.path, max_delta, crop)
+        if delta is not None and (match.baseline is None or delta < match.delta):
+            match.baseline, match.distance, match.delta = baseline.path, distance, delta
+            if delta == 0.0:
+                break
+    return match
+
+
+# ---------- CLI ----------
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=("clusters", "nearest"))
+    parser.add_argument("inputs", type=Path, nargs="+", help="Screenshots or directories of screenshots")
+    parser.add_argument("--baseline", type=Path, nargs="+", help="nearest: baseline screenshots or directories to index")
+    parser.add_argument(
+        "--radius",
+        type=int,
+        default=DEFAULT_RADIUS,
+        help="Maximum Hamming distance (of 64 bits) for a pair to become a candidate",
+    )
+    parser.add_argument(
+        "--max-delta",
+        type=float,
+        default=DEFAULT_MAX_DELTA,
+        help="Maximum normalized mean absolute difference (0-1) for compare() to confirm a candidate",
+    )
+    parser.add_argument(
+        "--max-candidates",
+        type=int,
+        default=DEFAULT_MAX_CANDIDATES,
+        help="nearest: candidates confirmed per query, nearest hashes first",
+    )
+    parser.add_argument(
+        "--crop",
+        type=int,
+        nargs=4,
+        metavar=("LEFT", "TOP", "RIGHT", "BOTTOM"),
+        help="Optional crop box applied to hashing and confirmation",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Hashing process pool size (default: CPU count; 1 = inline)")
+    parser.add_argument("--require-match", action="store_true", help="nearest: fail when a query has no confirmed baseline")
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help=f"Directory for the decoded-image cache used by confirmations (default: ${CACHE_ENV}; disabled when unset)",
+    )
+    args = parser.parse_args()
+    if args.mode == "nearest" and not args.baseline:
+        parser.error("nearest needs --baseline")
+    return args
+
+
+def run_clusters(args: argparse.Namespace, crop: Box | None) -> None:
+    index = build_index(collect_images(args.inputs), crop, args.workers)
+    result = duplicate_clusters(index, args.radius, args.max_delta, crop)
+    total = len(index.hashes)
+    print(
+        f"hashed={total} in {index.seconds:.2f}s candidates={result.candidates} "
+        f"(of {total * (total - 1) // 2} pairs) confirmed={result.confirmed} in {result.seconds:.2f}s"
+    )
+    for entry in index.failed:
+        print(f"error={entry.path}: {entry.error}")
+    for number, paths in enumerate(result.clusters, 1):
+        print(f"cluster={number} size={len(paths)}")
+        for path in paths:
+            print(f"  {path}")
+
+
+def run_nearest(args: argparse.Namespace, crop: Box | None) -> None:
+    index = build_index(collect_images(args.baseline), crop, args.workers)
+    queries = hash_images(collect_images(args.inputs), crop, args.workers)
+    unmatched = 0
+    for query in queries:
+        match = nearest_baseline(query, index, args.radius, args.max_delta, crop, args.max_candidates)
+        if match.baseline is None:
+            unmatched += 1
+            reason = match.error or f"no baseline within {args.radius} bits and delta {args.max_delta:g}"
+            print(f"{match.query} -> none ({reason}; candidates={match.candidates})")
+        else:
+            print(f"{match.query} -> {match.baseline} distance={match.distance} delta={match.delta:.6f}")
+    if args.require_match and unmatched:
+        raise SystemExit(f"{unmatched} of {len(queries)} screenshot(s) have no matching baseline")
+
+
+def main() -> None:
+    args = parse_args()
+    crop = tuple(args.crop) if args.crop else None
+    cache_dir = args.cache_dir or (Path(os.environ[CACHE_ENV]) if os.environ.get(CACHE_ENV) else None)
+    if cache_dir is not None:
+        compare_images.IMAGE_CACHE = ImageCache(cache_dir, DEFAULT_MAX_BYTES)
+    if args.mode == "clusters":
+        run_clusters(args, crop)
+    else:
+        run_nearest(args, crop)
+
+
+if __name__ == "__main__":
+    main()